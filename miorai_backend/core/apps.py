@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .monitoring import install_query_instrumentation
+
+        # Count queries (and fingerprint slow ones) on every connection, independent of DEBUG
+        connection_created.connect(install_query_instrumentation, dispatch_uid='core.query_instrumentation')
@@ -6,21 +6,31 @@ Provides helper functions for Redis cache operations.
 import json
 import hashlib
 from typing import Any, Optional, Dict, List
-from django.core.cache import cache
+from django.core.cache import caches
 from django.conf import settings
 from django.core.cache.backends.redis import RedisCache
 import logging
 
+from .metrics import record_cache_lookup, record_cache_lookups
+from .monitoring import get_request_metrics
+
 logger = logging.getLogger(__name__)
 
 class CacheManager:
     """Centralized cache management for the application."""
     
-    def __init__(self):
+    def __init__(self, alias: str = 'default'):
+        self.alias = alias
         self.default_timeout = 300  # 5 minutes
         self.ml_timeout = 3600      # 1 hour
         self.session_timeout = 86400  # 24 hours
     
+    @property
+    def cache(self):
+        """Cache backend for this manager's alias (falls back to 'default' if not configured)."""
+        alias = self.alias if self.alias in settings.CACHES else 'default'
+        return caches[alias]
+    
     def _generate_cache_key(self, prefix: str, *args, **kwargs) -> str:
         """Generate a unique cache key."""
         key_parts = [prefix]
@@ -43,7 +53,9 @@ class CacheManager:
     def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache."""
         try:
-            value = cache.get(key)
+            value = self.cache.get(key)
+            get_request_metrics().record_cache_call('get', hits=int(value is not None), misses=int(value is None))
+            record_cache_lookup(key, hits=int(value is not None), misses=int(value is None))
             if value is not None:
                 logger.debug(f"Cache HIT: {key}")
             else:
@@ -59,7 +71,8 @@ class CacheManager:
             if timeout is None:
                 timeout = self.default_timeout
             
-            cache.set(key, value, timeout)
+            self.cache.set(key, value, timeout)
+            get_request_metrics().record_cache_call('set')
             logger.debug(f"Cache SET: {key} (timeout: {timeout}s)")
             return True
         except Exception as e:
@@ -69,13 +82,51 @@ class CacheManager:
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
         try:
-            cache.delete(key)
+            self.cache.delete(key)
+            get_request_metrics().record_cache_call('delete')
             logger.debug(f"Cache DELETE: {key}")
             return True
         except Exception as e:
             logger.error(f"Cache delete error for key {key}: {e}")
             return False
     
+    def delete_many(self, keys: List[str]) -> bool:
+        """Delete several values from cache in one round trip."""
+        try:
+            self.cache.delete_many(keys)
+            get_request_metrics().record_cache_call('delete_many')
+            logger.debug(f"Cache DELETE_MANY: {len(keys)} keys")
+            return True
+        except Exception as e:
+            logger.error(f"Cache delete_many error: {e}")
+            return False
+    
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values from cache in one round trip."""
+        try:
+            values = self.cache.get_many(keys)
+            get_request_metrics().record_cache_call('get_many', hits=len(values), misses=len(keys) - len(values))
+            record_cache_lookups(keys, values)
+            logger.debug(f"Cache GET_MANY: {len(values)}/{len(keys)} hits")
+            return values
+        except Exception as e:
+            logger.error(f"Cache get_many error: {e}")
+            return {}
+    
+    def set_many(self, values: Dict[str, Any], timeout: Optional[int] = None) -> bool:
+        """Set several values in cache in one round trip."""
+        try:
+            if timeout is None:
+                timeout = self.default_timeout
+            
+            self.cache.set_many(values, timeout)
+            get_request_metrics().record_cache_call('set_many')
+            logger.debug(f"Cache SET_MANY: {len(values)} keys (timeout: {timeout}s)")
+            return True
+        except Exception as e:
+            logger.error(f"Cache set_many error: {e}")
+            return False
+    
     def get_or_set(self, key: str, default_func, timeout: Optional[int] = None) -> Any:
         """Get value from cache or set default if not exists."""
         value = self.get(key)
@@ -89,9 +140,9 @@ class CacheManager:
         try:
             # Note: This is a simplified version. In production, you might want to use
             # Redis SCAN command for better performance with large datasets
-            keys = cache.keys(pattern)
+            keys = self.cache.keys(pattern)
             if keys:
-                cache.delete_many(keys)
+                self.cache.delete_many(keys)
                 logger.info(f"Invalidated {len(keys)} cache keys matching pattern: {pattern}")
                 return len(keys)
             return 0
@@ -140,30 +191,160 @@ class TournamentCache:
 class MLCache:
     """Cache utilities for ML-related operations."""
     
-    def __init__(self):
-        self.cache_manager = CacheManager()
+    def __init__(self, alias: str = 'ml_predictions'):
+        self.cache_manager = CacheManager(alias)
         self.prefix = "ml"
+        # Prediction keys carry the model version and never go stale
+        self.prediction_timeout = 86400  # 24 hours
+        # Streaming statistics must outlive the model version they extend
+        self.online_timeout = 30 * 86400  # 30 days
     
-    def get_prediction_key(self, n_images: int, category: Optional[str] = None) -> str:
-        """Generate cache key for ML prediction."""
+    def get_prediction_key(self, n_images: int, category: Optional[str] = None,
+                           model_version: Optional[str] = None, variant: Optional[str] = None) -> str:
+        """Generate cache key for ML prediction (scoped to a model version and interval variant when given)."""
+        prefix = f"{self.prefix}:prediction"
+        if model_version:
+            prefix = f"{prefix}:{model_version}"
+        if variant:
+            prefix = f"{prefix}:{variant}"
         if category:
-            return self.cache_manager._generate_cache_key(f"{self.prefix}:prediction", n_images, category=category)
-        return self.cache_manager._generate_cache_key(f"{self.prefix}:prediction", n_images)
+            return self.cache_manager._generate_cache_key(prefix, n_images, category=category)
+        return self.cache_manager._generate_cache_key(prefix, n_images)
+    
+    def invalidate_predictions(self, n_values: List[int], categories: List[Optional[str]],
+                               model_version: Optional[str] = None,
+                               variants: Optional[List[Optional[str]]] = None) -> bool:
+        """Delete cached predictions for the given image counts only (no pattern scan)."""
+        keys = [
+            self.get_prediction_key(n_images, category, model_version, variant)
+            for n_images in n_values
+            for category in categories
+            for variant in (variants or [None])
+        ]
+        if not keys:
+            return True
+        return self.cache_manager.delete_many(keys)
     
-    def get_model_status_key(self) -> str:
+    def get_online_stats_key(self, model_version: str, n_images: int) -> str:
+        """Generate cache key for streaming statistics applied on top of a model version."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:online", model_version, n_images)
+    
+    def get_online_stats(self, model_version: str, n_values: List[int]) -> Dict[int, Dict]:
+        """Get streaming statistics for several image counts with one multi-get."""
+        keys = {self.get_online_stats_key(model_version, n_images): n_images for n_images in n_values}
+        cached = self.cache_manager.get_many(list(keys))
+        return {keys[key]: value for key, value in cached.items()}
+    
+    def cache_online_stats(self, model_version: str, stats: Dict[int, Dict]) -> bool:
+        """Store streaming statistics for several image counts with one multi-set."""
+        if not stats:
+            return True
+        values = {self.get_online_stats_key(model_version, n_images): value for n_images, value in stats.items()}
+        return self.cache_manager.set_many(values, timeout=self.online_timeout)
+    
+    def get_online_applied_key(self, model_version: str, tournament_id: int) -> str:
+        """Generate cache key marking a tournament as applied to the streaming statistics."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:online:applied", model_version, tournament_id)
+    
+    def get_applied_tournaments(self, model_version: str, tournament_ids: List[int]) -> List[int]:
+        """Get the tournaments already applied to the streaming statistics of a model version."""
+        keys = {self.get_online_applied_key(model_version, tournament_id): tournament_id for tournament_id in tournament_ids}
+        return [keys[key] for key in self.cache_manager.get_many(list(keys))]
+    
+    def mark_applied_tournaments(self, model_version: str, tournament_ids: List[int]) -> bool:
+        """Mark tournaments as applied to the streaming statistics of a model version."""
+        if not tournament_ids:
+            return True
+        values = {self.get_online_applied_key(model_version, tournament_id): True for tournament_id in tournament_ids}
+        return self.cache_manager.set_many(values, timeout=self.online_timeout)
+    
+    def get_online_seeded_key(self, model_version: str) -> str:
+        """Generate cache key marking a model version's streaming statistics as seeded from the append log."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:online:seeded", model_version)
+    
+    def is_online_seeded(self, model_version: str) -> bool:
+        """Whether the streaming statistics of a model version were seeded from the append log."""
+        return bool(self.cache_manager.get(self.get_online_seeded_key(model_version)))
+    
+    def mark_online_seeded(self, model_version: str) -> bool:
+        """Mark the streaming statistics of a model version as seeded from the append log."""
+        return self.cache_manager.set(self.get_online_seeded_key(model_version), True, timeout=self.online_timeout)
+    
+    def get_model_status_key(self, model_version: Optional[str] = None) -> str:
         """Generate cache key for model status."""
+        if model_version:
+            return self.cache_manager._generate_cache_key(f"{self.prefix}:status", model_version)
         return f"{self.prefix}:status"
     
-    def cache_prediction(self, n_images: int, prediction: Dict, category: Optional[str] = None) -> bool:
+    def cache_prediction(self, n_images: int, prediction: Dict, category: Optional[str] = None,
+                         model_version: Optional[str] = None, variant: Optional[str] = None) -> bool:
         """Cache ML prediction result."""
-        key = self.get_prediction_key(n_images, category)
-        return self.cache_manager.set(key, prediction, timeout=self.cache_manager.ml_timeout)
+        key = self.get_prediction_key(n_images, category, model_version, variant)
+        return self.cache_manager.set(key, prediction, timeout=self.prediction_timeout)
     
-    def get_cached_prediction(self, n_images: int, category: Optional[str] = None) -> Optional[Dict]:
+    def get_cached_prediction(self, n_images: int, category: Optional[str] = None,
+                              model_version: Optional[str] = None, variant: Optional[str] = None) -> Optional[Dict]:
         """Get cached ML prediction."""
-        key = self.get_prediction_key(n_images, category)
+        key = self.get_prediction_key(n_images, category, model_version, variant)
         return self.cache_manager.get(key)
     
+    def get_cached_predictions(self, n_values: List[int], category: Optional[str] = None,
+                               model_version: Optional[str] = None, variant: Optional[str] = None) -> Dict[int, Dict]:
+        """Get cached ML predictions for several image counts with one multi-get."""
+        keys = {self.get_prediction_key(n_images, category, model_version, variant): n_images for n_images in n_values}
+        cached = self.cache_manager.get_many(list(keys))
+        return {keys[key]: value for key, value in cached.items()}
+    
+    def cache_predictions(self, predictions: Dict[int, Dict], category: Optional[str] = None,
+                          model_version: Optional[str] = None, variant: Optional[str] = None) -> bool:
+        """Cache several ML prediction results with one multi-set."""
+        if not predictions:
+            return True
+        values = {
+            self.get_prediction_key(n_images, category, model_version, variant): prediction
+            for n_images, prediction in predictions.items()
+        }
+        return self.cache_manager.set_many(values, timeout=self.prediction_timeout)
+    
+    def get_accuracy_key(self, model_version: str, **params) -> str:
+        """Generate cache key for a model accuracy evaluation."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:accuracy", model_version, **params)
+    
+    def cache_accuracy(self, model_version: str, result: Dict, **params) -> bool:
+        """Cache model accuracy evaluation result."""
+        key = self.get_accuracy_key(model_version, **params)
+        return self.cache_manager.set(key, result, timeout=self.cache_manager.ml_timeout)
+    
+    def get_cached_accuracy(self, model_version: str, **params) -> Optional[Dict]:
+        """Get cached model accuracy evaluation result."""
+        return self.cache_manager.get(self.get_accuracy_key(model_version, **params))
+    
+    def get_analytics_key(self, dataset_version: str) -> str:
+        """Generate cache key for dataset analytics aggregates."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:analytics", dataset_version)
+    
+    def cache_analytics(self, dataset_version: str, analytics: Dict) -> bool:
+        """Cache dataset analytics aggregates."""
+        key = self.get_analytics_key(dataset_version)
+        return self.cache_manager.set(key, analytics, timeout=self.cache_manager.ml_timeout)
+    
+    def get_cached_analytics(self, dataset_version: str) -> Optional[Dict]:
+        """Get cached dataset analytics aggregates."""
+        return self.cache_manager.get(self.get_analytics_key(dataset_version))
+    
+    def get_remaining_matches_key(self, tournament_id: int, tournament_version: str) -> str:
+        """Generate cache key for a live remaining-matches estimate."""
+        return self.cache_manager._generate_cache_key(f"{self.prefix}:remaining", tournament_id, tournament_version)
+    
+    def cache_remaining_matches(self, tournament_id: int, tournament_version: str, estimate: Dict) -> bool:
+        """Cache live remaining-matches estimate for one tournament state."""
+        key = self.get_remaining_matches_key(tournament_id, tournament_version)
+        return self.cache_manager.set(key, estimate, timeout=self.cache_manager.default_timeout)
+    
+    def get_cached_remaining_matches(self, tournament_id: int, tournament_version: str) -> Optional[Dict]:
+        """Get cached live remaining-matches estimate."""
+        return self.cache_manager.get(self.get_remaining_matches_key(tournament_id, tournament_version))
+    
     def invalidate_ml_cache(self) -> bool:
         """Invalidate all ML-related cache entries."""
         pattern = f"{self.prefix}:*"
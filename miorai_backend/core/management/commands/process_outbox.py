@@ -0,0 +1,69 @@
+"""
+Django Management Command: Process Outbox
+Runs the outbox worker that executes queued background events in batches.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import get_outbox_settings, get_queue_depth, process_batch, purge_done, retry_failed
+
+
+class Command(BaseCommand):
+    help = 'Process queued outbox events (tournament completion ML collection, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue once and exit instead of polling',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Events per batch (default: OUTBOX["BATCH_SIZE"])',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print queue depth and exit',
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Requeue events that exhausted their retries',
+        )
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete processed events older than OUTBOX["KEEP_DONE_SECONDS"]',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(get_queue_depth(), indent=2))
+            return
+
+        if options['retry_failed']:
+            self.stdout.write(f'{retry_failed()} failed events requeued')
+        if options['purge']:
+            self.stdout.write(f'{purge_done()} processed events deleted')
+
+        poll_interval = get_outbox_settings()['POLL_INTERVAL']
+        processed = 0
+        try:
+            while True:
+                claimed = process_batch(options['batch_size'])
+                processed += claimed
+                if claimed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f'{processed} events processed'))
@@ -0,0 +1,205 @@
+"""
+Media serving utilities for Miorai project.
+Serves uploaded tournament images with strong validators, long-lived cache
+headers, HTTP Range support and optional hand-off to the front proxy.
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import (
+    Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+import logging
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def get_media_settings() -> dict:
+    """Return media serving settings merged with defaults."""
+    defaults = {
+        'MAX_AGE': 31536000,  # 1 year
+        'UNVERSIONED_MAX_AGE': 0,
+        'ACCEL_REDIRECT_PREFIX': '',
+        'SENDFILE_HEADER': '',
+    }
+    defaults.update(getattr(settings, 'MEDIA_SERVING', {}))
+    return defaults
+
+
+def build_etag(st: os.stat_result) -> str:
+    """Build a strong ETag from file modification time and size."""
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def build_version(st: os.stat_result) -> str:
+    """Build the short version token used in versioned media URLs."""
+    return f"{st.st_mtime_ns:x}{st.st_size:x}"[-12:]
+
+
+@lru_cache(maxsize=4096)
+def _get_media_version(name: str) -> Optional[str]:
+    # Storage never overwrites an existing name, so a name maps to one version.
+    try:
+        return build_version(os.stat(default_storage.path(name)))
+    except (NotImplementedError, OSError, SuspiciousFileOperation):
+        return None
+
+
+def get_versioned_url(file_field) -> str:
+    """Return file URL with a content version query parameter appended."""
+    url = file_field.url
+    version = _get_media_version(file_field.name)
+    if version is None:
+        return url
+    return f"{url}?v={version}"
+
+
+def parse_range_header(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range header.
+
+    Returns (start, end) inclusive, or None if the header is malformed.
+    Raises ValueError if the range is not satisfiable.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+
+    if not start_str:
+        # Suffix range: last N bytes
+        length = int(end_str)
+        if length == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(size - length, 0), size - 1
+
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        raise ValueError('Unsatisfiable range')
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path: str, start: int, length: int):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags
+
+
+def _apply_cache_headers(response, request, etag: str, version: str, st: os.stat_result):
+    media_settings = get_media_settings()
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(st.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if request.GET.get('v') == version:
+        response['Cache-Control'] = f"public, max-age={media_settings['MAX_AGE']}, immutable"
+    else:
+        response['Cache-Control'] = f"public, max-age={media_settings['UNVERSIONED_MAX_AGE']}, must-revalidate"
+    return response
+
+
+def serve_media(request, path):
+    """
+    Serve a file under MEDIA_ROOT.
+
+    - Strong ETag and Last-Modified validators, 304 on If-None-Match
+    - `Cache-Control: immutable` for versioned URLs (?v=<version>)
+    - Single byte Range requests (206 / 416)
+    - X-Accel-Redirect / X-Sendfile hand-off when configured
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return HttpResponse(status=405)
+
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except (SuspiciousFileOperation, ValueError):
+        raise Http404('Dosya bulunamadı')
+
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        raise Http404('Dosya bulunamadı')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('Dosya bulunamadı')
+
+    etag = build_etag(st)
+    version = build_version(st)
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return _apply_cache_headers(HttpResponseNotModified(), request, etag, version, st)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    media_settings = get_media_settings()
+
+    # Hand off the body to the front proxy (nginx / apache) if configured
+    accel_prefix = media_settings['ACCEL_REDIRECT_PREFIX']
+    sendfile_header = media_settings['SENDFILE_HEADER']
+    if accel_prefix or sendfile_header:
+        response = HttpResponse(content_type=content_type)
+        if accel_prefix:
+            response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + path.lstrip('/')
+        else:
+            response[sendfile_header] = full_path
+        return _apply_cache_headers(response, request, etag, version, st)
+
+    size = st.st_size
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range_header(range_header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return _apply_cache_headers(response, request, etag, version, st)
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_file_range(full_path, start, length) if request.method == 'GET' else iter(()),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        length = size
+        response = StreamingHttpResponse(
+            _iter_file_range(full_path, 0, size) if request.method == 'GET' else iter(()),
+            content_type=content_type
+        )
+
+    response['Content-Length'] = str(length)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return _apply_cache_headers(response, request, etag, version, st)
@@ -0,0 +1,147 @@
+"""
+Prometheus metrics for Miorai project.
+Exposes request latency by view, DB query counts, cache hit ratios by key prefix,
+throttle rejections and ML prediction latency in the Prometheus text format.
+
+Multi-worker deployments (gunicorn) must export PROMETHEUS_MULTIPROC_DIR, pointing
+to an empty directory, before the workers start. Each worker then writes its samples
+to its own memory-mapped files without any cross-process locking, and the metrics
+endpoint merges all workers' files at scrape time. Add `child_exit` to the gunicorn
+config so the files of dead workers are cleaned up:
+
+    # gunicorn.conf.py
+    from core.metrics import child_exit  # noqa
+"""
+
+import os
+from collections import defaultdict
+from typing import List, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# Request latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+REQUEST_LATENCY = Histogram(
+    'miorai_http_request_duration_seconds', 'HTTP request latency by view',
+    ['view', 'method', 'status'], buckets=LATENCY_BUCKETS,
+)
+DB_QUERIES = Counter('miorai_db_queries', 'Database queries executed by view', ['view'])
+DB_QUERY_TIME = Counter('miorai_db_query_seconds', 'Time spent in database queries by view', ['view'])
+DB_QUERIES_PER_REQUEST = Histogram(
+    'miorai_db_queries_per_request', 'Database queries per request by view',
+    ['view'], buckets=QUERY_COUNT_BUCKETS,
+)
+DB_SLOW_QUERIES = Counter('miorai_db_slow_queries', 'Queries slower than SLOW_QUERY_THRESHOLD by view', ['view'])
+CACHE_REQUESTS = Counter('miorai_cache_requests', 'Cache lookups by key prefix and result', ['prefix', 'result'])
+THROTTLE_REJECTIONS = Counter('miorai_throttle_rejections', 'Requests rejected by throttling (HTTP 429)', ['view'])
+ML_PREDICTION_LATENCY = Histogram(
+    'miorai_ml_prediction_duration_seconds', 'ML prediction latency',
+    ['kind', 'cache'], buckets=LATENCY_BUCKETS,
+)
+
+UNMATCHED_VIEW = 'unmatched'
+
+
+def multiprocess_dir() -> Optional[str]:
+    """Shared sample directory when running in multiprocess mode."""
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR') or None
+
+
+def cache_prefix(key: str) -> str:
+    """Low-cardinality label for a cache key: its first two segments (e.g. 'ml:prediction')."""
+    return ':'.join(key.split(':', 2)[:2])
+
+
+def record_request(view: Optional[str], method: str, status_code: int, duration: float,
+                   db_queries: int, db_time: float, slow_queries: int = 0):
+    """Record one finished request."""
+    view = view or UNMATCHED_VIEW
+    REQUEST_LATENCY.labels(view, method, str(status_code)).observe(duration)
+    DB_QUERIES.labels(view).inc(db_queries)
+    DB_QUERY_TIME.labels(view).inc(db_time)
+    DB_QUERIES_PER_REQUEST.labels(view).observe(db_queries)
+    if slow_queries:
+        DB_SLOW_QUERIES.labels(view).inc(slow_queries)
+    if status_code == 429:
+        THROTTLE_REJECTIONS.labels(view).inc()
+
+
+def record_cache_lookup(key: str, hits: int, misses: int):
+    """Record cache hits / misses for the key's prefix."""
+    prefix = cache_prefix(key)
+    if hits:
+        CACHE_REQUESTS.labels(prefix, 'hit').inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(prefix, 'miss').inc(misses)
+
+
+def record_cache_lookups(keys: List[str], found):
+    """Record a multi-get: hits / misses aggregated per prefix."""
+    counts = defaultdict(lambda: [0, 0])
+    for key in keys:
+        counts[cache_prefix(key)][0 if key in found else 1] += 1
+    for prefix, (hits, misses) in counts.items():
+        if hits:
+            CACHE_REQUESTS.labels(prefix, 'hit').inc(hits)
+        if misses:
+            CACHE_REQUESTS.labels(prefix, 'miss').inc(misses)
+
+
+def observe_ml_prediction(kind: str, cache_hit: bool, duration: float):
+    """Record the latency of an ML prediction request ('single' or 'batch')."""
+    ML_PREDICTION_LATENCY.labels(kind, 'hit' if cache_hit else 'miss').observe(duration)
+
+
+def cache_hit_ratio_family(families: List) -> GaugeMetricFamily:
+    """Derive per-prefix cache hit ratios from the (possibly multiprocess-merged) cache counters."""
+    counts = defaultdict(lambda: {'hit': 0.0, 'miss': 0.0})
+    for family in families:
+        if family.name != 'miorai_cache_requests':
+            continue
+        for sample in family.samples:
+            if sample.name.endswith('_total'):
+                counts[sample.labels['prefix']][sample.labels['result']] += sample.value
+    gauge = GaugeMetricFamily('miorai_cache_hit_ratio', 'Cache hit ratio by key prefix', labels=['prefix'])
+    for prefix, result in sorted(counts.items()):
+        total = result['hit'] + result['miss']
+        if total:
+            gauge.add_metric([prefix], result['hit'] / total)
+    return gauge
+
+
+class _Snapshot:
+    """Registry-like wrapper over already collected metric families."""
+
+    def __init__(self, families: List):
+        self.families = families
+
+    def collect(self):
+        return iter(self.families)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    Returns:
+        Tuple: (body, content type)
+    """
+    if multiprocess_dir():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    families = list(registry.collect())
+    families.append(cache_hit_ratio_family(families))
+    return generate_latest(_Snapshot(families)), CONTENT_TYPE_LATEST
+
+
+def child_exit(server, worker):
+    """gunicorn hook: drop the live-gauge files of a dead worker."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,3 +1,36 @@
 from django.db import models
 
-# Create your models here.
+
+class OutboxEvent(models.Model):
+    """
+    Durable job queued in the same transaction as the change that produced it.
+    Processed asynchronously by the `process_outbox` management command.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    available_at = models.DateTimeField()  # not before this time (retry backoff / lease expiry)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='core_outbox_status_avail_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic}#{self.id} ({self.status})"
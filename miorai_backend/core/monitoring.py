@@ -3,27 +3,281 @@ Performance monitoring and logging utilities for Miorai project.
 Provides tools for tracking API performance, database queries, and system metrics.
 """
 
+import re
 import time
+import bisect
 import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import wraps
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from django.conf import settings
 from django.core.cache import cache
-from django.db import connection
+from django.db import connections
 from django.http import HttpRequest, HttpResponse
 import json
 import psutil
 import os
 
+from . import metrics as prometheus_metrics
+
 logger = logging.getLogger(__name__)
 
+class RequestMetrics:
+    """Metrics for a single request (or any other unit of work) held in a context variable."""
+    
+    def __init__(self, method: str = '', path: str = ''):
+        self.method = method
+        self.path = path
+        self.route: Optional[str] = None
+        self.status_code: Optional[int] = None
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.slow_query_count = 0
+        # Slow SQL fingerprint -> [count, total seconds]
+        self.slow_queries: Dict[str, List[float]] = {}
+        self.cache_calls: Dict[str, int] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Section name -> accumulated seconds
+        self.sections: Dict[str, float] = {}
+        # Named timers started by PerformanceMonitor.start_timer
+        self.timers: Dict[str, Dict[str, float]] = {}
+        # Baselines pushed by DatabaseMonitor.start_monitoring (nested monitors)
+        self.db_baselines: List[Tuple[int, float, int]] = []
+    
+    def add_section(self, name: str, duration: float):
+        """Accumulate time spent in a named section."""
+        self.sections[name] = self.sections.get(name, 0.0) + duration
+    
+    @contextmanager
+    def section(self, name: str):
+        """Time a block of code as a named section."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_section(name, time.perf_counter() - start)
+    
+    def record_query(self, duration: float, count: int = 1):
+        """Record database queries executed for this request."""
+        self.db_queries += count
+        self.db_time += duration
+    
+    def record_slow_query(self, fingerprint: str, duration: float):
+        """Record a query slower than the threshold under its SQL fingerprint."""
+        self.slow_query_count += 1
+        entry = self.slow_queries.get(fingerprint)
+        if entry is None:
+            self.slow_queries[fingerprint] = [1, duration]
+        else:
+            entry[0] += 1
+            entry[1] += duration
+    
+    def record_cache_call(self, operation: str, hits: int = 0, misses: int = 0):
+        """Record a cache call and its hits / misses."""
+        self.cache_calls[operation] = self.cache_calls.get(operation, 0) + 1
+        self.cache_hits += hits
+        self.cache_misses += misses
+    
+    def finish(self, route: Optional[str] = None, status_code: Optional[int] = None) -> float:
+        """Stop the clock and return the total duration."""
+        self.duration = time.perf_counter() - self.start
+        self.route = route or self.route
+        self.status_code = status_code
+        return self.duration
+
+
+_current_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar('request_metrics', default=None)
+
+
+def get_request_metrics() -> RequestMetrics:
+    """
+    Metrics of the current request.
+    Outside a request (management commands, scripts) a metrics object is created for the current context.
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        metrics = RequestMetrics()
+        _current_metrics.set(metrics)
+    return metrics
+
+
+@contextmanager
+def request_metrics(method: str = '', path: str = ''):
+    """Scope a fresh RequestMetrics to the enclosed block (restored on exit)."""
+    metrics = RequestMetrics(method, path)
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+class LatencyHistogram:
+    """Thread-safe histogram with log-spaced buckets (~19% relative resolution from 1ms to ~65s)."""
+    
+    BOUNDS = tuple(0.001 * 2 ** (i / 4) for i in range(65))
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Add one observation (seconds)."""
+        bucket = bisect.bisect_left(self.BOUNDS, value)
+        with self._lock:
+            self.counts[bucket] += 1
+            self.count += 1
+            self.total += value
+            self.min = min(self.min, value)
+            self.max = max(self.max, value)
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside its bucket (as Prometheus histogram_quantile)."""
+        with self._lock:
+            counts, count, low, high = list(self.counts), self.count, self.min, self.max
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        for bucket, bucket_count in enumerate(counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.BOUNDS[bucket - 1] if bucket > 0 else 0.0
+                upper = self.BOUNDS[bucket] if bucket < len(self.BOUNDS) else high
+                value = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(value, low), high)
+            cumulative += bucket_count
+        return high
+
+
+class EndpointStats:
+    """Aggregated metrics for one route."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = LatencyHistogram()
+        self.db_time = LatencyHistogram()
+        self.requests = 0
+        self.errors = 0
+        self.db_queries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_calls = 0
+        self.sections: Dict[str, List[float]] = {}  # name -> [count, total seconds]
+        self.slow_queries: Dict[str, List[float]] = {}  # fingerprint -> [count, total seconds]
+    
+    def record(self, metrics: RequestMetrics):
+        self.latency.observe(metrics.duration or 0.0)
+        self.db_time.observe(metrics.db_time)
+        with self._lock:
+            self.requests += 1
+            if metrics.status_code is not None and metrics.status_code >= 500:
+                self.errors += 1
+            self.db_queries += metrics.db_queries
+            self.cache_hits += metrics.cache_hits
+            self.cache_misses += metrics.cache_misses
+            self.cache_calls += sum(metrics.cache_calls.values())
+            for name, duration in metrics.sections.items():
+                section = self.sections.setdefault(name, [0, 0.0])
+                section[0] += 1
+                section[1] += duration
+            for fingerprint, (count, duration) in metrics.slow_queries.items():
+                slow = self.slow_queries.get(fingerprint)
+                if slow is None:
+                    if len(self.slow_queries) >= MAX_SLOW_FINGERPRINTS:
+                        continue
+                    slow = self.slow_queries[fingerprint] = [0, 0.0]
+                slow[0] += count
+                slow[1] += duration
+    
+    def summary(self) -> Dict[str, Any]:
+        def ms(value):
+            return round(value * 1000, 3) if value is not None else None
+        
+        with self._lock:
+            requests = self.requests
+            summary = {
+                'requests': requests,
+                'errors': self.errors,
+                'avg_db_queries': round(self.db_queries / requests, 2) if requests else 0,
+                'cache_calls': self.cache_calls,
+                'cache_hit_ratio': (
+                    round(self.cache_hits / (self.cache_hits + self.cache_misses), 4)
+                    if self.cache_hits + self.cache_misses else None
+                ),
+                'sections': {
+                    name: {'count': count, 'avg_ms': ms(total / count)}
+                    for name, (count, total) in sorted(self.sections.items())
+                },
+                'slow_queries': [
+                    {'fingerprint': fingerprint, 'count': count, 'avg_ms': ms(total / count)}
+                    for fingerprint, (count, total) in sorted(
+                        self.slow_queries.items(), key=lambda item: item[1][1], reverse=True
+                    )[:5]
+                ],
+            }
+        summary['latency_ms'] = {
+            'p50': ms(self.latency.quantile(0.5)),
+            'p95': ms(self.latency.quantile(0.95)),
+            'p99': ms(self.latency.quantile(0.99)),
+            'avg': ms(self.latency.total / requests) if requests else None,
+            'max': ms(self.latency.max) if requests else None,
+        }
+        summary['db_time_ms'] = {
+            'p50': ms(self.db_time.quantile(0.5)),
+            'p95': ms(self.db_time.quantile(0.95)),
+            'p99': ms(self.db_time.quantile(0.99)),
+        }
+        return summary
+
+
+class EndpointMetrics:
+    """Per-route histograms aggregated from finished RequestMetrics (process-wide, thread-safe)."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+    
+    def record(self, metrics: RequestMetrics):
+        """Aggregate a finished request (unresolved paths share one label, as in the Prometheus metrics)."""
+        key = f"{metrics.method} {metrics.route or prometheus_metrics.UNMATCHED_VIEW}".strip()
+        stats = self._endpoints.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._endpoints.setdefault(key, EndpointStats())
+        stats.record(metrics)
+    
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Summary (p50/p95/p99 latency, DB and cache usage) per route."""
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        return {key: stats.summary() for key, stats in sorted(endpoints.items())}
+    
+    def reset(self):
+        """Drop all aggregated data."""
+        with self._lock:
+            self._endpoints = {}
+
+
 class PerformanceMonitor:
-    """Monitor and track performance metrics."""
+    """Monitor and track performance metrics (timers live in the current request's metrics)."""
     
     def __init__(self):
-        self.metrics = {}
         self.thresholds = getattr(settings, 'PERFORMANCE_MONITORING', {})
     
+    @property
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Timers of the current request."""
+        return get_request_metrics().timers
+    
     def start_timer(self, operation: str) -> float:
         """Start timing an operation."""
         start_time = time.time()
@@ -32,13 +286,15 @@ class PerformanceMonitor:
     
     def end_timer(self, operation: str) -> float:
         """End timing an operation and log if threshold exceeded."""
-        if operation not in self.metrics:
+        metrics = get_request_metrics()
+        if operation not in metrics.timers:
             return 0
         
         end_time = time.time()
-        duration = end_time - self.metrics[operation]['start']
-        self.metrics[operation]['duration'] = duration
-        self.metrics[operation]['end'] = end_time
+        duration = end_time - metrics.timers[operation]['start']
+        metrics.timers[operation]['duration'] = duration
+        metrics.timers[operation]['end'] = end_time
+        metrics.add_section(operation, duration)
         
         # Check thresholds
         threshold = self.thresholds.get('API_RESPONSE_TIME_THRESHOLD', 0.5)
@@ -48,49 +304,90 @@ class PerformanceMonitor:
         return duration
     
     def get_metrics(self) -> Dict[str, Any]:
-        """Get all collected metrics."""
+        """Get the current request's timers."""
         return self.metrics.copy()
     
     def reset_metrics(self):
-        """Reset all metrics."""
+        """Reset the current request's timers."""
         self.metrics.clear()
 
-class DatabaseMonitor:
-    """Monitor database query performance."""
+# SQL fingerprinting: literals and placeholders become '?', IN lists collapse
+_SQL_PLACEHOLDER = re.compile(r"%s|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SQL_WHITESPACE = re.compile(r"\s+")
+MAX_FINGERPRINT_LENGTH = 300
+MAX_SLOW_FINGERPRINTS = 50  # per route
+
+
+def fingerprint_sql(sql: str) -> str:
+    """Normalise SQL so queries differing only in literals / parameters share a fingerprint."""
+    sql = _SQL_PLACEHOLDER.sub('?', sql)
+    sql = _SQL_IN_LIST.sub('(...)', sql)
+    return _SQL_WHITESPACE.sub(' ', sql).strip()[:MAX_FINGERPRINT_LENGTH]
+
+
+class QueryInstrument:
+    """
+    Database execute wrapper recording every query into the current RequestMetrics.
+    Works with DEBUG off (unlike connection.queries) and costs O(1) per query;
+    only queries slower than the threshold are fingerprinted and logged.
+    """
     
-    def __init__(self):
-        self.query_count = 0
-        self.query_time = 0
-        self.slow_queries = []
-        self.threshold = getattr(settings, 'PERFORMANCE_MONITORING', {}).get('SLOW_QUERY_THRESHOLD', 1.0)
+    def __init__(self, threshold: Optional[float] = None):
+        if threshold is None:
+            threshold = getattr(settings, 'PERFORMANCE_MONITORING', {}).get('SLOW_QUERY_THRESHOLD', 1.0)
+        self.threshold = threshold
+    
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            metrics = get_request_metrics()
+            metrics.record_query(duration)
+            if duration > self.threshold:
+                fingerprint = fingerprint_sql(sql)
+                metrics.record_slow_query(fingerprint, duration)
+                logger.warning(f"Slow query detected: {duration:.3f}s - {fingerprint}")
+
+
+query_instrument = QueryInstrument()
+
+
+def install_query_instrumentation(sender=None, connection=None, **kwargs):
+    """
+    Install the query instrument on a database connection (idempotent).
+    Connected to the connection_created signal in CoreConfig.ready; without
+    arguments it instruments all connections of the current thread.
+    """
+    targets = [connection] if connection is not None else connections.all()
+    for conn in targets:
+        if query_instrument not in conn.execute_wrappers:
+            conn.execute_wrappers.append(query_instrument)
+
+
+class DatabaseMonitor:
+    """Monitor database query performance (baselines are kept per request, so nested monitors work)."""
     
     def start_monitoring(self):
         """Start monitoring database queries."""
-        self.query_count = len(connection.queries)
-        self.query_time = sum(float(q['time']) for q in connection.queries)
+        metrics = get_request_metrics()
+        metrics.db_baselines.append((metrics.db_queries, metrics.db_time, metrics.slow_query_count))
     
     def end_monitoring(self) -> Dict[str, Any]:
-        """End monitoring and return statistics."""
-        final_query_count = len(connection.queries)
-        final_query_time = sum(float(q['time']) for q in connection.queries)
-        
-        new_queries = final_query_count - self.query_count
-        new_query_time = final_query_time - self.query_time
+        """End monitoring and return statistics (recorded by the query instrument)."""
+        metrics = get_request_metrics()
+        baselines = metrics.db_baselines
+        start_count, start_time, start_slow = baselines.pop() if baselines else (0, 0.0, 0)
         
-        # Check for slow queries
-        slow_queries = [
-            q for q in connection.queries[self.query_count:]
-            if float(q['time']) > self.threshold
-        ]
-        
-        if slow_queries:
-            for query in slow_queries:
-                logger.warning(f"Slow query detected: {query['time']}s - {query['sql'][:100]}...")
+        new_queries = metrics.db_queries - start_count
+        new_query_time = metrics.db_time - start_time
         
         return {
             'query_count': new_queries,
             'query_time': new_query_time,
-            'slow_queries': len(slow_queries),
+            'slow_queries': metrics.slow_query_count - start_slow,
             'avg_query_time': new_query_time / new_queries if new_queries > 0 else 0
         }
 
@@ -143,6 +440,7 @@ class CacheMonitor:
             return {}
 
 # Global monitor instances
+endpoint_metrics = EndpointMetrics()
 performance_monitor = PerformanceMonitor()
 db_monitor = DatabaseMonitor()
 system_monitor = SystemMonitor()
@@ -164,7 +462,7 @@ def monitor_performance(operation_name: Optional[str] = None):
                 result = func(*args, **kwargs)
                 return result
             finally:
-                # End monitoring
+                # End monitoring (end_timer also records the section)
                 duration = performance_monitor.end_timer(op_name)
                 db_stats = db_monitor.end_monitoring()
                 
@@ -191,6 +489,7 @@ def monitor_api_performance(view_func):
             # End monitoring
             duration = time.time() - start_time
             db_stats = db_monitor.end_monitoring()
+            get_request_metrics().add_section(view_func.__qualname__, duration)
             
             # Log API performance
             logger.info(f"API Performance: {request.path} - Method: {request.method} - "
@@ -205,6 +504,13 @@ def monitor_api_performance(view_func):
     return wrapper
 
 # Middleware for automatic performance monitoring
+def resolve_route(request: HttpRequest) -> Optional[str]:
+    """URL pattern of the resolved view (e.g. 'api/tournaments/<int:pk>/'), so routes aggregate across ids."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    return match.route or match.view_name
+
 class PerformanceMonitoringMiddleware:
     """Django middleware for automatic performance monitoring."""
     
@@ -212,27 +518,30 @@ class PerformanceMonitoringMiddleware:
         self.get_response = get_response
     
     def __call__(self, request):
-        # Start monitoring
-        start_time = time.time()
-        db_monitor.start_monitoring()
-        
-        # Process request
-        response = self.get_response(request)
-        
-        # End monitoring
-        duration = time.time() - start_time
-        db_stats = db_monitor.end_monitoring()
-        
-        # Log request performance
-        logger.info(f"Request Performance: {request.path} - Method: {request.method} - "
-                  f"Duration: {duration:.3f}s - Status: {response.status_code} - "
-                  f"DB Queries: {db_stats['query_count']}")
-        
-        # Add performance headers
-        response['X-Response-Time'] = f"{duration:.3f}s"
-        response['X-DB-Queries'] = str(db_stats['query_count'])
-        
-        return response
+        # Each request gets its own metrics in the current context
+        # (queries are recorded into it by the query instrument)
+        with request_metrics(request.method, request.path) as metrics:
+            response = None
+            try:
+                response = self.get_response(request)
+            finally:
+                duration = metrics.finish(resolve_route(request), getattr(response, 'status_code', 500))
+                endpoint_metrics.record(metrics)
+                prometheus_metrics.record_request(
+                    metrics.route, request.method, metrics.status_code, duration,
+                    metrics.db_queries, metrics.db_time, metrics.slow_query_count
+                )
+            
+            # Log request performance
+            logger.info(f"Request Performance: {request.path} - Method: {request.method} - "
+                      f"Duration: {duration:.3f}s - Status: {response.status_code} - "
+                      f"DB Queries: {metrics.db_queries}")
+            
+            # Add performance headers
+            response['X-Response-Time'] = f"{duration:.3f}s"
+            response['X-DB-Queries'] = str(metrics.db_queries)
+            
+            return response
 
 # Utility functions for logging
 def log_user_action(user_id: int, action: str, details: Dict[str, Any] = None):
@@ -0,0 +1,163 @@
+"""
+Transactional outbox for Miorai project.
+Work that does not need to finish inside the request (e.g. ML data collection
+on tournament completion) is stored as an OutboxEvent row and processed in
+batches by the `process_outbox` management command, with retries and backoff.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+from typing import Callable, Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+import logging
+
+from .models import OutboxEvent
+
+logger = logging.getLogger('miorai')
+
+# topic -> handler(payloads: List[dict])
+_handlers: Dict[str, Callable[[List[dict]], None]] = {}
+
+
+def get_outbox_settings() -> dict:
+    """Return outbox settings merged with defaults."""
+    defaults = {
+        'BATCH_SIZE': 100,
+        'MAX_ATTEMPTS': 5,
+        'RETRY_BACKOFF': 30,  # seconds, doubled on every attempt
+        'LEASE_SECONDS': 300,  # claimed batches are retried after this if the worker dies
+        'POLL_INTERVAL': 2.0,
+        'KEEP_DONE_SECONDS': 7 * 24 * 3600,
+    }
+    defaults.update(getattr(settings, 'OUTBOX', {}))
+    return defaults
+
+
+def register_handler(topic: str):
+    """
+    Decorator registering a batch handler for a topic.
+    The handler receives the payloads of one batch; raising marks the whole
+    batch for retry, so handlers must be idempotent.
+    """
+    def decorator(func):
+        _handlers[topic] = func
+        return func
+    return decorator
+
+
+def enqueue(topic: str, payload: dict) -> OutboxEvent:
+    """Queue an event. Call inside the producing transaction to make it atomic with the change."""
+    return OutboxEvent.objects.create(topic=topic, payload=payload, available_at=timezone.now())
+
+
+def claim_batch(batch_size: int) -> List[OutboxEvent]:
+    """
+    Lease up to `batch_size` due events.
+    Rows are locked with SKIP LOCKED where supported, so several workers can run.
+    Every claim counts as an attempt, so an event whose lease keeps expiring
+    (e.g. it kills the worker) is marked failed after MAX_ATTEMPTS deliveries.
+    """
+    outbox_settings = get_outbox_settings()
+    now = timezone.now()
+    lease = timedelta(seconds=outbox_settings['LEASE_SECONDS'])
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[OutboxEvent.STATUS_PENDING, OutboxEvent.STATUS_PROCESSING], available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+        exhausted = [event for event in events if event.attempts >= outbox_settings['MAX_ATTEMPTS']]
+        if exhausted:
+            logger.error(f"Outbox lease expired for {len(exhausted)} events after the last attempt")
+            OutboxEvent.objects.filter(id__in=[event.id for event in exhausted]).update(
+                status=OutboxEvent.STATUS_FAILED, last_error='Lease expired without completion'
+            )
+        events = [event for event in events if event.attempts < outbox_settings['MAX_ATTEMPTS']]
+        if events:
+            OutboxEvent.objects.filter(id__in=[event.id for event in events]).update(
+                status=OutboxEvent.STATUS_PROCESSING, available_at=now + lease, attempts=F('attempts') + 1
+            )
+            for event in events:
+                event.attempts += 1
+    return events
+
+
+def process_batch(batch_size: int = None) -> int:
+    """
+    Claim one batch and run the handlers, grouped by topic.
+
+    Returns the number of events claimed.
+    """
+    outbox_settings = get_outbox_settings()
+    events = claim_batch(batch_size or outbox_settings['BATCH_SIZE'])
+    by_topic = defaultdict(list)
+    for event in events:
+        by_topic[event.topic].append(event)
+
+    for topic, topic_events in by_topic.items():
+        handler = _handlers.get(topic)
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler registered for topic '{topic}'")
+            handler([event.payload for event in topic_events])
+        except Exception as e:
+            logger.error(f"Outbox batch failed for {topic} ({len(topic_events)} events): {e}")
+            _schedule_retry(topic_events, str(e), outbox_settings)
+        else:
+            OutboxEvent.objects.filter(id__in=[event.id for event in topic_events]).update(
+                status=OutboxEvent.STATUS_DONE, processed_at=timezone.now(), last_error=''
+            )
+    return len(events)
+
+
+def _schedule_retry(events: List[OutboxEvent], error: str, outbox_settings: dict):
+    now = timezone.now()
+    # attempts was already incremented when the batch was claimed
+    for event in events:
+        event.last_error = error[:2000]
+        if event.attempts >= outbox_settings['MAX_ATTEMPTS']:
+            event.status = OutboxEvent.STATUS_FAILED
+        else:
+            event.status = OutboxEvent.STATUS_PENDING
+            event.available_at = now + timedelta(
+                seconds=outbox_settings['RETRY_BACKOFF'] * 2 ** (event.attempts - 1)
+            )
+    OutboxEvent.objects.bulk_update(events, ['last_error', 'status', 'available_at'])
+
+
+def retry_failed(topic: str = None) -> int:
+    """Put failed events back in the queue. Returns the number of events requeued."""
+    queryset = OutboxEvent.objects.filter(status=OutboxEvent.STATUS_FAILED)
+    if topic:
+        queryset = queryset.filter(topic=topic)
+    return queryset.update(status=OutboxEvent.STATUS_PENDING, attempts=0, available_at=timezone.now())
+
+
+def purge_done(older_than_seconds: int = None) -> int:
+    """Delete processed events older than the retention window."""
+    seconds = older_than_seconds if older_than_seconds is not None else get_outbox_settings()['KEEP_DONE_SECONDS']
+    cutoff = timezone.now() - timedelta(seconds=seconds)
+    deleted, _ = OutboxEvent.objects.filter(status=OutboxEvent.STATUS_DONE, processed_at__lt=cutoff).delete()
+    return deleted
+
+
+def get_queue_depth() -> dict:
+    """Return event counts per topic and status plus the age of the oldest pending event."""
+    depth = defaultdict(dict)
+    rows = OutboxEvent.objects.exclude(status=OutboxEvent.STATUS_DONE).values('topic', 'status').annotate(
+        count=Count('id')
+    )
+    for row in rows:
+        depth[row['topic']][row['status']] = row['count']
+
+    oldest = OutboxEvent.objects.filter(status=OutboxEvent.STATUS_PENDING).aggregate(oldest=Min('created_at'))['oldest']
+    return {
+        'topics': dict(depth),
+        'pending': sum(counts.get(OutboxEvent.STATUS_PENDING, 0) for counts in depth.values()),
+        'failed': sum(counts.get(OutboxEvent.STATUS_FAILED, 0) for counts in depth.values()),
+        'oldest_pending_seconds': (timezone.now() - oldest).total_seconds() if oldest else 0,
+    }
@@ -1,3 +1,314 @@
-from django.test import TestCase
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 
-# Create your tests here.
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .cache import CacheManager
+from .metrics import render_metrics
+from .media import parse_range_header
+from .monitoring import (
+    DatabaseMonitor, EndpointMetrics, LatencyHistogram, fingerprint_sql, get_request_metrics, query_instrument,
+    request_metrics
+)
+from .models import OutboxEvent
+from .outbox import claim_batch, enqueue, get_queue_depth, process_batch, register_handler, retry_failed
+
+
+class MediaServingTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.media_root, 'tournament_images'))
+        self.content = b'0123456789' * 10
+        with open(os.path.join(self.media_root, 'tournament_images', 'test.png'), 'wb') as f:
+            f.write(self.content)
+        self.url = '/media/tournament_images/test.png'
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_serves_file_with_validators(self):
+        """Test dosya ETag ve Last-Modified ile sunulur"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_if_none_match_returns_304(self):
+        """Test eşleşen ETag ile 304 döner"""
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_versioned_url_is_immutable(self):
+        """Test versiyonlu URL immutable cache header'ı alır"""
+        response = self.client.get(self.url)
+        version = response['ETag'].strip('"').replace('-', '')[-12:]
+        response = self.client.get(self.url, {'v': version})
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_range_request(self):
+        """Test Range isteği 206 ile kısmi içerik döndürür"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), self.content[10:20])
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.content)}')
+
+    def test_unsatisfiable_range(self):
+        """Test karşılanamayan Range isteği 416 döner"""
+        response = self.client.get(self.url, HTTP_RANGE='bytes=500-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_accel_redirect_handoff(self):
+        """Test X-Accel-Redirect ile proxy'ye devir"""
+        with self.settings(MEDIA_SERVING={'ACCEL_REDIRECT_PREFIX': '/protected-media/'}):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/tournament_images/test.png')
+        self.assertEqual(response.content, b'')
+
+    def test_path_traversal_rejected(self):
+        """Test MEDIA_ROOT dışına erişim engellenir"""
+        response = self.client.get('/media/../manage.py')
+        self.assertEqual(response.status_code, 404)
+
+    def test_parse_range_header(self):
+        """Test Range header ayrıştırma"""
+        self.assertEqual(parse_range_header('bytes=0-', 100), (0, 99))
+        self.assertEqual(parse_range_header('bytes=-10', 100), (90, 99))
+        self.assertIsNone(parse_range_header('items=0-1', 100))
+        with self.assertRaises(ValueError):
+            parse_range_header('bytes=100-', 100)
+
+
+@override_settings(OUTBOX={'MAX_ATTEMPTS': 2, 'RETRY_BACKOFF': 0})
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.batches = []
+        self.fail = False
+
+        @register_handler('test.topic')
+        def handler(payloads):
+            if self.fail:
+                raise RuntimeError('boom')
+            self.batches.append(payloads)
+
+    def test_events_processed_in_one_batch(self):
+        """Events of the same topic are handled in a single batch"""
+        enqueue('test.topic', {'id': 1})
+        enqueue('test.topic', {'id': 2})
+        self.assertEqual(get_queue_depth()['pending'], 2)
+
+        self.assertEqual(process_batch(), 2)
+        self.assertEqual(self.batches, [[{'id': 1}, {'id': 2}]])
+        self.assertEqual(get_queue_depth()['pending'], 0)
+        self.assertEqual(process_batch(), 0)
+
+    def test_failed_batch_is_retried_then_marked_failed(self):
+        """Failing events are retried and parked after MAX_ATTEMPTS"""
+        self.fail = True
+        event = enqueue('test.topic', {'id': 1})
+
+        process_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.STATUS_PENDING)
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('boom', event.last_error)
+
+        process_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.STATUS_FAILED)
+        self.assertEqual(get_queue_depth()['failed'], 1)
+
+        self.fail = False
+        self.assertEqual(retry_failed(), 1)
+        process_batch()
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.STATUS_DONE)
+
+    def test_expired_lease_is_reclaimed(self):
+        """Events claimed by a worker that died are picked up again"""
+        event = enqueue('test.topic', {'id': 1})
+        OutboxEvent.objects.filter(id=event.id).update(
+            status=OutboxEvent.STATUS_PROCESSING, available_at=timezone.now()
+        )
+        self.assertEqual(process_batch(), 1)
+        self.assertEqual(self.batches, [[{'id': 1}]])
+
+    def test_repeatedly_expired_lease_is_marked_failed(self):
+        """Every claim counts as an attempt, so a worker-killing event is parked"""
+        event = enqueue('test.topic', {'id': 1})
+        for attempts in (1, 2):
+            self.assertEqual(len(claim_batch(10)), 1)
+            event.refresh_from_db()
+            self.assertEqual(event.attempts, attempts)
+            # The worker dies: the lease runs out without a result
+            OutboxEvent.objects.filter(id=event.id).update(available_at=timezone.now())
+
+        self.assertEqual(claim_batch(10), [])
+        event.refresh_from_db()
+        self.assertEqual(event.status, OutboxEvent.STATUS_FAILED)
+        self.assertEqual(get_queue_depth()['failed'], 1)
+
+
+class RequestMetricsTest(TestCase):
+    def test_histogram_quantiles(self):
+        """Bucketed quantiles stay within the bucket resolution of the exact values"""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.quantile(0.5))
+        for ms in range(1, 1001):
+            histogram.observe(ms / 1000)
+        for q in (0.5, 0.95, 0.99):
+            self.assertAlmostEqual(histogram.quantile(q), q, delta=q * 0.2)
+        self.assertEqual(histogram.quantile(1.0), 1.0)
+
+    def test_concurrent_requests_are_isolated(self):
+        """Metrics recorded by interleaved threads stay with their own request"""
+        endpoints = EndpointMetrics()
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def worker(i):
+            with request_metrics('GET', f'/worker/{i % 2}/') as metrics:
+                barrier.wait()
+                for _ in range(i):
+                    get_request_metrics().record_query(0.001)
+                    CacheManager().get(f'missing-{i}')
+                with metrics.section('work'):
+                    barrier.wait()
+                metrics.finish(route=f'worker/{i % 2}/', status_code=200)
+                endpoints.record(metrics)
+                results[i] = (metrics.db_queries, metrics.cache_misses, metrics.cache_calls.get('get', 0))
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: (i, i, i) for i in range(8)})
+        report = endpoints.report()
+        self.assertEqual(sorted(report), ['GET worker/0/', 'GET worker/1/'])
+        self.assertEqual(sum(route['requests'] for route in report.values()), 8)
+        self.assertEqual(report['GET worker/1/']['avg_db_queries'], (1 + 3 + 5 + 7) / 4)
+        self.assertEqual(report['GET worker/0/']['sections']['work']['count'], 4)
+
+    def test_unresolved_paths_share_one_label(self):
+        """Requests that match no route are aggregated under 'unmatched', not their raw path"""
+        endpoints = EndpointMetrics()
+        for path in ('/no-such/1/', '/no-such/2/'):
+            with request_metrics('GET', path) as metrics:
+                metrics.finish(status_code=404)
+                endpoints.record(metrics)
+        report = endpoints.report()
+        self.assertEqual(list(report), ['GET unmatched'])
+        self.assertEqual(report['GET unmatched']['requests'], 2)
+
+    def test_performance_metrics_reports_routes(self):
+        """The middleware aggregates requests by URL pattern with p50/p95/p99 latency"""
+        self.client.post('/api/core/monitoring/reset-metrics/')
+        for _ in range(3):
+            self.assertEqual(self.client.get('/api/core/health/').status_code, 200)
+
+        response = self.client.get('/api/core/monitoring/performance-metrics/')
+        self.assertEqual(response.status_code, 200)
+        route = response.json()['endpoints']['GET api/core/health/']
+        self.assertEqual(route['requests'], 3)
+        self.assertEqual(set(route['latency_ms']), {'p50', 'p95', 'p99', 'avg', 'max'})
+        self.assertLessEqual(route['latency_ms']['p50'], route['latency_ms']['p99'])
+
+
+class PrometheusMetricsTest(TestCase):
+    """Tests for the Prometheus scrape endpoint"""
+
+    def test_metrics_endpoint_exposes_view_latency(self):
+        """Request latency, DB queries and throttle counters are labelled by URL pattern"""
+        self.assertEqual(self.client.get('/api/core/health/').status_code, 200)
+
+        response = self.client.get('/api/core/metrics/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('miorai_http_request_duration_seconds_bucket{', body)
+        self.assertIn('view="api/core/health/"', body)
+        self.assertIn('miorai_db_queries_per_request_count{view="api/core/health/"}', body)
+
+    def test_cache_hit_ratio_by_prefix(self):
+        """Cache lookups are counted per key prefix and exposed as a hit ratio"""
+        manager = CacheManager()
+        manager.set('prom-test:a:1', 1)
+        manager.get('prom-test:a:1')
+        manager.get('prom-test:a:2')
+        manager.get_many(['prom-test:a:1', 'prom-test:a:3'])
+
+        body = render_metrics()[0].decode()
+        self.assertIn('miorai_cache_requests_total{prefix="prom-test:a",result="hit"} 2.0', body)
+        self.assertIn('miorai_cache_hit_ratio{prefix="prom-test:a"} 0.5', body)
+
+    def test_multiprocess_mode_merges_workers(self):
+        """Samples written by separate worker processes are merged at scrape time"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=directory)
+        cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        def run(code):
+            return subprocess.run(
+                [sys.executable, '-c', code], env=env, cwd=cwd, check=True, capture_output=True, text=True
+            ).stdout
+
+        for _ in range(2):
+            run("from core.metrics import record_cache_lookup; record_cache_lookup('ml:prediction:5', 3, 1)")
+        body = run("from core.metrics import render_metrics; print(render_metrics()[0].decode())")
+        self.assertIn('miorai_cache_requests_total{prefix="ml:prediction",result="hit"} 6.0', body)
+        self.assertIn('miorai_cache_hit_ratio{prefix="ml:prediction"} 0.75', body)
+
+
+@override_settings(DEBUG=False)
+class QueryInstrumentationTest(TestCase):
+    """Tests for execute_wrapper based query counting"""
+
+    def test_middleware_counts_queries_without_debug(self):
+        """Queries are counted per request even though connection.queries stays empty"""
+        response = self.client.get('/api/core/health/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(int(response['X-DB-Queries']), 1)
+        self.assertEqual(len(connection.queries), 0)
+
+    def test_fingerprint_sql(self):
+        """Literals, parameters and IN lists are normalised"""
+        self.assertEqual(
+            fingerprint_sql("SELECT *  FROM t1 WHERE id IN (%s, %s, %s) AND name = 'it''s' LIMIT 21"),
+            "SELECT * FROM t1 WHERE id IN (...) AND name = ? LIMIT ?"
+        )
+
+    def test_slow_queries_grouped_by_fingerprint(self):
+        """Nested monitors see their own queries; slow queries share a fingerprint"""
+        monitor = DatabaseMonitor()
+        threshold = query_instrument.threshold
+        self.addCleanup(setattr, query_instrument, 'threshold', threshold)
+        query_instrument.threshold = -1.0
+
+        with request_metrics('GET', '/sql/') as metrics:
+            monitor.start_monitoring()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT %s, 'a'", [1])
+                monitor.start_monitoring()
+                cursor.execute("SELECT %s, 'bcd'", [2])
+                inner = monitor.end_monitoring()
+            outer = monitor.end_monitoring()
+
+        self.assertEqual((inner['query_count'], inner['slow_queries']), (1, 1))
+        self.assertEqual((outer['query_count'], outer['slow_queries']), (2, 2))
+        self.assertEqual(list(metrics.slow_queries), ["SELECT ?, ?"])
+        self.assertEqual(metrics.slow_queries["SELECT ?, ?"][0], 2)
@@ -14,6 +14,10 @@ urlpatterns = [
     path('monitoring/system-stats/', views.system_stats, name='system_stats'),
     path('monitoring/performance-metrics/', views.performance_metrics, name='performance_metrics'),
     path('monitoring/cache-status/', views.cache_status, name='cache_status'),
+    path('monitoring/outbox/', views.outbox_status, name='outbox_status'),
+    
+    # Prometheus scrape endpoint
+    path('metrics/', views.prometheus_metrics, name='prometheus_metrics'),
     
     # Cache management endpoints
     path('cache/clear/', views.clear_cache, name='clear_cache'),
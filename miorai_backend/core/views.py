@@ -6,10 +6,14 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.core.cache import cache
 from django.db import connection
-from .monitoring import check_system_health, system_monitor, cache_monitor, performance_monitor
+from django.http import HttpResponse
+from .metrics import render_metrics
+from .monitoring import check_system_health, system_monitor, cache_monitor, performance_monitor, endpoint_metrics
 from .cache import cache_manager
+from .outbox import get_queue_depth
 import logging
 
 logger = logging.getLogger(__name__)
@@ -94,20 +98,20 @@ def system_stats(request):
 def performance_metrics(request):
     """
     Get performance metrics for the application.
-    Returns API response times, database query statistics, and cache performance.
+    Returns p50/p95/p99 latency, database and cache usage per route, and backend cache performance.
     """
     try:
-        # Get recent performance metrics
-        metrics = performance_monitor.get_metrics()
+        thresholds = getattr(settings, 'PERFORMANCE_MONITORING', {})
         
         # Get cache hit ratio
-        cache_hits = cache_monitor.get_cache_stats().get('keyspace_hits', 0)
-        cache_misses = cache_monitor.get_cache_stats().get('keyspace_misses', 0)
+        cache_stats = cache_monitor.get_cache_stats()
+        cache_hits = cache_stats.get('keyspace_hits', 0)
+        cache_misses = cache_stats.get('keyspace_misses', 0)
         total_requests = cache_hits + cache_misses
         cache_hit_ratio = cache_hits / total_requests if total_requests > 0 else 0
         
         return Response({
-            'performance_metrics': metrics,
+            'endpoints': endpoint_metrics.report(),
             'cache_performance': {
                 'hit_ratio': cache_hit_ratio,
                 'hits': cache_hits,
@@ -115,9 +119,9 @@ def performance_metrics(request):
                 'total_requests': total_requests
             },
             'thresholds': {
-                'api_response_time': 0.5,  # seconds
-                'slow_query_threshold': 1.0,  # seconds
-                'cache_hit_ratio_threshold': 0.8  # 80%
+                'api_response_time': thresholds.get('API_RESPONSE_TIME_THRESHOLD', 0.5),  # seconds
+                'slow_query_threshold': thresholds.get('SLOW_QUERY_THRESHOLD', 1.0),  # seconds
+                'cache_hit_ratio_threshold': thresholds.get('CACHE_HIT_RATIO_THRESHOLD', 0.8)  # 80%
             }
         })
     except Exception as e:
@@ -127,6 +131,30 @@ def performance_metrics(request):
             'details': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint.
+    Returns all application metrics in the Prometheus text format (merged across workers in multiprocess mode).
+    """
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def outbox_status(request):
+    """
+    Get background job queue depth.
+    Returns pending / failed counts per topic and the age of the oldest pending event.
+    """
+    try:
+        return Response(get_queue_depth())
+    except Exception as e:
+        logger.error(f"Error getting outbox status: {e}")
+        return Response({
+            'error': 'Failed to retrieve outbox status',
+            'details': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def reset_metrics(request):
@@ -135,6 +163,7 @@ def reset_metrics(request):
     Clears all collected performance data.
     """
     try:
+        endpoint_metrics.reset()
         performance_monitor.reset_metrics()
         return Response({
             'message': 'Performance metrics reset successfully',
@@ -147,6 +147,16 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Media serving (core.media.serve_media)
+# ACCEL_REDIRECT_PREFIX: nginx internal location, e.g. '/protected-media/'
+# SENDFILE_HEADER: e.g. 'X-Sendfile' for Apache mod_xsendfile
+MEDIA_SERVING = {
+    'MAX_AGE': 31536000,  # 1 year for versioned URLs
+    'UNVERSIONED_MAX_AGE': 0,
+    'ACCEL_REDIRECT_PREFIX': os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', ''),
+    'SENDFILE_HEADER': os.environ.get('MEDIA_SENDFILE_HEADER', ''),
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -372,6 +382,25 @@ PERFORMANCE_MONITORING = {
     'CACHE_HIT_RATIO_THRESHOLD': 0.8,  # 80%
 }
 
+# ML Predictor (ml.registry)
+ML_PREDICTOR = {
+    'RELOAD_INTERVAL': 5.0,  # seconds between dataset mtime checks, 0 disables hot reload
+    'COMPACT_THRESHOLD_BYTES': 1024 * 1024,  # compact_ml_dataset --if-needed threshold for the append log
+    'ROLLOUT_SIMULATIONS': 256,  # rollouts per live remaining-matches estimate
+    'ROLLOUT_WORK_LIMIT': 5 * 10**7,  # rollouts x N^3 budget; fewer rollouts for very large tournaments
+    'WARM_MAX_N': 256,  # largest n precomputed by the prediction cache warm-up
+}
+
+# Outbox (background jobs processed by `manage.py process_outbox`)
+OUTBOX = {
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 30,  # seconds, doubled per attempt
+    'LEASE_SECONDS': 300,
+    'POLL_INTERVAL': 2.0,
+    'KEEP_DONE_SECONDS': 7 * 24 * 3600,
+}
+
 # Database Query Optimization
 DATABASE_OPTIMIZATION = {
     'QUERY_TIMEOUT': 30,  # seconds
@@ -15,9 +15,9 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from core.media import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,11 +25,11 @@ urlpatterns = [
     path('api/tournaments/', include('tournaments.urls')),
     path('api/ml/', include('ml.urls')),
     path('api/core/', include('core.urls')),  # Core monitoring endpoints
+    # Media files (ETag/Range/immutable cache headers, X-Accel-Redirect hand-off)
+    re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media, name='media'),
 ]
 
-# Serve media files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     # Debug toolbar URLs
     import debug_toolbar
     urlpatterns += [
@@ -0,0 +1,138 @@
+"""
+Veri Seti Analitiği
+Bu modül, analiz endpoint'lerinin (DatasetInfo, UserTournamentStats,
+DatasetComparison) ihtiyaç duyduğu N, kategori ve kaynak bazlı toplamları
+MomentIndex tablolarından üretir. İndeks veri seti yüklenirken tek bir
+vektörel group-by ile oluşturulduğundan burada kayıtlar tekrar dolaşılmaz;
+maliyet grup sayısıyla orantılıdır. Sonuç veri seti versiyonu başına bir kez
+hesaplanıp önbelleğe alınır.
+"""
+
+from typing import Dict
+
+from core.cache import ml_cache
+
+# Kategorisi olmayan kullanıcı turnuvaları bu kategoride sayılır
+DEFAULT_CATEGORY = 'general'
+
+
+def _group(count: int = 0, total: int = 0) -> Dict:
+    return {'count': count, 'total_matches': total}
+
+
+def build_analytics(index) -> Dict:
+    """
+    İndeksten tüm analiz toplamlarını hesapla
+
+    Args:
+        index: stats_index.MomentIndex
+
+    Returns:
+        Dict: 'by_n', 'by_n_source', 'user_by_category', 'source_totals'
+            (her grup {'count', 'total_matches'})
+    """
+    by_n = {n: _group(count, total) for (n,), (count, total, _) in sorted(index.table().items())}
+
+    by_n_source = {'simulated': {}, 'user': {}}
+    for (n, source), (count, total, _) in sorted(index.table('source').items()):
+        by_n_source[source][n] = _group(count, total)
+
+    user_by_category = {}
+    for (_, category, source), (count, total, _) in index.table('category', 'source').items():
+        if source != 'user':
+            continue
+        group = user_by_category.setdefault(category or DEFAULT_CATEGORY, _group())
+        group['count'] += count
+        group['total_matches'] += total
+
+    source_totals = {
+        source: sum(group['count'] for group in groups.values())
+        for source, groups in by_n_source.items()
+    }
+    return {
+        'by_n': by_n,
+        'by_n_source': by_n_source,
+        'user_by_category': user_by_category,
+        'source_totals': source_totals,
+    }
+
+
+def get_analytics(predictor) -> Dict:
+    """
+    Veri seti versiyonu için analiz toplamlarını getir (önbellekli)
+
+    Args:
+        predictor: Yüklü MatchPredictor
+
+    Returns:
+        Dict: build_analytics çıktısı
+    """
+    analytics = ml_cache.get_cached_analytics(predictor.dataset_version)
+    if analytics is None:
+        analytics = build_analytics(predictor.get_index())
+        ml_cache.cache_analytics(predictor.dataset_version, analytics)
+    return analytics
+
+
+def _with_average(groups: Dict) -> Dict:
+    return {
+        key: dict(group, avg_matches=group['total_matches'] / group['count'] if group['count'] else 0)
+        for key, group in groups.items()
+    }
+
+
+def dataset_info(analytics: Dict) -> Dict:
+    """DatasetInfoView yanıtı"""
+    n_values = list(analytics['by_n'])
+    sample_counts = {n: group['count'] for n, group in analytics['by_n'].items()}
+    total_samples = sum(sample_counts.values())
+    return {
+        'dataset_info': {
+            'total_records': total_samples,
+            'available_n_values': n_values,
+            'n_range': {
+                'min': min(n_values) if n_values else 0,
+                'max': max(n_values) if n_values else 0
+            }
+        },
+        'sample_counts': sample_counts,
+        'total_samples': total_samples
+    }
+
+
+def user_tournament_stats(analytics: Dict) -> Dict:
+    """UserTournamentStatsView yanıtı"""
+    total_user = analytics['source_totals']['user']
+    total_simulated = analytics['source_totals']['simulated']
+    return {
+        'total_user_tournaments': total_user,
+        'total_simulated_tournaments': total_simulated,
+        'total_tournaments': total_user + total_simulated,
+        'category_statistics': _with_average(analytics['user_by_category']),
+        'n_statistics': _with_average(analytics['by_n_source']['user']),
+        'message': f'{total_user} kullanıcı turnuvası analiz edildi'
+    }
+
+
+def dataset_comparison(analytics: Dict) -> Dict:
+    """DatasetComparisonView yanıtı: hem simülasyon hem kullanıcı verisi olan N'ler"""
+    simulated, user = analytics['by_n_source']['simulated'], analytics['by_n_source']['user']
+    comparison = {}
+    for n in sorted(simulated.keys() & user.keys()):
+        sim_avg = simulated[n]['total_matches'] / simulated[n]['count']
+        user_avg = user[n]['total_matches'] / user[n]['count']
+        comparison[n] = {
+            'simulated_avg': round(sim_avg, 2),
+            'user_avg': round(user_avg, 2),
+            'difference': round(abs(sim_avg - user_avg), 2),
+            'simulated_count': simulated[n]['count'],
+            'user_count': user[n]['count']
+        }
+    return {
+        'comparison': comparison,
+        'summary': {
+            'total_simulated': analytics['source_totals']['simulated'],
+            'total_user': analytics['source_totals']['user'],
+            'overlapping_n_values': len(comparison)
+        }
+    }
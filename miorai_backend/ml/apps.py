@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class MlConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ml' 
\ No newline at end of file
+    name = 'ml'
+
+    def ready(self):
+        # Outbox işleyicilerini kaydet
+        from . import tasks  # noqa: F401
@@ -0,0 +1,304 @@
+"""
+Versiyonlu Model Paketleri (Artifact)
+Bu modül, veri setini tahmin için gereken her şeyi içeren tek bir model
+paketine derler: N/kategori/kaynak momentleri, kapalı form eğri, önceden
+hesaplanmış kritik değerler (her güven seviyesi için), N başına ampirik
+yüzdelikler ve (N, kategori) büzülme parametreleri. Servis sırasında ham veriye ihtiyaç yoktur.
+
+Dizin yapısı (`ml/models/` altında):
+    artifacts/<versiyon>.json   # değişmez model paketleri
+    active_model.json           # aktif versiyon işaretçisi ve geçmişi
+
+Yayınlama önce paketi, sonra işaretçiyi atomik olarak yazar; geri alma
+yalnızca işaretçiyi önceki versiyona çevirir (anında, yeniden derleme yok).
+Çalışan süreçler işaretçi değişimini PredictorRegistry üzerinden algılar.
+"""
+
+import hashlib
+import json
+import math
+import os
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from .category_model import CategoryModel
+from .critical_values import DEFAULT_CONFIDENCE_LEVELS, T_MAX_SAMPLES, critical_value_table
+from .curve_model import MatchCountCurve
+from .quantiles import QuantileTable
+from .stats_index import MomentIndex
+
+FORMAT_VERSION = 1
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+ARTIFACTS_DIRNAME = 'artifacts'
+ACTIVE_FILENAME = 'active_model.json'
+MAX_HISTORY = 20
+
+
+def artifacts_dir_for(models_dir: str) -> str:
+    return os.path.join(models_dir, ARTIFACTS_DIRNAME)
+
+
+def active_path_for(models_dir: str) -> str:
+    return os.path.join(models_dir, ACTIVE_FILENAME)
+
+
+def _write_json_atomic(path: str, data: Dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=1)
+        f.write('\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def build_critical_values(confidence_level: float = 0.95) -> Dict:
+    """
+    Güven seviyesi için kritik değer tablosu
+
+    Args:
+        confidence_level: Güven seviyesi
+
+    Returns:
+        Dict: 'confidence_level', 't' (df=1..T_MAX_SAMPLES-1) ve 'z'
+    """
+    return critical_value_table(confidence_level)
+
+
+class ModelArtifact:
+    """Derlenmiş, değişmez tahmin modeli"""
+
+    def __init__(self, data: Dict):
+        if data.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen model paketi formatı: {data.get('format_version')}")
+        self.data = data
+        self.version = data['version']
+        self.index = MomentIndex.from_dict(data['moments'])
+        self.curve = MatchCountCurve.from_dict(data['curve']) if data.get('curve') else None
+        self.critical_values = data['critical_values']
+        # Eski paketlerde yalnızca varsayılan seviyenin tablosu vardır
+        tables = data.get('critical_value_tables') or [self.critical_values]
+        self.critical_value_tables = {round(table['confidence_level'], 6): table for table in tables}
+        self.quantiles = QuantileTable.from_dict(data['quantiles']) if data.get('quantiles') else None
+        if data.get('categories'):
+            self.category_model = CategoryModel.from_dict(data['categories'])
+        else:
+            self.category_model = CategoryModel.from_index(self.index)
+
+    @classmethod
+    def build(cls, index: MomentIndex, curve: Optional[MatchCountCurve] = None,
+              dataset_version: Optional[str] = None, confidence_level: float = 0.95,
+              quantiles: Optional[QuantileTable] = None,
+              confidence_levels: Iterable[float] = DEFAULT_CONFIDENCE_LEVELS) -> 'ModelArtifact':
+        """
+        Moment indeksinden yeni bir model paketi derle
+
+        Args:
+            index: Veri setinin moment indeksi
+            curve: Veride olmayan N'ler için eğri
+            dataset_version: Kaynak veri setinin versiyonu
+            confidence_level: Varsayılan güven seviyesi
+            quantiles: N başına ampirik yüzdelik tablosu
+            confidence_levels: İsteklerde seçilebilecek güven seviyeleri
+
+        Returns:
+            ModelArtifact: Versiyonu içerik özetinden türetilmiş paket
+        """
+        levels = sorted(set(confidence_levels) | {confidence_level})
+        data = {
+            'format_version': FORMAT_VERSION,
+            'dataset_version': dataset_version,
+            'moments': index.to_dict(),
+            'curve': curve.to_dict() if curve is not None else None,
+            'critical_values': build_critical_values(confidence_level),
+            'critical_value_tables': [build_critical_values(level) for level in levels],
+            'quantiles': quantiles.to_dict() if quantiles is not None else None,
+            'categories': CategoryModel.from_index(index).to_dict(),
+        }
+        digest = hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+        created_at = datetime.now(timezone.utc)
+        data['version'] = f"{created_at:%Y%m%dT%H%M%SZ}-{digest}"
+        data['created_at'] = created_at.isoformat()
+        return cls(data)
+
+    @classmethod
+    def load(cls, path: str) -> 'ModelArtifact':
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def summary(self) -> Dict:
+        """Model durumu için özet"""
+        n_values = self.index.n_values()
+        return {
+            'version': self.version,
+            'created_at': self.data.get('created_at'),
+            'dataset_version': self.data.get('dataset_version'),
+            'total_records': self.index.total_count(),
+            'n_range': {
+                'min': min(n_values) if n_values else 0,
+                'max': max(n_values) if n_values else 0
+            },
+            'confidence_level': self.critical_values['confidence_level'],
+            'confidence_levels': sorted(self.critical_value_tables),
+            'quantile_levels': self.quantiles.levels if self.quantiles is not None else [],
+            'categories': self.category_model.categories(),
+            'curve': {
+                'n_min': self.curve.n_min,
+                'n_max': self.curve.n_max,
+                'fitted_at': self.curve.fitted_at,
+            } if self.curve is not None else None,
+        }
+
+
+def validate_artifact(artifact: ModelArtifact, previous: Optional[ModelArtifact] = None,
+                      max_drift: float = 0.1, min_samples: int = 30) -> List[str]:
+    """
+    Yeni paketi kendi içinde ve önceki aktif pakete göre doğrula
+
+    Args:
+        artifact: Yeni paket
+        previous: Aktif paket (yoksa yalnızca iç tutarlılık kontrol edilir)
+        max_drift: N başına izin verilen en büyük göreli ortalama değişimi
+        min_samples: Kayma kontrolü için iki pakette de gereken en az örnek
+
+    Returns:
+        List[str]: Bulunan sorunlar (boşsa geçerli)
+    """
+    issues = []
+    index = artifact.index
+    n_values = index.n_values()
+    if not n_values:
+        issues.append("Model paketinde hiç veri yok")
+    for n in n_values:
+        count, total, _ = index.get(n)
+        if count <= 0 or not math.isfinite(total / count):
+            issues.append(f"N={n} için geçersiz momentler")
+    for table in artifact.critical_value_tables.values():
+        if len(table.get('t', [])) != T_MAX_SAMPLES - 1:
+            issues.append(f"%{table['confidence_level'] * 100:g} kritik değer tablosu eksik")
+    if artifact.quantiles is not None:
+        missing_quantiles = sorted(set(n_values) - set(artifact.quantiles.by_n))
+        if missing_quantiles:
+            issues.append(f"Yüzdelik tablosunda eksik N değerleri: {missing_quantiles}")
+    if artifact.curve is not None:
+        curve_mean = artifact.curve.predict_arrays([artifact.curve.n_min, artifact.curve.n_max])['mean']
+        if not all(math.isfinite(value) and value > 0 for value in curve_mean.tolist()):
+            issues.append("Eğri geçersiz tahmin üretiyor")
+
+    if previous is None:
+        return issues
+
+    previous_index = previous.index
+    missing = sorted(set(previous_index.n_values()) - set(n_values))
+    if missing:
+        issues.append(f"Önceki modelde olan N değerleri eksik: {missing}")
+    if index.total_count() < previous_index.total_count():
+        issues.append(
+            f"Kayıt sayısı azaldı: {previous_index.total_count()} -> {index.total_count()}"
+        )
+    for n in n_values:
+        count, total, _ = index.get(n)
+        prev_count, prev_total, _ = previous_index.get(n)
+        if count < min_samples or prev_count < min_samples:
+            continue
+        mean, prev_mean = total / count, prev_total / prev_count
+        if prev_mean and abs(mean - prev_mean) / prev_mean > max_drift:
+            issues.append(f"N={n} ortalaması fazla değişti: {prev_mean:.2f} -> {mean:.2f}")
+    return issues
+
+
+def publish_artifact(artifact: ModelArtifact, models_dir: str = MODELS_DIR) -> str:
+    """
+    Paketi yaz ve aktif versiyon yap
+
+    Args:
+        artifact: Yayınlanacak paket
+        models_dir: Model dizini
+
+    Returns:
+        str: Paket dosyasının yolu
+    """
+    path = os.path.join(artifacts_dir_for(models_dir), f"{artifact.version}.json")
+    _write_json_atomic(path, artifact.data)
+    activate(artifact.version, models_dir)
+    return path
+
+
+def read_active_pointer(models_dir: str = MODELS_DIR) -> Optional[Dict]:
+    try:
+        with open(active_path_for(models_dir), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def get_active_version(models_dir: str = MODELS_DIR) -> Optional[str]:
+    """Aktif paket versiyonu; yayınlanmış paket yoksa None"""
+    pointer = read_active_pointer(models_dir)
+    return pointer['version'] if pointer else None
+
+
+def load_artifact(version: str, models_dir: str = MODELS_DIR) -> ModelArtifact:
+    return ModelArtifact.load(os.path.join(artifacts_dir_for(models_dir), f"{version}.json"))
+
+
+def load_active_artifact(models_dir: str = MODELS_DIR) -> Optional[ModelArtifact]:
+    """Aktif paketi yükle; yayınlanmış paket yoksa None"""
+    version = get_active_version(models_dir)
+    return load_artifact(version, models_dir) if version else None
+
+
+def list_artifacts(models_dir: str = MODELS_DIR) -> List[str]:
+    """Diskteki paket versiyonları (eskiden yeniye)"""
+    try:
+        names = os.listdir(artifacts_dir_for(models_dir))
+    except FileNotFoundError:
+        return []
+    return sorted(name[:-len('.json')] for name in names if name.endswith('.json'))
+
+
+def activate(version: str, models_dir: str = MODELS_DIR):
+    """
+    Diskteki bir paketi aktif yap (işaretçiyi atomik olarak değiştirir)
+
+    Args:
+        version: Paket versiyonu
+        models_dir: Model dizini
+    """
+    if not os.path.exists(os.path.join(artifacts_dir_for(models_dir), f"{version}.json")):
+        raise ValueError(f"Model paketi bulunamadı: {version}")
+    pointer = read_active_pointer(models_dir) or {'history': []}
+    history = list(pointer.get('history', []))
+    if pointer.get('version') and pointer['version'] != version:
+        history.append(pointer['version'])
+    _write_json_atomic(active_path_for(models_dir), {
+        'version': version,
+        'activated_at': datetime.now(timezone.utc).isoformat(),
+        'history': history[-MAX_HISTORY:],
+    })
+
+
+def rollback(models_dir: str = MODELS_DIR) -> str:
+    """
+    Bir önceki aktif pakete geri dön
+
+    Args:
+        models_dir: Model dizini
+
+    Returns:
+        str: Yeniden aktif olan versiyon
+    """
+    pointer = read_active_pointer(models_dir)
+    if not pointer or not pointer.get('history'):
+        raise ValueError("Geri dönülecek önceki model yok")
+    history = list(pointer['history'])
+    version = history.pop()
+    if not os.path.exists(os.path.join(artifacts_dir_for(models_dir), f"{version}.json")):
+        raise ValueError(f"Model paketi bulunamadı: {version}")
+    _write_json_atomic(active_path_for(models_dir), {
+        'version': version,
+        'activated_at': datetime.now(timezone.utc).isoformat(),
+        'history': history,
+    })
+    return version
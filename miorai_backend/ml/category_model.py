@@ -0,0 +1,175 @@
+"""
+Kategori Bazlı Tahmin - Hiyerarşik Büzülme
+Bu modül, her (N, kategori) için ortalama maç sayısını kategorinin kendi
+kayıtları ile N'nin genel tahmini arasında ağırlıklandırır (normal-normal
+ampirik Bayes). Az veriye sahip kategoriler genel tahmine yakın kalır:
+
+    w_c   = n_c / (n_c + k_N)            k_N = σ²_N / τ²_N
+    μ_c   = w_c · x̄_c + (1 - w_c) · μ_N
+    n_eff = n_c + k_N                    (güven aralığı için etkin örnek)
+
+σ²_N N'deki tüm kayıtların varyansı, τ²_N kategori ortalamalarının gerçek
+varyansıdır (DerSimonian-Laird moment tahmini). N'de ikiden az kategori varsa
+τ² tahmin edilemez ve k_N için DEFAULT_PRIOR_STRENGTH kullanılır.
+
+Tüm parametreler model paketi derlenirken hesaplanır; istek sırasında
+yalnızca (N, kategori) anahtarıyla okunur.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .stats_index import MomentIndex
+
+# τ² tahmin edilemediğinde genel tahminin değeri (sahte gözlem sayısı)
+DEFAULT_PRIOR_STRENGTH = 10.0
+# τ² ≈ 0 olduğunda k_N için üst sınır (JSON'da sonsuz yazılamaz)
+MAX_PRIOR_STRENGTH = 1e6
+
+
+def _variance(count: int, total: int, total_sq: int) -> float:
+    """Tam sayı momentlerinden örnek varyansı (ddof=1); count < 2 ise nan"""
+    if count < 2:
+        return float('nan')
+    return (count * total_sq - total * total) / (count * (count - 1))
+
+
+def _prior_strength(global_variance: float, groups: List[Tuple[int, float]],
+                    default: float) -> float:
+    """Kategori ortalamalarının dağılımından k_N = σ² / τ² (DerSimonian-Laird)"""
+    if len(groups) < 2 or not global_variance > 0:
+        return default
+    weights = [count / global_variance for count, _ in groups]
+    weight_sum = sum(weights)
+    pooled_mean = sum(w * mean for w, (_, mean) in zip(weights, groups)) / weight_sum
+    q = sum(w * (mean - pooled_mean) ** 2 for w, (_, mean) in zip(weights, groups))
+    scale = weight_sum - sum(w * w for w in weights) / weight_sum
+    tau_sq = max(0.0, (q - (len(groups) - 1)) / scale) if scale > 0 else 0.0
+    if tau_sq <= 0:
+        return MAX_PRIOR_STRENGTH
+    return min(global_variance / tau_sq, MAX_PRIOR_STRENGTH)
+
+
+def _category_groups(index: MomentIndex, n_values: Optional[Set[int]] = None
+                     ) -> Dict[int, List[Tuple[str, Tuple[int, int, int]]]]:
+    """N -> [(kategori, momentler)]; kategorisiz ve boş gruplar hariç"""
+    by_n: Dict[int, List[Tuple[str, Tuple[int, int, int]]]] = {}
+    for (n_images, category), moments in index.table('category').items():
+        if category is not None and moments[0] > 0 and (n_values is None or n_images in n_values):
+            by_n.setdefault(n_images, []).append((category, moments))
+    return by_n
+
+
+def _estimate_n(index: MomentIndex, n_images: int, groups: List[Tuple[str, Tuple[int, int, int]]],
+                default_prior_strength: float, estimates: Dict[Tuple[int, str], Dict]) -> float:
+    """Bir N'nin kategori tahminlerini estimates'e yaz; k_N'yi döndür"""
+    count, total, total_sq = index.get(n_images)
+    global_mean = total / count
+    global_variance = _variance(count, total, total_sq)
+    k = _prior_strength(
+        global_variance, [(c, t / c) for _, (c, t, _) in groups], default_prior_strength
+    )
+
+    for category, (c_count, c_total, c_total_sq) in groups:
+        weight = c_count / (c_count + k)
+        mean = weight * (c_total / c_count) + (1 - weight) * global_mean
+        c_variance = _variance(c_count, c_total, c_total_sq)
+        if math.isnan(c_variance):
+            variance = global_variance
+        elif math.isnan(global_variance):
+            variance = c_variance
+        else:
+            variance = weight * c_variance + (1 - weight) * global_variance
+        estimates[(n_images, category)] = {
+            'mean': mean,
+            'std': math.sqrt(variance) if not math.isnan(variance) else float('nan'),
+            'weight': weight,
+            'sample_size': c_count,
+            'effective_sample_size': c_count + k,
+        }
+    return k
+
+
+class CategoryModel:
+    """(N, kategori) -> büzülmüş ortalama, standart sapma ve etkin örnek sayısı"""
+
+    def __init__(self, prior_strength: Dict[int, float], estimates: Dict[Tuple[int, str], Dict]):
+        self.prior_strength = prior_strength
+        self.estimates = estimates
+
+    @classmethod
+    def from_index(cls, index: MomentIndex, default_prior_strength: float = DEFAULT_PRIOR_STRENGTH
+                   ) -> 'CategoryModel':
+        """
+        Moment indeksinden tüm (N, kategori) parametrelerini hesapla
+
+        Args:
+            index: Veri setinin moment indeksi
+            default_prior_strength: τ² tahmin edilemediğinde k_N
+
+        Returns:
+            CategoryModel: Parametre tablosu
+        """
+        by_n = _category_groups(index)
+        prior_strength = {}
+        estimates = {}
+        for n_images, groups in sorted(by_n.items()):
+            prior_strength[n_images] = _estimate_n(
+                index, n_images, groups, default_prior_strength, estimates
+            )
+        return cls(prior_strength, estimates)
+
+    def refresh(self, index: MomentIndex, n_values: Iterable[int],
+                default_prior_strength: float = DEFAULT_PRIOR_STRENGTH) -> 'CategoryModel':
+        """
+        Yalnızca verilen N'lerin parametrelerini yeniden hesapla (artımlı güncellemeler için)
+
+        Args:
+            index: Güncellenmiş moment indeksi
+            n_values: Verisi değişen resim sayıları
+            default_prior_strength: τ² tahmin edilemediğinde k_N
+
+        Returns:
+            CategoryModel: Yeni tablo (mevcut tablo değiştirilmez; okuyucular atomik olarak geçer)
+        """
+        n_values = set(n_values)
+        by_n = _category_groups(index, n_values)
+        prior_strength = {n: k for n, k in self.prior_strength.items() if n not in n_values}
+        estimates = {key: e for key, e in self.estimates.items() if key[0] not in n_values}
+        for n_images, groups in sorted(by_n.items()):
+            prior_strength[n_images] = _estimate_n(
+                index, n_images, groups, default_prior_strength, estimates
+            )
+        return CategoryModel(prior_strength, estimates)
+
+    def get(self, n_images: int, category: str) -> Optional[Dict]:
+        """(N, kategori) parametreleri; kategoride veri yoksa None (genel tahmin kullanılır)"""
+        return self.estimates.get((n_images, category))
+
+    def categories(self) -> List[str]:
+        """Tabloda bulunan kategoriler"""
+        return sorted({category for _, category in self.estimates})
+
+    def to_dict(self) -> Dict:
+        return {
+            'prior_strength': [[n_images, k] for n_images, k in sorted(self.prior_strength.items())],
+            'estimates': [
+                [n_images, category, e['mean'], None if math.isnan(e['std']) else e['std'],
+                 e['weight'], e['sample_size'], e['effective_sample_size']]
+                for (n_images, category), e in sorted(self.estimates.items())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CategoryModel':
+        estimates = {
+            (row[0], row[1]): {
+                'mean': row[2],
+                'std': float('nan') if row[3] is None else row[3],
+                'weight': row[4],
+                'sample_size': row[5],
+                'effective_sample_size': row[6],
+            }
+            for row in data['estimates']
+        }
+        return cls({row[0]: row[1] for row in data['prior_strength']}, estimates)
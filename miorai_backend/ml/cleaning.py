@@ -0,0 +1,441 @@
+"""
+Akışlı Veri Seti Temizleme
+Bu modül, veri setini parça parça okuyup temizler ve sonucu kolon formatında
+yazar. Bellek kullanımı kayıt sayısına değil, (N, maç sayısı) histogramının ve
+tournament_id aralığının boyutuna bağlıdır; RAM'den büyük veri setleri de
+temizlenebilir.
+
+İki geçiş yapılır (veri seti iki geçiş boyunca sabit bir görüntüden okunur,
+bkz. ingest.frozen_dataset; temizleme sırasında eklenen kayıtlar dahil edilmez):
+    1. Tekrarlar ve değişmez ihlalleri atlanarak N başına maç sayısı
+       histogramı çıkarılır; IQR sınırları histogramdan tam hesaplanır
+       (pandas/np.quantile 'linear' ile aynı).
+    2. Aynı kurallar ve IQR sınırlarıyla geçen kayıtlar parça parça yeni bir
+       kolon nesline yazılır (bkz. columnar.ColumnWriter).
+
+Kurallar:
+    duplicate       Aynı kaynakta (simülasyon/kullanıcı) tekrar eden tournament_id; ilki kalır
+    n_images        N < 2
+    min_matches     Maç sayısı < 1
+    max_matches     Maç sayısı > N(N-1)/2 (her çift en fazla bir kez karşılaşır)
+    exact_matches   Simülasyonlarda sonucu kesin olan N'ler (N=2 ve N=3 için 1 maç)
+    outlier         N >= min_outlier_n için [Q1 - k·IQR, Q3 + k·IQR] dışı
+"""
+
+import json
+import logging
+import os
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .columnar import NULL_INT, ColumnarDataset, ColumnWriter, columns_path_for
+from .ingest import LogSnapshot, frozen_dataset, iter_pending_records, sync_columns_with_source
+from .stats_index import SOURCES, record_source
+
+logger = logging.getLogger('ml')
+
+DEFAULT_CHUNK_SIZE = 65536
+# JSON akış okuyucusunun tek seferde okuduğu karakter sayısı
+READ_SIZE = 1 << 20
+# Simülasyon kurallarına göre maç sayısı kesin olan N'ler
+EXACT_MATCHES = {2: 1, 3: 1}
+INVARIANT_RULES = ('n_images', 'min_matches', 'max_matches', 'exact_matches')
+
+RecordSource = Callable[[], Iterable[Dict]]
+
+
+class CleaningRules:
+    """Temizleme kuralları"""
+
+    def __init__(self, iqr_multiplier: float = 1.5, min_outlier_n: int = 4,
+                 exact_matches: Optional[Dict[int, int]] = None):
+        self.iqr_multiplier = iqr_multiplier
+        # Daha küçük N'lerde aykırı değer kontrolü yapılmaz
+        self.min_outlier_n = min_outlier_n
+        self.exact_matches = dict(EXACT_MATCHES if exact_matches is None else exact_matches)
+
+
+def cleaned_path_for(dataset_path: str) -> str:
+    """Temizlenmiş veri setinin yolu (yalnızca kolon dizini yazılır, bkz. columns_path_for)"""
+    return os.path.splitext(dataset_path)[0] + '_cleaned.json'
+
+
+def iter_json_array(path: str, read_size: int = READ_SIZE) -> Iterator[Dict]:
+    """
+    JSON dizisi dosyasındaki nesneleri dosyayı belleğe almadan sırayla üret
+
+    Args:
+        path: JSON dizisi içeren dosya
+        read_size: Tek seferde okunacak karakter sayısı
+
+    Yields:
+        Dict: Dizinin elemanı
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r') as f:
+        buffer, pos, eof = '', 0, False
+
+        def next_char():
+            # Boşlukları atla; gerekirse tamponu doldur. Dosya sonunda None
+            nonlocal buffer, pos, eof
+            while True:
+                while pos < len(buffer) and buffer[pos].isspace():
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    return buffer[pos] if pos < len(buffer) else None
+                chunk = f.read(read_size)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+
+        if next_char() != '[':
+            raise ValueError(f"{path}: JSON dizisi bekleniyordu")
+        pos += 1
+        if next_char() == ']':
+            return
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Eleman tamponun sonunda bölünmüş: devamını oku
+                chunk = f.read(read_size)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                continue
+            yield item
+            pos = end
+            char = next_char()
+            if char == ',':
+                pos += 1
+                next_char()
+            elif char == ']':
+                return
+            else:
+                raise ValueError(f"{path}: beklenmeyen karakter {char!r}")
+
+
+def iter_dataset_records(dataset_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Veri setinin tüm kayıtlarını (günlük dahil) akış olarak üret
+
+    Kolon formatı varsa memory-map'ten parça parça (JSON daha yeniyse kolonlar
+    önce yeniden oluşturulur), yoksa JSON dosyasından akışla okunur
+    (MatchPredictor.load ile aynı seçim).
+
+    Args:
+        dataset_path: JSON veri seti yolu
+        chunk_size: Kolonlardan tek seferde okunacak satır sayısı
+
+    Yields:
+        Dict: Veri seti kaydı
+    """
+    compacted = None
+    columns = sync_columns_with_source(dataset_path)
+    if columns is not None:
+        compacted = columns.meta.get('compacted_batches')
+        yield from columns.iter_records(chunk_size)
+    elif os.path.exists(dataset_path):
+        yield from iter_json_array(dataset_path)
+    else:
+        raise FileNotFoundError(f"Dataset not found: {dataset_path}")
+    yield from iter_pending_records(dataset_path, compacted)
+
+
+def iter_chunks(records: Iterable[Dict], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """Kayıt akışını en fazla chunk_size uzunluğunda listelere böl"""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class SeenIds:
+    """tournament_id bit kümesi: id başına 1 bit, bellek kayıt sayısından bağımsız"""
+
+    def __init__(self):
+        self.bits = np.zeros(0, dtype=np.uint8)
+
+    def add(self, ids: np.ndarray) -> np.ndarray:
+        """
+        Id'leri kümeye ekle
+
+        Args:
+            ids: tournament_id dizisi (NULL_INT: id yok, her zaman yeni sayılır)
+
+        Returns:
+            np.ndarray: İlk kez görülen id'ler için True
+        """
+        new = np.ones(len(ids), dtype=bool)
+        valid = np.flatnonzero(ids != NULL_INT)
+        if len(valid) == 0:
+            return new
+        values = ids[valid].astype(np.int64)
+        # Parça içindeki tekrarlar: yalnızca ilk geçiş
+        first = np.zeros(len(values), dtype=bool)
+        first[np.unique(values, return_index=True)[1]] = True
+
+        needed = int(values.max()) // 8 + 1
+        if needed > len(self.bits):
+            bits = np.zeros(max(needed, 2 * len(self.bits)), dtype=np.uint8)
+            bits[:len(self.bits)] = self.bits
+            self.bits = bits
+        byte = values >> 3
+        mask = np.left_shift(1, values & 7).astype(np.uint8)
+        unseen = first & ((self.bits[byte] & mask) == 0)
+        np.bitwise_or.at(self.bits, byte[unseen], mask[unseen])
+        new[valid] = unseen
+        return new
+
+
+def _chunk_arrays(chunk: List[Dict]) -> Dict[str, np.ndarray]:
+    count = len(chunk)
+    return {
+        'n': np.fromiter((r['n_images'] for r in chunk), dtype=np.int64, count=count),
+        'total': np.fromiter((r['total_matches'] for r in chunk), dtype=np.int64, count=count),
+        'id': np.fromiter(
+            (r.get('tournament_id') if r.get('tournament_id') is not None else NULL_INT for r in chunk),
+            dtype=np.int64, count=count
+        ),
+        'source': np.fromiter((SOURCES.index(record_source(r)) for r in chunk), dtype=np.int64, count=count),
+    }
+
+
+def invariant_violations(n: np.ndarray, total: np.ndarray, simulated: np.ndarray,
+                         rules: CleaningRules) -> Dict[str, np.ndarray]:
+    """
+    Değişmez kurallarının ihlal maskeleri
+
+    Args:
+        n: Resim sayıları
+        total: Toplam maç sayıları
+        simulated: Simülasyon kayıtları için True
+        rules: Temizleme kuralları
+
+    Returns:
+        Dict: Kural adı -> ihlal eden satırlar için True
+    """
+    exact = np.full(len(n), -1, dtype=np.int64)
+    for n_images, matches in rules.exact_matches.items():
+        exact[n == n_images] = matches
+    return {
+        'n_images': n < 2,
+        'min_matches': total < 1,
+        'max_matches': total > n * (n - 1) // 2,
+        'exact_matches': simulated & (exact >= 0) & (total != exact),
+    }
+
+
+def _histogram_quantile(values: np.ndarray, counts: np.ndarray, q: float) -> float:
+    """Sıralı değer histogramından np.quantile ('linear') ile aynı yüzdelik"""
+    cumulative = np.cumsum(counts)
+    position = (cumulative[-1] - 1) * q
+    lower = int(np.floor(position))
+    upper = min(lower + 1, int(cumulative[-1]) - 1)
+    low_value = values[np.searchsorted(cumulative, lower, side='right')]
+    high_value = values[np.searchsorted(cumulative, upper, side='right')]
+    return float(low_value + (position - lower) * (high_value - low_value))
+
+
+class _Pass:
+    """Bir temizleme geçişinin tekrar ve değişmez filtresi"""
+
+    def __init__(self, rules: CleaningRules):
+        self.rules = rules
+        self.seen = {source: SeenIds() for source in range(len(SOURCES))}
+        self.duplicates = 0
+        self.invariants = {rule: 0 for rule in INVARIANT_RULES}
+
+    def filter(self, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        keep = np.ones(len(arrays['n']), dtype=bool)
+        for source, seen in self.seen.items():
+            rows = np.flatnonzero(arrays['source'] == source)
+            keep[rows] = seen.add(arrays['id'][rows])
+        self.duplicates += int((~keep).sum())
+
+        simulated = arrays['source'] == SOURCES.index('simulated')
+        for rule, violated in invariant_violations(arrays['n'], arrays['total'], simulated, self.rules).items():
+            violated &= keep
+            self.invariants[rule] += int(violated.sum())
+            keep &= ~violated
+        return keep
+
+
+def compute_bounds(source: RecordSource, rules: CleaningRules,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[Dict[int, Tuple[float, float]], Dict[int, Dict[int, int]], Dict]:
+    """
+    Birinci geçiş: histogramlar ve N başına IQR sınırları
+
+    Args:
+        source: Her çağrıda kayıt akışını baştan üreten fonksiyon
+        rules: Temizleme kuralları
+        chunk_size: Parça boyutu
+
+    Returns:
+        Tuple: (N -> (alt, üst) sınır, N -> {maç sayısı: kayıt sayısı}, geçiş sayaçları)
+    """
+    filter_pass = _Pass(rules)
+    histograms: Dict[int, Dict[int, int]] = {}
+    total_records = 0
+    for chunk in iter_chunks(source(), chunk_size):
+        total_records += len(chunk)
+        arrays = _chunk_arrays(chunk)
+        keep = filter_pass.filter(arrays)
+        pairs, counts = np.unique(
+            np.stack([arrays['n'][keep], arrays['total'][keep]], axis=1), axis=0, return_counts=True
+        )
+        for (n_images, matches), count in zip(pairs.tolist(), counts.tolist()):
+            histogram = histograms.setdefault(n_images, {})
+            histogram[matches] = histogram.get(matches, 0) + count
+
+    bounds = {}
+    for n_images, histogram in histograms.items():
+        if n_images < rules.min_outlier_n:
+            continue
+        values = np.array(sorted(histogram), dtype=np.float64)
+        counts = np.array([histogram[value] for value in sorted(histogram)], dtype=np.int64)
+        q1 = _histogram_quantile(values, counts, 0.25)
+        q3 = _histogram_quantile(values, counts, 0.75)
+        iqr = q3 - q1
+        bounds[n_images] = (q1 - rules.iqr_multiplier * iqr, q3 + rules.iqr_multiplier * iqr)
+
+    counters = {
+        'input': total_records,
+        'duplicates': filter_pass.duplicates,
+        'invariants': filter_pass.invariants,
+    }
+    return bounds, histograms, counters
+
+
+def iter_clean_chunks(source: RecordSource, bounds: Dict[int, Tuple[float, float]], rules: CleaningRules,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Dict]]:
+    """
+    İkinci geçiş: kuralların tümünü geçen kayıtları parça parça üret
+
+    Args:
+        source: Her çağrıda kayıt akışını baştan üreten fonksiyon
+        bounds: compute_bounds'un N başına IQR sınırları
+        rules: Temizleme kuralları
+        chunk_size: Parça boyutu
+
+    Yields:
+        List[Dict]: Temiz kayıt parçası
+    """
+    filter_pass = _Pass(rules)
+    bound_n = np.array(sorted(bounds), dtype=np.int64)
+    lower = np.array([bounds[n][0] for n in bound_n.tolist()])
+    upper = np.array([bounds[n][1] for n in bound_n.tolist()])
+
+    for chunk in iter_chunks(source(), chunk_size):
+        arrays = _chunk_arrays(chunk)
+        keep = filter_pass.filter(arrays)
+        if len(bound_n):
+            position = np.minimum(np.searchsorted(bound_n, arrays['n']), len(bound_n) - 1)
+            checked = bound_n[position] == arrays['n']
+            total = arrays['total']
+            keep &= ~(checked & ((total < lower[position]) | (total > upper[position])))
+        kept = [record for record, flag in zip(chunk, keep.tolist()) if flag]
+        if kept:
+            yield kept
+
+
+def _snapshot_source(dataset_path: str, columns: Optional[ColumnarDataset], log: LogSnapshot,
+                     chunk_size: int) -> RecordSource:
+    """Sabit görüntüden her çağrıda aynı kayıtları üreten akış"""
+    from .match_predictor import get_file_version
+
+    json_version = get_file_version(dataset_path)
+
+    def source():
+        if columns is not None:
+            yield from columns.iter_records(chunk_size)
+        elif json_version is None:
+            raise FileNotFoundError(f"Dataset not found: {dataset_path}")
+        else:
+            if get_file_version(dataset_path) != json_version:
+                raise ValueError(f"Veri seti temizleme sırasında değişti: {dataset_path}")
+            yield from iter_json_array(dataset_path)
+        yield from log.iter_records()
+    return source
+
+
+def clean_dataset(dataset_path: str, output_path: Optional[str] = None, rules: Optional[CleaningRules] = None,
+                  chunk_size: int = DEFAULT_CHUNK_SIZE, source: Optional[RecordSource] = None) -> Dict:
+    """
+    Veri setini temizleyip kolon formatında yaz
+
+    Args:
+        dataset_path: Kaynak JSON veri seti yolu (kolonları ve günlüğü dahil)
+        output_path: Temiz veri setinin yolu (varsayılan: cleaned_path_for); kolonlar
+            columns_path_for(output_path) dizinine yazılır ve MatchPredictor ile açılabilir
+        rules: Temizleme kuralları
+        chunk_size: Parça boyutu
+        source: Kayıt akışı; her çağrıda aynı kayıtları üretmeli (varsayılan: veri setinin
+            sabit görüntüsü, bkz. ingest.frozen_dataset)
+
+    Returns:
+        Dict: Temizleme raporu ('input', 'kept', 'duplicates', 'invariants',
+            'outliers', 'by_n', 'output', 'generation')
+    """
+    if source is None:
+        # Sıkıştırma temizleme bitene kadar bekler; eklemeler sürer
+        with frozen_dataset(dataset_path) as (columns, log):
+            source = _snapshot_source(dataset_path, columns, log, chunk_size)
+            return _clean(dataset_path, output_path, rules, chunk_size, source)
+    return _clean(dataset_path, output_path, rules, chunk_size, source)
+
+
+def _clean(dataset_path: str, output_path: Optional[str], rules: Optional[CleaningRules],
+           chunk_size: int, source: RecordSource) -> Dict:
+    """clean_dataset gövdesi: iki geçiş ve kolon nesli yazımı"""
+    from .match_predictor import get_dataset_version
+
+    rules = rules or CleaningRules()
+    output_path = output_path or cleaned_path_for(dataset_path)
+    source_version = get_dataset_version(dataset_path)
+
+    bounds, histograms, counters = compute_bounds(source, rules, chunk_size)
+    by_n = {}
+    outliers = 0
+    for n_images, histogram in sorted(histograms.items()):
+        low, high = bounds.get(n_images, (-np.inf, np.inf))
+        kept = {value: count for value, count in histogram.items() if low <= value <= high}
+        outliers += sum(histogram.values()) - sum(kept.values())
+        count = sum(kept.values())
+        if count == 0:
+            continue
+        total = sum(value * c for value, c in kept.items())
+        total_sq = sum(value * value * c for value, c in kept.items())
+        by_n[n_images] = {
+            'count': count,
+            'mean': round(total / count, 2),
+            'std': round(float(np.sqrt((count * total_sq - total * total) / (count * (count - 1)))), 2)
+            if count > 1 else None,
+            'min': min(kept),
+            'max': max(kept),
+            'bounds': [round(low, 2), round(high, 2)] if n_images in bounds else None,
+        }
+    rows = sum(entry['count'] for entry in by_n.values())
+
+    report = dict(counters, outliers=outliers, kept=rows, by_n=by_n)
+    writer = ColumnWriter(columns_path_for(output_path), rows)
+    try:
+        for chunk in iter_clean_chunks(source, bounds, rules, chunk_size):
+            writer.write(chunk)
+        generation = writer.close(extra_meta={
+            'cleaned_from': os.path.abspath(dataset_path),
+            'cleaned_from_version': source_version,
+            'cleaning': {key: report[key] for key in ('input', 'kept', 'duplicates', 'invariants', 'outliers')},
+        })
+    except BaseException:
+        # İkinci geçiş birinciyle uyuşmadı (ör. kaynak değişti): yarım nesil kalmaz
+        writer.abort()
+        raise
+    report.update(output=output_path, generation=generation)
+    logger.info(
+        f"Veri seti temizlendi: {report['input']} kayıt -> {rows} "
+        f"(tekrar: {report['duplicates']}, değişmez: {sum(report['invariants'].values())}, aykırı: {outliers})"
+    )
+    return report
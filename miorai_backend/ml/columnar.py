@@ -0,0 +1,417 @@
+"""
+Kolon Tabanlı Veri Seti Formatı
+Bu modül, turnuva veri setini her alan için ayrı bir NumPy `.npy` dosyası
+olarak saklar. Kolonlar memory-map ile açılır; yükleme süresi ve bellek
+kullanımı veri seti büyüdükçe sabit kalır.
+
+Dizin yapısı:
+    tournament_dataset_v1.columns/
+        meta.json                 # şema, satır sayısı, kategori ve kazanan modeli tabloları, nesil
+        n_images.<gen>.npy
+        total_matches.<gen>.npy
+        ...
+
+meta.json en son yazılır (os.replace ile); okuyucular her zaman tutarlı bir
+nesli görür.
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+FORMAT_VERSION = 1
+META_FILENAME = 'meta.json'
+
+# Alan adı -> dtype
+SCHEMA = {
+    'n_images': 'int32',
+    'total_matches': 'int32',
+    'tournament_id': 'int64',
+    'simulation_id': 'int64',
+    'real_images': 'int32',
+    'total_images_after_padding': 'int32',
+    'rounds_played': 'int32',
+    'is_completed': 'bool',
+    'is_user_tournament': 'bool',
+    'category': 'int16',
+    'user_id': 'int64',
+    'created_at': 'int64',    # UTC epoch mikrosaniye
+    'completed_at': 'int64',  # UTC epoch mikrosaniye
+    'winner_model': 'int16',  # meta.json'daki winner_models tablosuna index
+}
+
+NULL_INT = -1
+NULL_TIME = np.iinfo(np.int64).min
+TIME_FIELDS = ('created_at', 'completed_at')
+
+
+def columns_path_for(dataset_path: str) -> str:
+    """JSON veri seti yolundan kolon dizini yolunu türet"""
+    return os.path.splitext(dataset_path)[0] + '.columns'
+
+
+def _to_epoch_us(value: Optional[str]) -> int:
+    if not value:
+        return NULL_TIME
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 10**6 + delta.microseconds
+
+
+def _from_epoch_us(value: int) -> Optional[str]:
+    if value == NULL_TIME:
+        return None
+    return datetime.fromtimestamp(value / 10**6, tz=timezone.utc).isoformat()
+
+
+def _winner_model_key(params: Dict) -> str:
+    return json.dumps(params, sort_keys=True)
+
+
+def records_to_columns(records: Iterable[Dict], categories: Optional[List[str]] = None,
+                       winner_models: Optional[List[Dict]] = None
+                       ) -> Tuple[Dict[str, np.ndarray], List[str], List[Dict]]:
+    """
+    Kayıt listesini kolon dizilerine çevir
+
+    Args:
+        records: Veri seti kayıtları
+        categories: Mevcut kategori tablosu (yeni kategoriler sona eklenir)
+        winner_models: Mevcut kazanan modeli tablosu (yeni modeller sona eklenir)
+
+    Returns:
+        Tuple: (kolonlar, kategori tablosu, kazanan modeli tablosu)
+    """
+    categories = list(categories or [])
+    category_codes = {name: code for code, name in enumerate(categories)}
+    winner_models = list(winner_models or [])
+    winner_model_codes = {_winner_model_key(params): code for code, params in enumerate(winner_models)}
+    values = {field: [] for field in SCHEMA}
+
+    for record in records:
+        category = record.get('category')
+        if category is None:
+            category_code = NULL_INT
+        else:
+            if category not in category_codes:
+                category_codes[category] = len(categories)
+                categories.append(category)
+            category_code = category_codes[category]
+
+        simulation_id = record.get('simulation_id')
+        values['n_images'].append(record['n_images'])
+        values['total_matches'].append(record['total_matches'])
+        values['tournament_id'].append(record.get('tournament_id') if record.get('tournament_id') is not None else NULL_INT)
+        # Kullanıcı turnuvalarında simulation_id türetilmiş bir metindir
+        values['simulation_id'].append(simulation_id if isinstance(simulation_id, int) else NULL_INT)
+        values['real_images'].append(record.get('real_images', record['n_images']))
+        values['total_images_after_padding'].append(record.get('total_images_after_padding', NULL_INT))
+        values['rounds_played'].append(record.get('rounds_played', NULL_INT))
+        values['is_completed'].append(bool(record.get('is_completed', True)))
+        values['is_user_tournament'].append(bool(record.get('is_user_tournament', False)))
+        values['category'].append(category_code)
+        values['user_id'].append(record.get('user_id') if record.get('user_id') is not None else NULL_INT)
+        for field in TIME_FIELDS:
+            values[field].append(_to_epoch_us(record.get(field)))
+
+        winner_model = record.get('winner_model')
+        if winner_model is None:
+            values['winner_model'].append(NULL_INT)
+        else:
+            key = _winner_model_key(winner_model)
+            if key not in winner_model_codes:
+                winner_model_codes[key] = len(winner_models)
+                winner_models.append(winner_model)
+            values['winner_model'].append(winner_model_codes[key])
+
+    columns = {field: np.asarray(values[field], dtype=dtype) for field, dtype in SCHEMA.items()}
+    return columns, categories, winner_models
+
+
+def write_columns(out_dir: str, columns: Dict[str, np.ndarray], categories: List[str],
+                  source_version: Optional[str] = None, extra_meta: Optional[Dict] = None,
+                  winner_models: Optional[List[Dict]] = None) -> str:
+    """
+    Kolonları yeni bir nesil olarak yaz ve meta.json'u atomik olarak değiştir
+
+    Args:
+        out_dir: Kolon dizini
+        columns: Alan adı -> dizi
+        categories: Kategori tablosu
+        source_version: Kaynak JSON versiyon damgası
+        extra_meta: meta.json'a eklenecek ek alanlar
+        winner_models: Kazanan modeli tablosu
+
+    Returns:
+        str: Yazılan nesil kimliği
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    generation = uuid.uuid4().hex[:12]
+    rows = len(columns['n_images'])
+
+    for field, dtype in SCHEMA.items():
+        array = np.ascontiguousarray(columns[field], dtype=dtype)
+        if len(array) != rows:
+            raise ValueError(f"Kolon uzunluğu uyuşmuyor: {field}")
+        path = os.path.join(out_dir, f"{field}.{generation}.npy")
+        with open(path, 'wb') as f:
+            np.save(f, array)
+            f.flush()
+            os.fsync(f.fileno())
+
+    _write_meta(out_dir, generation, rows, categories, source_version, extra_meta, winner_models)
+    return generation
+
+
+def _write_meta(out_dir: str, generation: str, rows: int, categories: List[str],
+                source_version: Optional[str], extra_meta: Optional[Dict],
+                winner_models: Optional[List[Dict]]):
+    """meta.json'u atomik olarak değiştir ve eski nesilleri sil"""
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'generation': generation,
+        'rows': rows,
+        'schema': SCHEMA,
+        'categories': categories,
+        'winner_models': winner_models or [],
+        'source_version': source_version,
+    }
+    meta.update(extra_meta or {})
+    tmp_meta = os.path.join(out_dir, f".{META_FILENAME}.{generation}")
+    with open(tmp_meta, 'w') as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_meta, os.path.join(out_dir, META_FILENAME))
+
+    _remove_stale_generations(out_dir, generation)
+
+
+class ColumnWriter:
+    """
+    Satır sayısı önceden bilinen bir nesli parça parça yazar
+
+    Kolonlar memory-map ile diske açılır; bellekte yalnızca yazılan parça
+    tutulur. Nesil `close` çağrılana kadar görünmez (meta.json en son yazılır).
+    """
+
+    def __init__(self, out_dir: str, rows: int):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.rows = rows
+        self.generation = uuid.uuid4().hex[:12]
+        self.categories: List[str] = []
+        self.winner_models: List[Dict] = []
+        self.position = 0
+        self._columns = {
+            field: np.lib.format.open_memmap(
+                os.path.join(out_dir, f"{field}.{self.generation}.npy"), mode='w+', dtype=dtype, shape=(rows,)
+            )
+            for field, dtype in SCHEMA.items()
+        }
+
+    def write(self, records: List[Dict]):
+        """
+        Kayıt parçasını sıradaki satırlara yaz
+
+        Args:
+            records: Veri seti kayıtları
+        """
+        columns, self.categories, self.winner_models = records_to_columns(
+            records, self.categories, self.winner_models
+        )
+        stop = self.position + len(records)
+        if stop > self.rows:
+            raise ValueError(f"Nesil {self.rows} satırlık; {stop} satır yazılmak istendi")
+        for field, array in columns.items():
+            self._columns[field][self.position:stop] = array
+        self.position = stop
+
+    def abort(self):
+        """Yarım kalan nesli sil (meta.json yazılmadığı için okuyucular hiç görmez)"""
+        self._columns = {}
+        for field in SCHEMA:
+            try:
+                os.remove(os.path.join(self.out_dir, f"{field}.{self.generation}.npy"))
+            except OSError:
+                pass
+
+    def close(self, source_version: Optional[str] = None, extra_meta: Optional[Dict] = None) -> str:
+        """
+        Kolonları diske aktar ve nesli meta.json ile yayınla
+
+        Returns:
+            str: Yazılan nesil kimliği
+        """
+        if self.position != self.rows:
+            raise ValueError(f"Nesil eksik: {self.position}/{self.rows} satır yazıldı")
+        for column in self._columns.values():
+            column.flush()
+        self._columns = {}
+        _write_meta(
+            self.out_dir, self.generation, self.rows, self.categories,
+            source_version, extra_meta, self.winner_models
+        )
+        return self.generation
+
+
+def _remove_stale_generations(out_dir: str, generation: str):
+    # Açık memory-map'ler POSIX'te silinen dosyayı okumaya devam edebilir
+    for name in os.listdir(out_dir):
+        if name.endswith('.npy') and f".{generation}." not in name:
+            try:
+                os.remove(os.path.join(out_dir, name))
+            except OSError:
+                pass
+
+
+def convert_json_to_columns(json_path: str, out_dir: Optional[str] = None) -> 'ColumnarDataset':
+    """
+    Eski JSON veri setini kolon formatına çevir
+
+    Args:
+        json_path: JSON veri seti yolu
+        out_dir: Kolon dizini (varsayılan: <json adı>.columns)
+
+    Returns:
+        ColumnarDataset: Yazılan veri seti
+    """
+    from .match_predictor import get_file_version
+
+    out_dir = out_dir or columns_path_for(json_path)
+    source_version = get_file_version(json_path)
+    with open(json_path, 'r') as f:
+        records = json.load(f)
+    columns, categories, winner_models = records_to_columns(records)
+    write_columns(out_dir, columns, categories, source_version,
+                  extra_meta={'source_rows': len(records)}, winner_models=winner_models)
+    return ColumnarDataset.open(out_dir)
+
+
+class ColumnarDataset:
+    """Memory-map ile açılan kolon tabanlı veri seti"""
+
+    def __init__(self, path: str, meta: Dict):
+        self.path = path
+        self.meta = meta
+        self.categories: List[str] = meta['categories']
+        self.winner_models: List[Dict] = meta.get('winner_models', [])
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def open(cls, path: str) -> 'ColumnarDataset':
+        """
+        Kolon dizinini aç (kolonlar ilk erişimde memory-map edilir)
+
+        Args:
+            path: Kolon dizini
+
+        Returns:
+            ColumnarDataset: Veri seti
+        """
+        for attempt in range(3):
+            with open(os.path.join(path, META_FILENAME), 'r') as f:
+                meta = json.load(f)
+            if meta.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"Desteklenmeyen kolon formatı: {meta.get('format_version')}")
+            dataset = cls(path, meta)
+            try:
+                # Nesil silinmeden önce tüm kolonları eşle
+                for field in SCHEMA:
+                    dataset.column(field)
+                return dataset
+            except FileNotFoundError:
+                # Okuma sırasında yeni nesil yazıldı; meta.json'u tekrar oku
+                if attempt == 2:
+                    raise
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Kolon dizini mevcut mu"""
+        return os.path.exists(os.path.join(path, META_FILENAME))
+
+    @property
+    def generation(self) -> str:
+        return self.meta['generation']
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Bir kolonu salt-okunur memory-map olarak getir
+
+        Args:
+            field: Alan adı
+
+        Returns:
+            np.ndarray: Kolon dizisi
+        """
+        if field not in self._columns:
+            if field not in self.meta['schema']:
+                # Alan eklenmeden önce yazılmış nesil: tüm satırlar boş
+                self._columns[field] = np.full(len(self), NULL_INT, dtype=SCHEMA[field])
+                return self._columns[field]
+            path = os.path.join(self.path, f"{field}.{self.generation}.npy")
+            self._columns[field] = np.load(path, mmap_mode='r')
+        return self._columns[field]
+
+    def source_codes(self) -> np.ndarray:
+        """Kaynak kodları (stats_index.SOURCES sırası: 0=simulated, 1=user)"""
+        return self.column('is_user_tournament').astype(np.int64)
+
+    def iter_records(self, chunk_size: int = 65536) -> Iterator[Dict]:
+        """
+        Kayıtları eski JSON şemasında parça parça üret
+
+        Args:
+            chunk_size: Tek seferde okunacak satır sayısı
+
+        Yields:
+            Dict: Veri seti kaydı
+        """
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            chunk = {field: self.column(field)[start:stop].tolist() for field in SCHEMA}
+            for i in range(stop - start):
+                yield self._build_record({field: values[i] for field, values in chunk.items()})
+
+    def to_records(self) -> List[Dict]:
+        """Tüm kayıtları liste olarak getir"""
+        return list(self.iter_records())
+
+    def records_at(self, indices: np.ndarray) -> List[Dict]:
+        """Verilen satırların kayıtları"""
+        chunk = {field: self.column(field)[indices].tolist() for field in SCHEMA}
+        return [self._build_record({field: values[i] for field, values in chunk.items()})
+                for i in range(len(indices))]
+
+    def _build_record(self, row: Dict) -> Dict:
+        record = {
+            'n_images': row['n_images'],
+            'total_matches': row['total_matches'],
+            'tournament_id': row['tournament_id'] if row['tournament_id'] != NULL_INT else None,
+            'simulation_id': row['simulation_id'],
+            'real_images': row['real_images'],
+            'total_images_after_padding': row['total_images_after_padding'],
+            'rounds_played': row['rounds_played'],
+            'is_completed': row['is_completed'],
+        }
+        if row['is_user_tournament']:
+            record['simulation_id'] = f"user_{row['user_id']}_{row['tournament_id']}"
+            record['category'] = self.categories[row['category']] if row['category'] != NULL_INT else None
+            record['user_id'] = row['user_id']
+            for field in TIME_FIELDS:
+                record[field] = _from_epoch_us(row[field])
+            record['is_user_tournament'] = True
+        elif row['category'] != NULL_INT:
+            record['category'] = self.categories[row['category']]
+        if row['winner_model'] != NULL_INT:
+            record['winner_model'] = self.winner_models[row['winner_model']]
+        return record
@@ -0,0 +1,114 @@
+"""
+Kritik Değer Tablosu
+Bu modül, güven aralıkları için t (df=1..T_MAX_SAMPLES-1) ve z kritik
+değerlerini sağlar. Yaygın güven seviyeleri (%90, %95, %99) için değerler
+önceden hesaplanmış sabitlerdir; scipy yalnızca bu seviyelerin dışındaki bir
+seviye istendiğinde (ilk kullanımda) yüklenir. Böylece tahmin modelini içe
+aktaran worker'lar ve yönetim komutları scipy'nin yükleme süresini ve
+belleğini ödemez.
+"""
+
+from functools import lru_cache
+from typing import Dict
+
+import numpy as np
+
+# t-dağılımının kullanıldığı en büyük örnek sayısı (üstünde z)
+T_MAX_SAMPLES = 30
+
+# Model paketine tablosu yazılan ve isteklerde seçilebilen güven seviyeleri
+DEFAULT_CONFIDENCE_LEVELS = (0.9, 0.95, 0.99)
+
+# scipy.stats.t.ppf(0.5 + seviye / 2, df), df = 1..29
+_T_TABLES = {
+    0.9: [
+        6.313751514675037, 2.9199855803537242, 2.3533634348018233, 2.1318467863266495,
+        2.0150483733330233, 1.9431802805153042, 1.8945786050900062, 1.8595480375308973,
+        1.833112932656237, 1.8124611228116756, 1.7958848187040433, 1.782287555649319,
+        1.7709333959868725, 1.761310135774891, 1.753050355692572, 1.7458836762762495,
+        1.7396067260750725, 1.7340636066175388, 1.7291328115213682, 1.7247182429207866,
+        1.720742902811878, 1.7171443743802424, 1.713871527747048, 1.710882079909428,
+        1.7081407612518986, 1.7056179197592727, 1.7032884457221265, 1.7011309342659313,
+        1.6991270265334972,
+    ],
+    0.95: [
+        12.706204736174694, 4.302652729749462, 3.1824463052837078, 2.7764451051977934,
+        2.5705818356363146, 2.4469118511449786, 2.364624251592784, 2.306004135204166,
+        2.262157162798205, 2.228138851986274, 2.200985160091639, 2.1788128296672284,
+        2.1603686564627913, 2.144786687917804, 2.131449545559776, 2.1199052992212546,
+        2.1098155778333156, 2.1009220402410382, 2.0930240544083087, 2.085963447265864,
+        2.0796138447276795, 2.0738730679040254, 2.0686576104190486, 2.0638985616280245,
+        2.0595385527532972, 2.0555294386428735, 2.0518305164802846, 2.0484071417952454,
+        2.045229642132703,
+    ],
+    0.99: [
+        63.656741162871526, 9.924843200918287, 5.840909309733355, 4.604094871349992,
+        4.032142983555228, 3.7074280213248065, 3.4994832973504924, 3.355387331333395,
+        3.249835541592126, 3.16927267261695, 3.1058065155392804, 3.0545395893929013,
+        3.012275838716578, 2.9768427343708344, 2.946712883475238, 2.9207816224251,
+        2.8982305196774183, 2.8784404727386077, 2.8609346064649794, 2.8453397097861077,
+        2.83135955802305, 2.8187560606001423, 2.807335683769999, 2.796939504774456,
+        2.78743581367697, 2.778714533329683, 2.770682957122211, 2.763262455461444,
+        2.756385903670605,
+    ],
+}
+
+# scipy.stats.norm.ppf(0.5 + seviye / 2)
+_Z_VALUES = {
+    0.9: 1.6448536269514722,
+    0.95: 1.959963984540054,
+    0.99: 2.5758293035489004,
+}
+
+
+def _table_key(confidence_level: float) -> float:
+    return round(float(confidence_level), 6)
+
+
+@lru_cache(maxsize=32)
+def _scipy_table(confidence_level: float) -> Dict:
+    import scipy.stats as stats
+
+    q = 0.5 + confidence_level / 2
+    return {
+        'confidence_level': confidence_level,
+        't': [float(stats.t.ppf(q, df=df)) for df in range(1, T_MAX_SAMPLES)],
+        'z': float(stats.norm.ppf(q)),
+    }
+
+
+def critical_value_table(confidence_level: float = 0.95) -> Dict:
+    """
+    Güven seviyesi için kritik değer tablosu
+
+    Args:
+        confidence_level: Güven seviyesi (0-1 arası)
+
+    Returns:
+        Dict: 'confidence_level', 't' (df=1..T_MAX_SAMPLES-1) ve 'z'
+    """
+    if not 0 < confidence_level < 1:
+        raise ValueError(f"Geçersiz güven seviyesi: {confidence_level}")
+    key = _table_key(confidence_level)
+    if key in _T_TABLES:
+        return {'confidence_level': confidence_level, 't': list(_T_TABLES[key]), 'z': _Z_VALUES[key]}
+    table = _scipy_table(key)
+    return {'confidence_level': confidence_level, 't': list(table['t']), 'z': table['z']}
+
+
+def lookup_critical_values(sample_sizes, table: Dict) -> np.ndarray:
+    """
+    Örnek sayıları için kritik değerler (n<=T_MAX_SAMPLES: t, df=n-1; üstünde z)
+
+    Args:
+        sample_sizes: Örnek sayıları
+        table: critical_value_table çıktısı
+
+    Returns:
+        np.ndarray: Kritik değerler (n=1 için nan)
+    """
+    counts = np.asarray(sample_sizes, dtype=np.int64)
+    t_values = np.array([np.nan] + list(table['t']))
+    return np.where(
+        counts <= T_MAX_SAMPLES, t_values[np.clip(counts - 1, 0, T_MAX_SAMPLES - 1)], table['z']
+    )
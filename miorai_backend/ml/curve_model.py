@@ -0,0 +1,235 @@
+"""
+Kapalı Form Maç Sayısı Modeli
+Bu modül, toplam maç sayısının ortalamasını ve varyansını resim sayısının
+düzgün fonksiyonları olarak modeller:
+
+    E[maç](n)   = a0·n + a1·n·log2(n) + a2·n·log2(n)²
+    Var[maç](n) = b0·n + b1·n·log2(n) + b2·n·log2(n)²
+
+Katsayılar N bazındaki momentlerden göreli ağırlıklı en küçük kareler ile
+bulunur ve `ml/models/` altında küçük bir JSON dosyasında saklanır. Tahmin
+sırasında ham veriye ihtiyaç yoktur; her N için maliyet O(1)'dir.
+
+Gerçek ortalama N'in ikili gösterimine bağlı testere dişi bir yapı izler
+(ör. tek N, N-1 ile aynı sayıda maç üretir). Düzgün eğrinin bu yapıdan
+sapması (göreli artık varyansı) tahmin aralığına eklenir.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from statistics import NormalDist
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+FORMAT_VERSION = 1
+CURVE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'match_count_curve.json')
+BASIS_DEGREE = 3
+
+
+def curve_basis(n_images) -> np.ndarray:
+    """
+    Eğri tabanı: [n, n·log2 n, n·log2² n]
+
+    Args:
+        n_images: Resim sayısı (skaler veya dizi)
+
+    Returns:
+        np.ndarray: (..., 3) taban matrisi
+    """
+    n = np.asarray(n_images, dtype=np.float64)
+    log_n = np.log2(np.maximum(n, 1.0))
+    return np.stack([n * log_n ** k for k in range(BASIS_DEGREE)], axis=-1)
+
+
+def _relative_scale(n_images: np.ndarray) -> np.ndarray:
+    # Her N'e eşit göreli ağırlık: küçük N'lerin yoğunluğu büyük N'leri bastırmaz
+    n = np.asarray(n_images, dtype=np.float64)
+    return n * np.maximum(np.log2(np.maximum(n, 1.0)), 1.0)
+
+
+class MatchCountCurve:
+    """Ortalama ve varyans eğrileri ile tahmin aralığı üreten model"""
+
+    def __init__(self, mean_coef, mean_cov, var_coef, residual_var: float, n_min: int, n_max: int,
+                 sample_size: int = 0, source: Optional[str] = None, fitted_at: Optional[str] = None):
+        self.mean_coef = np.asarray(mean_coef, dtype=np.float64)
+        self.mean_cov = np.asarray(mean_cov, dtype=np.float64)
+        self.residual_var = float(residual_var)
+        self.var_coef = np.asarray(var_coef, dtype=np.float64)
+        self.n_min = n_min
+        self.n_max = n_max
+        self.sample_size = sample_size
+        self.source = source
+        self.fitted_at = fitted_at
+
+    @classmethod
+    def fit(cls, n_values: Iterable[int], counts: Iterable[int], means: Iterable[float],
+            variances: Iterable[float], source: Optional[str] = None) -> 'MatchCountCurve':
+        """
+        N bazındaki momentlerden eğrileri uydur
+
+        Args:
+            n_values: Resim sayıları
+            counts: Her N için örnek sayısı
+            means: Her N için ortalama maç sayısı
+            variances: Her N için örnek varyansı (ddof=1)
+            source: Modelin kaynağı (ör. 'simulated', veri seti versiyonu)
+
+        Returns:
+            MatchCountCurve: Uydurulmuş model
+        """
+        n = np.asarray(list(n_values), dtype=np.float64)
+        counts = np.asarray(list(counts), dtype=np.float64)
+        means = np.asarray(list(means), dtype=np.float64)
+        variances = np.asarray(list(variances), dtype=np.float64)
+
+        # Tek örnekli N'ler varyans bilgisi taşımaz
+        keep = (n >= 2) & (counts >= 2)
+        n, counts, means, variances = n[keep], counts[keep], means[keep], variances[keep]
+        if len(n) < BASIS_DEGREE:
+            raise ValueError(f"Eğri uydurmak için en az {BASIS_DEGREE} farklı N gerekli")
+
+        X = curve_basis(n) / _relative_scale(n)[:, None]
+        mean_coef, var_coef = (
+            np.linalg.lstsq(X, target / _relative_scale(n), rcond=None)[0] for target in (means, variances)
+        )
+
+        # Göreli artık varyansı ve ortalama katsayılarının kovaryansı
+        residuals = means / _relative_scale(n) - X @ mean_coef
+        dof = max(len(n) - BASIS_DEGREE, 1)
+        residual_var = float(residuals @ residuals) / dof
+        mean_cov = residual_var * np.linalg.pinv(X.T @ X)
+
+        return cls(
+            mean_coef, mean_cov, var_coef, residual_var,
+            n_min=int(n.min()), n_max=int(n.max()),
+            sample_size=int(counts.sum()), source=source,
+            fitted_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    @classmethod
+    def fit_from_index(cls, index, source: Optional[str] = 'simulated') -> 'MatchCountCurve':
+        """
+        MomentIndex'teki momentlerden eğrileri uydur
+
+        Args:
+            index: stats_index.MomentIndex
+            source: Kullanılacak kaynak ('simulated', 'user' veya tümü için None)
+
+        Returns:
+            MatchCountCurve: Uydurulmuş model
+        """
+        n_values, counts, means, variances = [], [], [], []
+        for n in index.n_values():
+            count, total, total_sq = index.get(n, source=source)
+            if count < 2:
+                continue
+            n_values.append(n)
+            counts.append(count)
+            means.append(total / count)
+            variances.append((count * total_sq - total * total) / (count * (count - 1)))
+        return cls.fit(n_values, counts, means, variances, source=source or 'all')
+
+    def predict_arrays(self, n_images, confidence_level: float = 0.95) -> Dict[str, np.ndarray]:
+        """
+        Birden çok N için vektörel tahmin
+
+        Args:
+            n_images: Resim sayıları
+            confidence_level: Tahmin aralığı güven seviyesi
+
+        Returns:
+            Dict: 'mean', 'std', 'lower', 'upper', 'margin' dizileri
+        """
+        n = np.asarray(n_images, dtype=np.float64)
+        X = curve_basis(n)
+        mean = np.maximum(X @ self.mean_coef, 0.0)
+        variance = np.maximum(X @ self.var_coef, 0.0)
+
+        # Yeni bir turnuva için tahmin aralığı:
+        # süreç varyansı + eğrinin gerçek ortalamadan sapması + katsayı belirsizliği
+        scale = _relative_scale(n)
+        scaled_X = X / scale[..., None]
+        mean_se2 = np.einsum('...i,ij,...j->...', scaled_X, self.mean_cov, scaled_X) * scale ** 2
+        std = np.sqrt(variance + self.residual_var * scale ** 2 + mean_se2)
+        z = NormalDist().inv_cdf(0.5 + confidence_level / 2)
+        margin = z * std
+
+        # 2'den az resimle maç oynanmaz
+        trivial = n < 2
+        mean = np.where(trivial, 0.0, mean)
+        std = np.where(trivial, 0.0, std)
+        margin = np.where(trivial, 0.0, margin)
+        return {
+            'mean': mean,
+            'std': std,
+            'lower': np.maximum(mean - margin, 0.0),
+            'upper': mean + margin,
+            'margin': margin,
+        }
+
+    def predict(self, n_images: int, confidence_level: float = 0.95) -> Dict:
+        """
+        Tek bir N için tahmin (O(1))
+
+        Args:
+            n_images: Resim sayısı
+            confidence_level: Tahmin aralığı güven seviyesi
+
+        Returns:
+            Dict: Ortalama, standart sapma ve tahmin aralığı
+        """
+        result = self.predict_arrays([n_images], confidence_level)
+        return {
+            'mean': round(float(result['mean'][0]), 2),
+            'std': round(float(result['std'][0]), 2),
+            'prediction_interval': (round(float(result['lower'][0]), 2), round(float(result['upper'][0]), 2)),
+            'margin_of_error': round(float(result['margin'][0]), 2),
+            'confidence_level': confidence_level,
+            'extrapolated': not (self.n_min <= n_images <= self.n_max),
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'format_version': FORMAT_VERSION,
+            'basis': 'n * log2(n)**k, k=0..2',
+            'mean_coef': self.mean_coef.tolist(),
+            'mean_cov': self.mean_cov.tolist(),
+            'var_coef': self.var_coef.tolist(),
+            'residual_var': self.residual_var,
+            'n_min': self.n_min,
+            'n_max': self.n_max,
+            'sample_size': self.sample_size,
+            'source': self.source,
+            'fitted_at': self.fitted_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MatchCountCurve':
+        if data.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen eğri formatı: {data.get('format_version')}")
+        return cls(
+            data['mean_coef'], data['mean_cov'], data['var_coef'], data['residual_var'],
+            n_min=data['n_min'], n_max=data['n_max'], sample_size=data.get('sample_size', 0),
+            source=data.get('source'), fitted_at=data.get('fitted_at'),
+        )
+
+    def save(self, path: str = CURVE_PATH):
+        """Parametre dosyasını atomik olarak yaz"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = CURVE_PATH) -> Optional['MatchCountCurve']:
+        """Parametre dosyasını oku; dosya yoksa None"""
+        try:
+            with open(path, 'r') as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
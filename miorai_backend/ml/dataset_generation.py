@@ -0,0 +1,186 @@
+"""
+Paralel ve Devam Ettirilebilir Veri Seti Üretimi
+Bu modül, simülasyon işini (N, parça) kümelerine böler ve bir süreç havuzunda
+vektörel simülatörle çalıştırır. Her parçanın kendi deterministik rastgele
+sayı akışı vardır; sonuç işçi sayısından ve tamamlanma sırasından bağımsızdır.
+
+Her tamamlanan parça kontrol noktası dizinine atomik olarak yazılır; yarıda
+kalan bir çalıştırma `resume=True` ile kaldığı yerden devam eder.
+
+Kontrol noktası dizini (çıktı `tournament_dataset_v1.json` için):
+    tournament_dataset_v1.shards/
+        manifest.json        # tohum, N aralığı, parça boyutu, kazanan modeli
+        n0008_s0001.json     # N=8 için 2. parça
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .columnar import ColumnarDataset, columns_path_for, convert_json_to_columns
+from .fast_simulator import VectorizedTournamentSimulator
+from .match_predictor import MatchPredictor
+from .winner_models import winner_model_from_params
+
+MANIFEST_FILENAME = 'manifest.json'
+
+Shard = Tuple[int, int, int, int]  # (n, shard_index, start_id, size)
+
+
+def checkpoint_path_for(output_path: str) -> str:
+    """Çıktı yolundan kontrol noktası dizinini türet"""
+    return os.path.splitext(output_path)[0] + '.shards'
+
+
+def shard_rng(seed: int, n_images: int, shard_index: int) -> np.random.Generator:
+    """(tohum, N, parça) için deterministik rastgele sayı üreteci"""
+    return np.random.default_rng(np.random.SeedSequence([seed, n_images, shard_index]))
+
+
+def plan_shards(n_range: Tuple[int, int], simulations_per_n: int, shard_size: int) -> List[Shard]:
+    """
+    İşi parçalara böl
+
+    Args:
+        n_range: N değerleri aralığı (min, max)
+        simulations_per_n: Her N için simülasyon sayısı
+        shard_size: Parça başına simülasyon sayısı
+
+    Returns:
+        List[Shard]: (n, parça, ilk simulation_id, boyut) listesi
+    """
+    shards = []
+    for n in range(n_range[0], n_range[1] + 1):
+        for shard_index, start in enumerate(range(0, simulations_per_n, shard_size)):
+            shards.append((n, shard_index, start, min(shard_size, simulations_per_n - start)))
+    # Büyük N'ler daha pahalı; önce başlatılırlar
+    shards.sort(key=lambda shard: (-shard[0], shard[1]))
+    return shards
+
+
+def _shard_filename(n_images: int, shard_index: int) -> str:
+    return f"n{n_images:04d}_s{shard_index:04d}.json"
+
+
+def _write_json_atomic(path: str, data):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _run_shard(args: Tuple[str, int, Shard, Dict]) -> Tuple[Shard, int]:
+    checkpoint_dir, seed, shard, winner_model = args
+    n_images, shard_index, start_id, size = shard
+    simulator = VectorizedTournamentSimulator(winner_model=winner_model_from_params(winner_model))
+    records = simulator.simulate(n_images, size, start_id=start_id, rng=shard_rng(seed, n_images, shard_index))
+    _write_json_atomic(os.path.join(checkpoint_dir, _shard_filename(n_images, shard_index)), records)
+    return shard, len(records)
+
+
+def _prepare_checkpoint(checkpoint_dir: str, manifest: Dict, resume: bool):
+    manifest_path = os.path.join(checkpoint_dir, MANIFEST_FILENAME)
+    if resume and os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            previous = json.load(f)
+        if previous != manifest:
+            raise ValueError(
+                f"Kontrol noktası farklı parametrelerle oluşturulmuş: {previous}"
+            )
+        return
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    for name in os.listdir(checkpoint_dir):
+        if name.endswith('.json'):
+            os.remove(os.path.join(checkpoint_dir, name))
+    _write_json_atomic(manifest_path, manifest)
+
+
+def iter_checkpoint_records(checkpoint_dir: str, shards: List[Shard]) -> Iterator[Dict]:
+    """Parça kayıtlarını N ve parça sırasıyla üret"""
+    for n_images, shard_index, _, _ in sorted(shards):
+        with open(os.path.join(checkpoint_dir, _shard_filename(n_images, shard_index)), 'r') as f:
+            yield from json.load(f)
+
+
+def generate_dataset_parallel(output_path: str, n_range: Tuple[int, int] = (2, 64),
+                              simulations_per_n: int = 20, workers: Optional[int] = None,
+                              seed: int = 0, shard_size: int = 1000, resume: bool = False,
+                              keep_user_records: bool = True, write_columns: bool = False,
+                              winner_model: Optional[Dict] = None,
+                              progress: Optional[Callable[[int, int, Shard], None]] = None) -> int:
+    """
+    Veri setini paralel üret ve çıktı dosyasına atomik olarak yaz
+
+    Args:
+        output_path: Çıktı JSON veri seti yolu
+        n_range: N değerleri aralığı (min, max)
+        simulations_per_n: Her N için simülasyon sayısı
+        workers: Süreç sayısı (varsayılan: CPU sayısı, 1: aynı süreçte)
+        seed: Ana tohum
+        shard_size: Parça başına simülasyon sayısı
+        resume: Mevcut kontrol noktasından devam et
+        keep_user_records: Çıktıdaki mevcut kullanıcı turnuvası kayıtlarını koru
+        write_columns: Kolon formatını da yaz (mevcutsa her zaman yenilenir)
+        winner_model: Kazanan modeli tanımı (WinnerModel.params(); varsayılan: uniform)
+        progress: Her parça bittiğinde çağrılır (tamamlanan, toplam, parça)
+
+    Returns:
+        int: Yazılan toplam kayıt sayısı
+    """
+    checkpoint_dir = checkpoint_path_for(output_path)
+    winner_model = winner_model or {'name': 'uniform'}
+    manifest = {
+        'seed': seed,
+        'n_range': list(n_range),
+        'simulations_per_n': simulations_per_n,
+        'shard_size': shard_size,
+        'winner_model': winner_model,
+    }
+    _prepare_checkpoint(checkpoint_dir, manifest, resume)
+
+    shards = plan_shards(n_range, simulations_per_n, shard_size)
+    todo = [
+        shard for shard in shards
+        if not os.path.exists(os.path.join(checkpoint_dir, _shard_filename(shard[0], shard[1])))
+    ]
+    done = len(shards) - len(todo)
+    tasks = [(checkpoint_dir, seed, shard, winner_model) for shard in todo]
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers != 1 else None
+    try:
+        results = executor.map(_run_shard, tasks) if executor else map(_run_shard, tasks)
+        for shard, _ in results:
+            done += 1
+            if progress:
+                progress(done, len(shards), shard)
+    finally:
+        if executor:
+            executor.shutdown()
+
+    user_records = _existing_user_records(output_path) if keep_user_records else []
+    dataset = list(iter_checkpoint_records(checkpoint_dir, shards)) + user_records
+
+    _write_json_atomic(output_path, dataset)
+    if write_columns or ColumnarDataset.exists(columns_path_for(output_path)):
+        # Eski kolonlar yeni JSON ile güncel değil; yeniden oluştur
+        convert_json_to_columns(output_path)
+    return len(dataset)
+
+
+def _existing_user_records(output_path: str) -> List[Dict]:
+    # Sıkıştırılmış kayıtlar yalnızca kolonlarda olabilir; günlükteki bekleyen
+    # kayıtlar günlükte kalır ve burada tekrar eklenmez
+    predictor = MatchPredictor(output_path)
+    try:
+        predictor.load()
+    except FileNotFoundError:
+        return []
+    records = predictor.get_dataset()
+    base = records[:len(records) - len(predictor.pending_records)]
+    return [record for record in base if record.get('is_user_tournament')]
@@ -0,0 +1,156 @@
+"""
+Model Doğruluğu Değerlendirmesi
+Bu modül, kullanıcı turnuvalarını tahminlerle vektörel olarak karşılaştırır.
+Kayıtlar N'e göre bir kez gruplanır, her grup için tahmin momentlerden
+hesaplanır ve hata metrikleri NumPy ile bulunur (O(kayıt + N grubu)).
+
+Değerlendirme modları:
+    in_sample   Tüm veriyle tahmin (kaydın kendisi de modele dahil)
+    holdout     Birini-dışarıda-bırak: her kayıt kendisi hariç veriyle tahmin edilir
+    time_split  Son tamamlanan turnuvaların `test_fraction` kadarı test, öncesi eğitim
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from .columnar import NULL_INT, NULL_TIME, _to_epoch_us
+
+EVALUATION_MODES = ('in_sample', 'holdout', 'time_split')
+
+
+def user_tournament_arrays(predictor) -> Dict[str, np.ndarray]:
+    """
+    Kullanıcı turnuvalarını kolon dizileri olarak getir
+
+    Args:
+        predictor: Yüklü MatchPredictor
+
+    Returns:
+        Dict: 'n_images', 'total_matches', 'tournament_id', 'completed_at' (epoch µs) dizileri
+    """
+    fields = ('n_images', 'total_matches', 'tournament_id', 'completed_at')
+    parts = {field: [] for field in fields}
+
+    if predictor.columns is not None:
+        columns = predictor.columns
+        mask = np.asarray(columns.column('is_user_tournament'))
+        for field in fields:
+            parts[field].append(np.asarray(columns.column(field)[mask], dtype=np.int64))
+        records = [r for r in predictor.pending_records if r.get('is_user_tournament', False)]
+    else:
+        records = [r for r in predictor.get_dataset() if r.get('is_user_tournament', False)]
+
+    parts['n_images'].append(np.array([r.get('n_images', 0) for r in records], dtype=np.int64))
+    parts['total_matches'].append(np.array([r.get('total_matches', 0) for r in records], dtype=np.int64))
+    parts['tournament_id'].append(np.array(
+        [r.get('tournament_id') if r.get('tournament_id') is not None else NULL_INT for r in records], dtype=np.int64
+    ))
+    parts['completed_at'].append(np.array([_to_epoch_us(r.get('completed_at')) for r in records], dtype=np.int64))
+
+    return {field: np.concatenate(arrays) for field, arrays in parts.items()}
+
+
+def evaluate_accuracy(predictor, mode: str = 'in_sample', test_fraction: float = 0.2,
+                      include_records: bool = True) -> Dict:
+    """
+    Kullanıcı turnuvaları üzerinde model doğruluğunu değerlendir
+
+    Args:
+        predictor: Yüklü MatchPredictor
+        mode: 'in_sample', 'holdout' veya 'time_split'
+        test_fraction: time_split modunda test kümesi oranı
+        include_records: Kayıt bazlı sonuçları da döndür
+
+    Returns:
+        Dict: 'accuracy_data' (isteğe bağlı) ve 'summary'
+    """
+    if mode not in EVALUATION_MODES:
+        raise ValueError(f"Geçersiz değerlendirme modu: {mode}")
+
+    data = user_tournament_arrays(predictor)
+    keep = data['n_images'] >= 2
+    data = {field: values[keep] for field, values in data.items()}
+    n_images, actual = data['n_images'], data['total_matches']
+
+    # N'e göre bir kez grupla; grup momentleri indeksten O(1)
+    unique_n, inverse = np.unique(n_images, return_inverse=True)
+    index = predictor.get_index()
+    moments = np.array([index.get(int(n))[:2] for n in unique_n], dtype=np.float64).reshape(-1, 2)
+    group_count, group_sum = moments[:, 0], moments[:, 1]
+
+    evaluated = np.ones(len(actual), dtype=bool)
+    if mode == 'in_sample':
+        train_count = group_count[inverse]
+        train_sum = group_sum[inverse]
+    elif mode == 'holdout':
+        train_count = group_count[inverse] - 1
+        train_sum = group_sum[inverse] - actual
+    else:
+        evaluated = _time_split_test_mask(data['completed_at'], test_fraction)
+        test_count = np.bincount(inverse[evaluated], minlength=len(unique_n))
+        test_sum = np.bincount(inverse[evaluated], weights=actual[evaluated], minlength=len(unique_n))
+        train_count = (group_count - test_count)[inverse]
+        train_sum = (group_sum - test_sum)[inverse]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        predicted = np.where(train_count > 0, train_sum / np.maximum(train_count, 1), np.nan)
+
+    # Eğitim verisi olmayan gruplar için kapalı form eğri
+    curve = predictor.get_curve()
+    no_data = evaluated & (train_count <= 0)
+    if curve is not None and no_data.any():
+        predicted[no_data] = curve.predict_arrays(n_images[no_data])['mean']
+    evaluated &= ~np.isnan(predicted)
+
+    predicted = np.round(predicted[evaluated], 2)
+    actual_eval = actual[evaluated].astype(np.float64)
+    errors = predicted - actual_eval
+    abs_errors = np.abs(errors)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        percentage_errors = np.where(actual_eval > 0, abs_errors / actual_eval * 100, 0.0)
+
+    total = int(evaluated.sum())
+    mape = float(percentage_errors.mean()) if total else 0.0
+    summary = {
+        'mode': mode,
+        'total_predictions': total,
+        'average_error': round(float(abs_errors.mean()), 2) if total else 0,
+        'average_percentage_error': round(mape, 2),
+        'accuracy_score': round(max(0, 100 - mape), 2),
+        'rmse': round(float(np.sqrt((errors ** 2).mean())), 2) if total else 0,
+        'bias': round(float(errors.mean()), 2) if total else 0,
+    }
+    if mode == 'time_split':
+        summary['test_fraction'] = test_fraction
+
+    result = {'summary': summary}
+    if include_records:
+        tournament_ids = data['tournament_id'][evaluated]
+        result['accuracy_data'] = [
+            {
+                'n_images': n,
+                'actual_matches': a,
+                'predicted_matches': p,
+                'error': round(e, 2),
+                'percentage_error': round(pe, 2),
+                'tournament_id': t if t != NULL_INT else None
+            }
+            for n, a, p, e, pe, t in zip(
+                n_images[evaluated].tolist(), actual[evaluated].tolist(), predicted.tolist(),
+                abs_errors.tolist(), percentage_errors.tolist(), tournament_ids.tolist()
+            )
+        ]
+    return result
+
+
+def _time_split_test_mask(completed_at: np.ndarray, test_fraction: float) -> np.ndarray:
+    # Tamamlanma zamanı olmayan kayıtlar en eskiler sayılır (eğitimde kalır)
+    if not 0 < test_fraction < 1:
+        raise ValueError("test_fraction 0 ile 1 arasında olmalı")
+    test_size = int(np.ceil(len(completed_at) * test_fraction))
+    mask = np.zeros(len(completed_at), dtype=bool)
+    if test_size:
+        order = np.argsort(np.where(completed_at == NULL_TIME, np.iinfo(np.int64).min, completed_at), kind='stable')
+        mask[order[-test_size:]] = True
+    return mask
@@ -0,0 +1,263 @@
+"""
+Vektörel Turnuva Simülasyonu
+Bu modül, TournamentSimulator ile aynı eşleştirme ve geçişlilik kurallarını
+veritabanı kullanmadan NumPy dizileri üzerinde uygular. Aynı N değerine sahip
+binlerce turnuva tek bir (B, N, N) kazanma matrisi üzerinde birlikte simüle
+edilir.
+
+Kurallar (tournaments.views.SubmitMatchResultView ile aynı):
+    - Resimler (rounds_played, points) anahtarına göre gruplanır, grup içinde
+      id sırasıyla ardışık ikililer eşleşir; tek kalan bye alır (+1 round).
+    - Kazanma matrisinde sonucu belli olan ikili otomatik çözülür
+      (önce M[a][b], sonra M[b][a]; kazanan +1, kaybeden -1 puan, ikisi de +1 round).
+    - Oynanan maç sadece matrisi günceller: M[w][l] = 1, M[w] |= M[l].
+    - Hiçbir grupta 2 resim kalmadığında turnuva biter.
+
+`live_rules=True` ile oynanan maçlar SubmitMatchResultView'daki gibi işlenir:
+kazanan +1, kaybeden -1 puan, ikisi de +1 round ve kazanma matrisinin tam
+geçişli kapanışı. Canlı bir turnuvanın kalan maç tahmini (simulate_from_state)
+bu kurallarla yapılır.
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# winner_fn(rng, t, a, b) -> a'nın kazandığı maçlar için True dizisi
+WinnerFn = Callable[[np.random.Generator, np.ndarray, np.ndarray, np.ndarray], np.ndarray]
+
+
+def uniform_winner(rng: np.random.Generator, t: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Her maçta kazananı eşit olasılıkla seç (random.choice ile aynı)"""
+    return rng.random(len(a)) < 0.5
+
+
+def padded_size(n_images: int) -> int:
+    """2'nin kuvvetine tamamlanmış resim sayısı"""
+    return 2 ** math.ceil(math.log2(n_images))
+
+
+class VectorizedTournamentSimulator:
+    """Veritabanısız, toplu (batch) turnuva simülasyonu"""
+
+    def __init__(self, seed: Optional[int] = None, batch_size: int = 1024,
+                 winner_fn: Optional[WinnerFn] = None, live_rules: bool = False, winner_model=None):
+        """
+        Args:
+            seed: Rastgele sayı tohumu
+            batch_size: Tek seferde simüle edilen turnuva sayısı
+            winner_fn: Sabit kazanan fonksiyonu (verilirse winner_model yok sayılır)
+            live_rules: Oynanan maçları SubmitMatchResultView kurallarıyla işle
+            winner_model: winner_models.WinnerModel (varsayılan: uniform); parametreleri kayıtlara yazılır
+        """
+        if winner_fn is None and winner_model is None:
+            from .winner_models import UniformWinner
+            winner_model = UniformWinner()
+        self.rng = np.random.default_rng(seed)
+        self.batch_size = batch_size
+        self.winner_fn = winner_fn
+        self.winner_model = winner_model if winner_fn is None else None
+        self.live_rules = live_rules
+
+    def _start_winner(self, rng: np.random.Generator, n_tournaments: int, n_images: int) -> WinnerFn:
+        if self.winner_fn is not None:
+            return self.winner_fn
+        return self.winner_model.start(rng, n_tournaments, n_images)
+
+    def simulate_batch(self, n_images: int, n_tournaments: int,
+                       rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+        """
+        Aynı N değerine sahip turnuvaları birlikte simüle et
+
+        Args:
+            n_images: Resim sayısı
+            n_tournaments: Turnuva sayısı
+            rng: Rastgele sayı üreteci (varsayılan: simülatörün üreteci)
+
+        Returns:
+            Dict: 'total_matches' ve 'rounds_played' dizileri (uzunluk n_tournaments)
+        """
+        rng = rng if rng is not None else self.rng
+        B, n = n_tournaments, n_images
+        if n < 2 or B == 0:
+            return {'total_matches': np.zeros(B, dtype=np.int64), 'rounds_played': np.ones(B, dtype=np.int64)}
+
+        points = np.zeros((B, n), dtype=np.int64)
+        rounds = np.zeros((B, n), dtype=np.int64)
+        matrix = np.zeros((B, n, n), dtype=bool)
+        return self._run(points, rounds, matrix, rng, self._start_winner(rng, B, n))
+
+    def simulate_from_state(self, points, rounds, matrix, pending: List[Tuple[int, int]],
+                            n_tournaments: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Yarıda kalmış bir turnuvayı mevcut durumundan itibaren birçok kez sonuna kadar oyna
+
+        Args:
+            points: Resim puanları (n,)
+            rounds: Resimlerin oynadığı round sayıları (n,)
+            matrix: Kazanma matrisi (n, n)
+            pending: Mevcut round'da henüz oynanmamış maçlar (resim index çiftleri)
+            n_tournaments: Rollout sayısı
+            rng: Rastgele sayı üreteci
+
+        Returns:
+            np.ndarray: Her rollout için kalan maç sayısı (bekleyen maçlar dahil)
+        """
+        rng = rng if rng is not None else self.rng
+        B = n_tournaments
+        points = np.repeat(np.asarray(points, dtype=np.int64)[None], B, axis=0)
+        rounds = np.repeat(np.asarray(rounds, dtype=np.int64)[None], B, axis=0)
+        matrix = np.repeat(np.asarray(matrix, dtype=bool)[None], B, axis=0)
+        if B == 0 or points.shape[1] < 2:
+            return np.zeros(B, dtype=np.int64)
+
+        winner_fn = self._start_winner(rng, B, points.shape[1])
+        if pending:
+            a, b = (np.tile(np.asarray(side, dtype=np.int64), B) for side in zip(*pending))
+            t = np.repeat(np.arange(B), len(pending))
+            self._play(rng, winner_fn, points, rounds, matrix, t, a, b)
+        return len(pending) + self._run(points, rounds, matrix, rng, winner_fn)['total_matches']
+
+    def _play(self, rng, winner_fn, points, rounds, matrix, t, a, b):
+        # Oynanan maçlar: bir turdaki maçlar ayrık olduğundan sıralarından bağımsızdır
+        a_wins = winner_fn(rng, t, a, b)
+        w = np.where(a_wins, a, b)
+        l = np.where(a_wins, b, a)
+        if not self.live_rules:
+            matrix[t, w] |= matrix[t, l]
+            matrix[t, w, l] = True
+            return
+
+        points[t, w] += 1
+        points[t, l] -= 1
+        rounds[t, w] += 1
+        rounds[t, l] += 1
+        # Tam kapanış: w'yi yenen herkes l'nin yendiklerini de yener. Aynı turnuvanın
+        # maçları zincir oluşturabileceğinden her turnuvanın k. maçı birlikte işlenir
+        slot = np.arange(len(t)) - np.searchsorted(t, t)
+        for k in range(int(slot.max()) + 1 if len(t) else 0):
+            sel = slot == k
+            tt, ww, ll = t[sel], w[sel], l[sel]
+            rows = np.arange(len(tt))
+            beats_w = matrix[tt, :, ww]
+            beats_w[rows, ww] = True
+            beaten_by_l = matrix[tt, ll]
+            beaten_by_l[rows, ll] = True
+            matrix[tt] |= beats_w[:, :, None] & beaten_by_l[:, None, :]
+
+    def _run(self, points, rounds, matrix, rng, winner_fn) -> Dict[str, np.ndarray]:
+        B, n = points.shape
+        total_matches = np.zeros(B, dtype=np.int64)
+        current_round = np.ones(B, dtype=np.int64)
+        active = np.ones(B, dtype=bool)
+
+        ids = np.arange(n)
+        key_span = 2 * (n + int(np.abs(points).max())) + 1
+        max_steps = 4 * n * n + 16
+
+        for _ in range(max_steps):
+            # (rounds, points) grubuna, grup içinde id'ye göre sırala
+            key = rounds * key_span + points + key_span // 2
+            order = np.argsort(key * n + ids, axis=1)
+            sorted_key = np.take_along_axis(key, order, axis=1)
+
+            same_next = sorted_key[:, 1:] == sorted_key[:, :-1]
+            is_start = np.ones((B, n), dtype=bool)
+            is_start[:, 1:] = ~same_next
+            start = np.maximum.accumulate(np.where(is_start, ids, 0), axis=1)
+            even_rank = (ids - start) % 2 == 0
+
+            pair_first = even_rank[:, :-1] & same_next & active[:, None]
+            has_pair = pair_first.any(axis=1)
+
+            # Bitiş: hiçbir grupta en az 2 resim yok
+            active &= has_pair
+            if not active.any():
+                break
+
+            t, j = np.nonzero(pair_first)
+            a = order[t, j]
+            b = order[t, j + 1]
+
+            has_next = np.zeros((B, n), dtype=bool)
+            has_next[:, :-1] = same_next
+            bye_t, bye_j = np.nonzero(even_rank & ~has_next & active[:, None])
+            rounds[bye_t, order[bye_t, bye_j]] += 1
+
+            # Geçişlilikten otomatik sonuç
+            a_beats_b = matrix[t, a, b]
+            b_beats_a = matrix[t, b, a] & ~a_beats_b
+            auto = a_beats_b | b_beats_a
+            auto_t = t[auto]
+            auto_w = np.where(a_beats_b, a, b)[auto]
+            auto_l = np.where(a_beats_b, b, a)[auto]
+            points[auto_t, auto_w] += 1
+            points[auto_t, auto_l] -= 1
+            rounds[auto_t, auto_w] += 1
+            rounds[auto_t, auto_l] += 1
+
+            manual = ~auto
+            if manual.any():
+                self._play(rng, winner_fn, points, rounds, matrix, t[manual], a[manual], b[manual])
+                total_matches += np.bincount(t[manual], minlength=B)
+
+            current_round[active] += 1
+        else:
+            raise RuntimeError(f"Simülasyon sonlanmadı (N={n})")
+
+        return {'total_matches': total_matches, 'rounds_played': current_round}
+
+    def simulate(self, n_images: int, n_simulations: int, start_id: int = 0,
+                 rng: Optional[np.random.Generator] = None) -> List[Dict]:
+        """
+        N resimle turnuvalar simüle et ve veri seti kayıtlarını döndür
+
+        Args:
+            n_images: Resim sayısı
+            n_simulations: Simülasyon sayısı
+            start_id: İlk simulation_id
+            rng: Rastgele sayı üreteci
+
+        Returns:
+            List[Dict]: TournamentSimulator.simulate_tournament ile aynı şemada kayıtlar
+        """
+        records = []
+        extra = {'winner_model': self.winner_model.params()} if self.winner_model is not None else {}
+        for offset in range(0, n_simulations, self.batch_size):
+            size = min(self.batch_size, n_simulations - offset)
+            result = self.simulate_batch(n_images, size, rng)
+            records.extend(
+                {
+                    'n_images': n_images,
+                    'total_matches': total,
+                    'tournament_id': None,
+                    'simulation_id': start_id + offset + i,
+                    'real_images': n_images,
+                    'total_images_after_padding': padded_size(n_images),
+                    'rounds_played': rounds_played,
+                    'is_completed': True,
+                    **extra,
+                }
+                for i, (total, rounds_played) in enumerate(
+                    zip(result['total_matches'].tolist(), result['rounds_played'].tolist())
+                )
+            )
+        return records
+
+    def generate_dataset(self, n_range: Tuple[int, int] = (2, 128),
+                         simulations_per_n: int = 10) -> List[Dict]:
+        """
+        Veri seti oluştur
+
+        Args:
+            n_range: N değerleri aralığı (min, max)
+            simulations_per_n: Her N için simülasyon sayısı
+
+        Returns:
+            List[Dict]: Veri seti
+        """
+        dataset = []
+        for n in range(n_range[0], n_range[1] + 1):
+            dataset.extend(self.simulate(n, simulations_per_n))
+        return dataset
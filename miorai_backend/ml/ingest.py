@@ -0,0 +1,361 @@
+"""
+Sadece Ekleme Yapılan ML Veri Seti Günlüğü
+Bu modül, tamamlanan turnuva kayıtlarını JSONL günlüğüne O(1) maliyetle ve
+dosya kilidiyle ekler; periyodik sıkıştırma (compaction) günlüğü kolon
+formatındaki ana veri setine taşır.
+
+Dosyalar (veri seti yolu `tournament_dataset_v1.json` için):
+    tournament_dataset_v1.jsonl                   # aktif günlük
+    tournament_dataset_v1.jsonl.lock              # ekleme/döndürme kilidi
+    tournament_dataset_v1.jsonl.<batch>.compacting  # sıkıştırılmakta olan parti
+
+Çökme güvenliği:
+    - Her kayıt tek bir write() ile eklenir ve fsync edilir; yarım kalan son
+      satır okurken atlanır.
+    - Sıkıştırılan parti kimliği kolon meta.json'una yazılır; yarıda kalan
+      sıkıştırma bir sonraki çalıştırmada tekrar edilmeden tamamlanır.
+
+Sıkıştırılan partilerin tek kopyası kolonlardadır (meta.json'daki `source_rows`
+satırından sonrası). JSON veri seti yeniden yazılırsa (ör. generate_ml_dataset)
+kolonlar yeni JSON ve bu kayıtlarla yeniden oluşturulur (bkz. sync_columns_with_source).
+"""
+
+import glob
+import json
+import os
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .columnar import (
+    ColumnarDataset, SCHEMA, columns_path_for, records_to_columns, write_columns
+)
+
+logger = logging.getLogger('ml')
+
+COMPACTING_SUFFIX = '.compacting'
+MAX_COMPACTED_BATCHES = 32
+
+
+def log_path_for(dataset_path: str) -> str:
+    """Veri seti yolundan günlük yolunu türet"""
+    return os.path.splitext(dataset_path)[0] + '.jsonl'
+
+
+@contextmanager
+def _locked(lock_path: str):
+    """Kilit dosyası üzerinde özel (exclusive) kilit al"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def append_record(record: Dict, dataset_path: str) -> None:
+    """
+    Kaydı günlüğe ekle (O(1), kilitli, fsync'li)
+
+    Args:
+        record: Veri seti kaydı
+        dataset_path: Ana veri seti yolu
+    """
+    append_records([record], dataset_path)
+
+
+def append_records(records: List[Dict], dataset_path: str) -> None:
+    """
+    Kayıtları tek bir yazma işlemiyle günlüğe ekle
+
+    Args:
+        records: Veri seti kayıtları
+        dataset_path: Ana veri seti yolu
+    """
+    if not records:
+        return
+    log_path = log_path_for(dataset_path)
+    with _locked(log_path + '.lock'):
+        _write_records(log_path, records)
+
+
+def _write_records(log_path: str, records: List[Dict]) -> None:
+    data = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records).encode('utf-8')
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _read_log_file(path: str, limit: Optional[int] = None) -> Iterator[Dict]:
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        position = 0
+        for line in f:
+            # Görüntü alındıktan sonra eklenen satırlar okunmaz
+            if limit is not None and position >= limit:
+                break
+            position += len(line)
+            if not line.endswith(b'\n'):
+                # Çökme sonrası yarım kalan son satır
+                logger.warning(f"Günlükte yarım satır atlandı: {path}")
+                break
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Günlükte bozuk satır atlandı: {path}")
+
+
+def _batch_id(path: str) -> str:
+    return os.path.basename(path)[:-len(COMPACTING_SUFFIX)].rsplit('.', 1)[-1]
+
+
+def _pending_batches(dataset_path: str, compacted: Optional[List[str]] = None) -> List[str]:
+    compacted = set(compacted or [])
+    pattern = glob.escape(log_path_for(dataset_path)) + '.*' + COMPACTING_SUFFIX
+    return sorted(path for path in glob.glob(pattern) if _batch_id(path) not in compacted)
+
+
+def iter_pending_records(dataset_path: str, compacted: Optional[List[str]] = None) -> Iterator[Dict]:
+    """
+    Ana veri setine henüz taşınmamış günlük kayıtlarını üret
+
+    Args:
+        dataset_path: Ana veri seti yolu
+        compacted: Kolon meta.json'undaki tamamlanmış parti kimlikleri
+
+    Yields:
+        Dict: Veri seti kaydı
+    """
+    for path in _pending_batches(dataset_path, compacted):
+        yield from _read_log_file(path)
+    yield from _read_log_file(log_path_for(dataset_path))
+
+
+class LogSnapshot:
+    """Günlüğün sabit görüntüsü: bekleyen partiler ve aktif günlüğün alındığı andaki boyutu"""
+
+    def __init__(self, dataset_path: str, compacted: Optional[List[str]] = None):
+        self.log_path = log_path_for(dataset_path)
+        self.batches = _pending_batches(dataset_path, compacted)
+        # Yarım yazılmış bir satırı görüntüye almamak için ekleme kilidi altında ölçülür
+        with _locked(self.log_path + '.lock'):
+            self.log_size = log_size(dataset_path)
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Görüntüdeki kayıtları üret (sonradan eklenenler hariç)"""
+        for path in self.batches:
+            yield from _read_log_file(path)
+        yield from _read_log_file(self.log_path, self.log_size)
+
+
+@contextmanager
+def frozen_dataset(dataset_path: str):
+    """
+    Blok boyunca değişmeyen veri seti görüntüsü (birden çok geçişli okumalar için)
+
+    Sıkıştırma kilidi tutulur: kolon nesli ve bekleyen partiler değişmez.
+    Eklemeler sürer ancak görüntüye dahil edilmez.
+
+    Args:
+        dataset_path: Ana veri seti yolu
+
+    Yields:
+        Tuple: (kolon veri seti, kolon formatı yoksa None; günlük görüntüsü)
+    """
+    with _locked(log_path_for(dataset_path) + '.compact.lock'):
+        columns = _rebase_columns(dataset_path)
+        compacted = columns.meta.get('compacted_batches') if columns is not None else None
+        yield columns, LogSnapshot(dataset_path, compacted)
+
+
+def log_size(dataset_path: str) -> int:
+    """Aktif günlüğün bayt cinsinden boyutu"""
+    try:
+        return os.path.getsize(log_path_for(dataset_path))
+    except OSError:
+        return 0
+
+
+def needs_compaction(dataset_path: str, threshold_bytes: Optional[int] = None) -> bool:
+    """
+    Günlük sıkıştırma eşiğini aştı mı
+
+    Args:
+        dataset_path: Ana veri seti yolu
+        threshold_bytes: Eşik (varsayılan: ML_PREDICTOR['COMPACT_THRESHOLD_BYTES'])
+
+    Returns:
+        bool: Sıkıştırma gerekiyorsa True
+    """
+    if threshold_bytes is None:
+        from django.conf import settings
+        threshold_bytes = getattr(settings, 'ML_PREDICTOR', {}).get('COMPACT_THRESHOLD_BYTES', 1024 * 1024)
+    # Yarıda kalan partiler her zaman tamamlanmalı
+    return log_size(dataset_path) >= threshold_bytes or bool(_pending_batches(dataset_path))
+
+
+def _compacted_records(columns: ColumnarDataset) -> List[Dict]:
+    """Kolonlardaki sıkıştırılmış günlük kayıtları (JSON tabanından gelmeyen satırlar)"""
+    source_rows = columns.meta.get('source_rows')
+    if source_rows is None:
+        # source_rows'tan önce yazılmış nesil: günlük yalnızca kullanıcı turnuvası içerir
+        indices = np.flatnonzero(columns.column('is_user_tournament'))
+    else:
+        indices = np.arange(source_rows, len(columns))
+    return columns.records_at(indices)
+
+
+def _rebase_columns(dataset_path: str) -> Optional[ColumnarDataset]:
+    """sync_columns_with_source gövdesi; sıkıştırma kilidi altında çağrılır"""
+    from .match_predictor import get_file_version
+
+    columns_path = columns_path_for(dataset_path)
+    if not ColumnarDataset.exists(columns_path):
+        return None
+    base = ColumnarDataset.open(columns_path)
+    source_version = get_file_version(dataset_path)
+    if source_version is None or base.meta.get('source_version') == source_version:
+        return base
+
+    with open(dataset_path, 'r') as f:
+        records = json.load(f)
+    # Yeni JSON'da zaten bulunan kullanıcı turnuvaları iki kez eklenmez
+    known = {
+        record.get('tournament_id') for record in records
+        if record.get('is_user_tournament') and record.get('tournament_id') is not None
+    }
+    preserved = [
+        record for record in _compacted_records(base)
+        if not (record.get('is_user_tournament') and record.get('tournament_id') in known)
+    ]
+    columns, categories, winner_models = records_to_columns(records + preserved)
+    extra_meta = {'source_rows': len(records)}
+    if 'compacted_batches' in base.meta:
+        extra_meta['compacted_batches'] = base.meta['compacted_batches']
+    write_columns(columns_path, columns, categories, source_version,
+                  extra_meta=extra_meta, winner_models=winner_models)
+    logger.warning(
+        f"JSON veri seti kolonlardan yeni; kolonlar yeniden oluşturuldu "
+        f"({len(records)} kayıt + {len(preserved)} sıkıştırılmış günlük kaydı)"
+    )
+    return ColumnarDataset.open(columns_path)
+
+
+def sync_columns_with_source(dataset_path: str) -> Optional[ColumnarDataset]:
+    """
+    Kolon formatını JSON veri setiyle güncel hale getir
+
+    Kolonlar JSON'dan eskiyse yeni JSON ve kolonlardaki sıkıştırılmış günlük
+    kayıtlarından yeniden oluşturulur; JSON'a geri dönmek bu kayıtları
+    (tek kopyaları kolonlarda) kaybettirirdi.
+
+    Args:
+        dataset_path: Ana veri seti yolu
+
+    Returns:
+        Optional[ColumnarDataset]: Güncel kolon veri seti, kolon formatı yoksa None
+    """
+    from .match_predictor import get_file_version
+
+    columns_path = columns_path_for(dataset_path)
+    if not ColumnarDataset.exists(columns_path):
+        return None
+    columns = ColumnarDataset.open(columns_path)
+    json_version = get_file_version(dataset_path)
+    if json_version is None or columns.meta.get('source_version') == json_version:
+        return columns
+    with _locked(log_path_for(dataset_path) + '.compact.lock'):
+        return _rebase_columns(dataset_path)
+
+
+def compact(dataset_path: str) -> int:
+    """
+    Günlüğü kolon formatındaki ana veri setine taşı
+
+    Aktif günlük kilit altında yeni bir parti dosyasına döndürülür (eklemeler
+    hemen yeni günlüğe devam eder), parti kolonlara eklenir ve parti kimliği
+    meta.json'a işlendikten sonra parti dosyası silinir.
+
+    Args:
+        dataset_path: Ana veri seti yolu
+
+    Returns:
+        int: Taşınan kayıt sayısı
+    """
+    from .match_predictor import get_file_version
+
+    log_path = log_path_for(dataset_path)
+    columns_path = columns_path_for(dataset_path)
+
+    # Aynı anda tek sıkıştırma
+    with _locked(log_path + '.compact.lock'):
+        with _locked(log_path + '.lock'):
+            if log_size(dataset_path) > 0:
+                os.replace(log_path, f"{log_path}.{uuid.uuid4().hex[:12]}{COMPACTING_SUFFIX}")
+
+        base = _rebase_columns(dataset_path)
+        if base is not None:
+            source_version = base.meta.get('source_version')
+            source_rows = base.meta.get('source_rows')
+            compacted = list(base.meta.get('compacted_batches', []))
+            columns = {field: base.column(field) for field in SCHEMA}
+            categories = list(base.categories)
+            winner_models = list(base.winner_models)
+        else:
+            # İlk sıkıştırma: eski JSON veri setini taban olarak kullan
+            source_version = get_file_version(dataset_path)
+            compacted = []
+            records = []
+            if os.path.exists(dataset_path):
+                with open(dataset_path, 'r') as f:
+                    records = json.load(f)
+            source_rows = len(records)
+            columns, categories, winner_models = records_to_columns(records)
+
+        batches = _pending_batches(dataset_path, compacted)
+        # Önceki çalıştırmada işlenmiş ama silinememiş partileri temizle
+        for path in glob.glob(glob.escape(log_path) + '.*' + COMPACTING_SUFFIX):
+            if path not in batches:
+                os.remove(path)
+        if not batches and ColumnarDataset.exists(columns_path):
+            return 0
+
+        new_records = [record for path in batches for record in _read_log_file(path)]
+        new_columns, categories, winner_models = records_to_columns(new_records, categories, winner_models)
+        merged = {field: np.concatenate([np.asarray(columns[field]), new_columns[field]]) for field in SCHEMA}
+
+        compacted = (compacted + [_batch_id(path) for path in batches])[-MAX_COMPACTED_BATCHES:]
+        extra_meta = {'compacted_batches': compacted}
+        if source_rows is not None:
+            extra_meta['source_rows'] = source_rows
+        write_columns(columns_path, merged, categories, source_version,
+                      extra_meta=extra_meta, winner_models=winner_models)
+
+        for path in batches:
+            os.remove(path)
+
+        logger.info(f"ML veri seti sıkıştırıldı: {len(new_records)} kayıt taşındı")
+        return len(new_records)
@@ -0,0 +1,111 @@
+"""
+Canlı Turnuva Kalan Maç Tahmini
+Bu modül, devam eden bir turnuvanın mevcut durumundan (puanlar, round'lar,
+kazanma matrisi ve mevcut round'da bekleyen maçlar) itibaren vektörel
+rollout'larla kalan maç sayısının dağılımını tahmin eder. Rollout'lar
+SubmitMatchResultView ile aynı kuralları izler (bkz. fast_simulator).
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+from django.conf import settings
+
+from .fast_simulator import VectorizedTournamentSimulator, WinnerFn, uniform_winner
+
+EMPTY_IMAGE_PREFIX = 'BOŞ_'
+
+
+def get_rollout_settings() -> Dict:
+    config = getattr(settings, 'ML_PREDICTOR', {})
+    return {
+        'simulations': config.get('ROLLOUT_SIMULATIONS', 256),
+        # Bir tahmin için yaklaşık iş sınırı (rollout × N³); büyük N'lerde rollout sayısı azaltılır
+        'work_limit': config.get('ROLLOUT_WORK_LIMIT', 5 * 10**7),
+        'min_simulations': config.get('ROLLOUT_MIN_SIMULATIONS', 16),
+    }
+
+
+def tournament_state(tournament) -> Dict:
+    """
+    Turnuvanın canlı durumunu dizilere çevir (2 sorgu)
+
+    Args:
+        tournament: Başlamış turnuva
+
+    Returns:
+        Dict: 'image_ids', 'points', 'rounds', 'matrix', 'pending', 'played_matches'
+            (resimler id sırasında; BOŞ resimler hariç)
+    """
+    images = list(tournament.images.values_list('id', 'name', 'points', 'rounds_played'))
+    # Kazanma matrisi tournament.images.all() sırasına göre indekslenir
+    real = sorted(
+        (image_id, position, points, rounds)
+        for position, (image_id, name, points, rounds) in enumerate(images)
+        if not name.startswith(EMPTY_IMAGE_PREFIX)
+    )
+    positions = [position for _, position, _, _ in real]
+    local = {image_id: i for i, (image_id, _, _, _) in enumerate(real)}
+
+    matrix = np.asarray(tournament.get_win_matrix(), dtype=bool)
+    if matrix.shape == (len(images), len(images)):
+        matrix = matrix[np.ix_(positions, positions)]
+    else:
+        matrix = np.zeros((len(real), len(real)), dtype=bool)
+
+    played_matches = 0
+    pending = []
+    matches = tournament.matches.values_list('image1_id', 'image2_id', 'winner_id', 'round_number')
+    for image1_id, image2_id, winner_id, round_number in matches:
+        if winner_id is not None:
+            played_matches += 1
+        elif round_number == tournament.current_round and image1_id in local and image2_id in local:
+            pending.append((local[image1_id], local[image2_id]))
+
+    return {
+        'image_ids': [image_id for image_id, _, _, _ in real],
+        'points': np.array([points for _, _, points, _ in real], dtype=np.int64),
+        'rounds': np.array([rounds for _, _, _, rounds in real], dtype=np.int64),
+        'matrix': matrix,
+        'pending': pending,
+        'played_matches': played_matches,
+    }
+
+
+def estimate_remaining(state: Dict, simulations: Optional[int] = None, confidence_level: float = 0.95,
+                       seed=None, winner_fn: WinnerFn = uniform_winner) -> Dict:
+    """
+    Canlı durumdan kalan maç sayısını rollout'larla tahmin et
+
+    Args:
+        state: tournament_state çıktısı
+        simulations: Rollout sayısı (varsayılan: ayarlardan, büyük N'de iş sınırına göre azaltılır)
+        confidence_level: Aralığın kapsama oranı (ampirik yüzdelikler)
+        seed: Rastgele sayı tohumu
+        winner_fn: Kazanan modeli
+
+    Returns:
+        Dict: Ortalama, standart sapma, aralık ve min/max kalan maç sayısı
+    """
+    config = get_rollout_settings()
+    n = len(state['points'])
+    if simulations is None:
+        affordable = config['work_limit'] // max(n ** 3, 1)
+        simulations = int(min(config['simulations'], max(config['min_simulations'], affordable)))
+
+    simulator = VectorizedTournamentSimulator(seed=seed, winner_fn=winner_fn, live_rules=True)
+    remaining = simulator.simulate_from_state(
+        state['points'], state['rounds'], state['matrix'], state['pending'], simulations
+    ).astype(np.float64)
+
+    tail = (1 - confidence_level) / 2 * 100
+    lower, upper = np.percentile(remaining, [tail, 100 - tail]) if len(remaining) else (0.0, 0.0)
+    return {
+        'estimated_matches': round(float(remaining.mean()), 2) if len(remaining) else 0.0,
+        'std_deviation': round(float(remaining.std(ddof=1)), 2) if len(remaining) > 1 else 0.0,
+        'interval': (round(float(lower), 2), round(float(upper), 2)),
+        'confidence_level': f"%{int(confidence_level * 100)}",
+        'min': int(remaining.min()) if len(remaining) else 0,
+        'max': int(remaining.max()) if len(remaining) else 0,
+        'simulations': simulations,
+    }
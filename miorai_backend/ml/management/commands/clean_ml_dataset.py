@@ -0,0 +1,68 @@
+"""
+Django Management Command: ML Veri Setini Temizle
+Bu komut, veri setini (kolonlar ve günlük dahil) akış halinde temizler:
+tournament_id tekrarlarını, değişmez ihlallerini ve N başına IQR aykırı
+değerlerini çıkarır, sonucu kolon formatında yazar. Bellek kullanımı veri
+setinin boyutundan bağımsızdır.
+
+Örnekler:
+    python manage.py clean_ml_dataset
+    python manage.py clean_ml_dataset --iqr-multiplier 3 --output /tmp/clean.json
+    python manage.py train_ml_model --clean         # temizleyip paketi derle
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.cleaning import DEFAULT_CHUNK_SIZE, CleaningRules, clean_dataset, cleaned_path_for
+from ml.match_predictor import DATASET_PATH
+
+
+class Command(BaseCommand):
+    help = 'ML veri setini akış halinde temizle ve kolon formatında yaz'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', type=str, default=DATASET_PATH, help='Kaynak veri seti yolu')
+        parser.add_argument(
+            '--output', type=str, default=None,
+            help='Temiz veri seti yolu (varsayılan: <kaynak>_cleaned.json; kolonlar .columns dizinine yazılır)',
+        )
+        parser.add_argument('--iqr-multiplier', type=float, default=1.5, help='Aykırı değer sınırı için IQR çarpanı')
+        parser.add_argument(
+            '--min-outlier-n', type=int, default=4, help='Aykırı değer kontrolü yapılan en küçük N'
+        )
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Parça başına kayıt sayısı')
+        parser.add_argument('--verbose-n', action='store_true', help='N başına özet istatistikleri göster')
+
+    def handle(self, *args, **options):
+        dataset_path = options['dataset']
+        output = options['output'] or cleaned_path_for(dataset_path)
+        rules = CleaningRules(iqr_multiplier=options['iqr_multiplier'], min_outlier_n=options['min_outlier_n'])
+
+        self.stdout.write(f'Kaynak: {dataset_path}')
+        start = time.time()
+        try:
+            report = clean_dataset(dataset_path, output, rules, options['chunk_size'])
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+        duration = time.time() - start
+
+        invariants = ', '.join(f'{rule}: {count}' for rule, count in report['invariants'].items())
+        self.stdout.write(f'Tekrar eden tournament_id: {report["duplicates"]}')
+        self.stdout.write(f'Değişmez ihlalleri: {invariants}')
+        self.stdout.write(f'Aykırı değerler: {report["outliers"]}')
+
+        if options['verbose_n']:
+            for n_images, stats in report['by_n'].items():
+                self.stdout.write(
+                    f'N={n_images:3d}: {stats["count"]:5d} kayıt, maç {stats["min"]}-{stats["max"]}, '
+                    f'ortalama={stats["mean"]}, std={stats["std"]}, sınır={stats["bounds"]}'
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{report["input"]} kayıttan {report["kept"]} kayıt {output} kolonlarına yazıldı '
+                f'(nesil: {report["generation"]}, {duration:.2f}s)'
+            )
+        )
@@ -0,0 +1,44 @@
+"""
+Django Management Command: ML Veri Seti Günlüğünü Sıkıştır
+Bu komut, tamamlanan turnuvaların eklendiği JSONL günlüğünü kolon formatındaki
+ana veri setine taşır. Cron ile periyodik çalıştırılması önerilir.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from ml.ingest import compact, log_size, needs_compaction
+from ml.match_predictor import DATASET_PATH
+
+
+class Command(BaseCommand):
+    help = 'ML veri seti günlüğünü (JSONL) kolon tabanlı veri setine taşı'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dataset',
+            type=str,
+            default=DATASET_PATH,
+            help='Ana veri seti yolu',
+        )
+        parser.add_argument(
+            '--if-needed',
+            action='store_true',
+            help='Sadece günlük boyutu eşiği aştıysa sıkıştır',
+        )
+
+    def handle(self, *args, **options):
+        dataset_path = options['dataset']
+
+        if options['if_needed'] and not needs_compaction(dataset_path):
+            self.stdout.write(f'Sıkıştırma gerekmiyor (günlük: {log_size(dataset_path)} bayt)')
+            return
+
+        start = time.time()
+        moved = compact(dataset_path)
+        duration = time.time() - start
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{moved} kayıt ana veri setine taşındı ({duration:.2f}s)')
+        )
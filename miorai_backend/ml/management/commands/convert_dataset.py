@@ -0,0 +1,45 @@
+"""
+Django Management Command: Veri Setini Kolon Formatına Çevir
+Bu komut, JSON veri setini memory-map ile açılabilen NumPy kolon formatına çevirir.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from ml.columnar import convert_json_to_columns, columns_path_for
+from ml.match_predictor import DATASET_PATH
+
+
+class Command(BaseCommand):
+    help = 'JSON veri setini kolon tabanlı (.npy) formata çevir'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            type=str,
+            default=DATASET_PATH,
+            help='Kaynak JSON veri seti yolu',
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Kolon dizini (varsayılan: <kaynak>.columns)',
+        )
+
+    def handle(self, *args, **options):
+        source = options['source']
+        output = options['output'] or columns_path_for(source)
+
+        self.stdout.write(f'Kaynak: {source}')
+        start = time.time()
+        columns = convert_json_to_columns(source, output)
+        duration = time.time() - start
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{len(columns)} kayıt {output} dizinine yazıldı '
+                f'(nesil: {columns.generation}, {duration:.2f}s)'
+            )
+        )
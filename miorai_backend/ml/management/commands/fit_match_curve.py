@@ -0,0 +1,77 @@
+"""
+Django Management Command: Maç Sayısı Eğrisi Uydurma
+Bu komut, ortalama ve varyans eğrilerini uydurur ve parametre dosyasını
+ml/models/ altına yazar. Varsayılan olarak veriler vektörel simülatörle
+veri setindeki N aralığının ötesine (ör. 512) kadar üretilir.
+"""
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.curve_model import CURVE_PATH, MatchCountCurve
+from ml.fast_simulator import VectorizedTournamentSimulator
+from ml.match_predictor import MatchPredictor
+
+
+def simulation_grid(n_min: int, n_max: int, dense_until: int = 128, step: int = 7):
+    """Küçük N'lerde her değer, büyüklerde ikili yapıyı örnekleyen tek adımlı ızgara"""
+    grid = list(range(n_min, min(n_max, dense_until) + 1))
+    grid += list(range(max(dense_until + 1, n_min), n_max + 1, step))
+    if grid[-1] != n_max:
+        grid.append(n_max)
+    return grid
+
+
+class Command(BaseCommand):
+    help = 'Maç sayısı ortalama/varyans eğrilerini uydur ve ml/models/ altına kaydet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n-min', type=int, default=16, help='Uydurmaya dahil en küçük N')
+        parser.add_argument('--n-max', type=int, default=512, help='Uydurmaya dahil en büyük N')
+        parser.add_argument(
+            '--simulations-per-n', type=int, default=200, help='Her N için simülasyon sayısı'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Simülasyon tohumu')
+        parser.add_argument(
+            '--from-dataset', action='store_true',
+            help='Simülasyon yerine mevcut veri setindeki simülasyon kayıtlarını kullan',
+        )
+        parser.add_argument('--output', type=str, default=CURVE_PATH, help='Parametre dosyası yolu')
+
+    def handle(self, *args, **options):
+        start = time.time()
+        n_min, n_max = options['n_min'], options['n_max']
+
+        if options['from_dataset']:
+            predictor = MatchPredictor()
+            predictor.load()
+            curve = MatchCountCurve.fit_from_index(predictor.get_index())
+        else:
+            simulator = VectorizedTournamentSimulator(seed=options['seed'], batch_size=options['simulations_per_n'])
+            n_values, counts, means, variances = [], [], [], []
+            for n in simulation_grid(n_min, n_max):
+                matches = simulator.simulate_batch(n, options['simulations_per_n'])['total_matches']
+                n_values.append(n)
+                counts.append(len(matches))
+                means.append(float(matches.mean()))
+                variances.append(float(matches.var(ddof=1)))
+                self.stdout.write(f'N={n}: {means[-1]:.1f} ± {np.sqrt(variances[-1]):.1f}')
+            try:
+                curve = MatchCountCurve.fit(n_values, counts, means, variances, source='simulated')
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        curve.save(options['output'])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Eğri {options["output"]} dosyasına yazıldı '
+                f'(N {curve.n_min}-{curve.n_max}, {curve.sample_size} örnek, {time.time() - start:.1f}s)'
+            )
+        )
+        for n in (100, 250, 500):
+            prediction = curve.predict(n)
+            self.stdout.write(
+                f'N={n}: {prediction["mean"]} maç, %95 tahmin aralığı {prediction["prediction_interval"]}'
+            )
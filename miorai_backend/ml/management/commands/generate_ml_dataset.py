@@ -0,0 +1,107 @@
+"""
+Django Management Command: Simülasyon Veri Seti Üretimi
+Bu komut, vektörel simülatörü bir süreç havuzunda çalıştırarak ML veri setini
+üretir. Tamamlanan parçalar diske yazılır; yarıda kalan üretim --resume ile
+kaldığı yerden devam eder.
+
+Kazanan modeli --winner-model ile seçilir; --fit-winner-model parametreyi
+mevcut veri setindeki kullanıcı turnuvalarına uydurur.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.dataset_generation import checkpoint_path_for, generate_dataset_parallel
+from ml.match_predictor import DATASET_PATH, MatchPredictor
+from ml.winner_models import WINNER_MODELS, fit_winner_model, get_winner_model, user_match_moments
+
+
+class Command(BaseCommand):
+    help = 'Simülasyon veri setini paralel ve devam ettirilebilir şekilde üret'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--n-min', type=int, default=2, help='En küçük N değeri')
+        parser.add_argument('--n-max', type=int, default=64, help='En büyük N değeri')
+        parser.add_argument(
+            '--simulations-per-n', type=int, default=20, help='Her N için simülasyon sayısı'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None, help='Süreç sayısı (varsayılan: CPU sayısı)'
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Ana tohum')
+        parser.add_argument(
+            '--shard-size', type=int, default=1000, help='Parça başına simülasyon sayısı'
+        )
+        parser.add_argument(
+            '--resume', action='store_true', help='Mevcut kontrol noktasından devam et'
+        )
+        parser.add_argument('--output', type=str, default=DATASET_PATH, help='Çıktı veri seti yolu')
+        parser.add_argument(
+            '--discard-user-records', action='store_true',
+            help='Mevcut kullanıcı turnuvası kayıtlarını çıktıya taşıma',
+        )
+        parser.add_argument(
+            '--columns', action='store_true', help='Kolon formatını da yaz'
+        )
+        parser.add_argument(
+            '--winner-model', choices=list(WINNER_MODELS), default='uniform',
+            help='Maç kazananını seçen model',
+        )
+        parser.add_argument(
+            '--winner-param', type=float, default=None,
+            help='Kazanan modeli parametresi (strength_std veya noise)',
+        )
+        parser.add_argument(
+            '--fit-winner-model', action='store_true',
+            help='Model parametresini mevcut veri setindeki kullanıcı turnuvalarına uydur',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        self.stdout.write(f'Kontrol noktası: {checkpoint_path_for(output)}')
+
+        def progress(done, total, shard):
+            n_images, shard_index, _, size = shard
+            self.stdout.write(f'[{done}/{total}] N={n_images} parça {shard_index} ({size} simülasyon)')
+
+        winner_model = self._winner_model(options)
+        self.stdout.write(f'Kazanan modeli: {winner_model.params()}')
+
+        start = time.time()
+        try:
+            total = generate_dataset_parallel(
+                output,
+                n_range=(options['n_min'], options['n_max']),
+                simulations_per_n=options['simulations_per_n'],
+                workers=options['workers'],
+                seed=options['seed'],
+                shard_size=options['shard_size'],
+                resume=options['resume'],
+                keep_user_records=not options['discard_user_records'],
+                write_columns=options['columns'],
+                winner_model=winner_model.params(),
+                progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(f'{total} kayıt {output} dosyasına yazıldı ({time.time() - start:.2f}s)')
+        )
+
+    def _winner_model(self, options):
+        if not options['fit_winner_model']:
+            return get_winner_model(options['winner_model'], options['winner_param'])
+
+        predictor = MatchPredictor(options['output'])
+        try:
+            predictor.load()
+            model, results = fit_winner_model(
+                options['winner_model'], user_match_moments(predictor.get_index()), seed=options['seed']
+            )
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+        for result in results:
+            self.stdout.write(f'  {model.param_name}={result["value"]}: kayıp={result["loss"]:.5f}')
+        return model
@@ -1,22 +1,74 @@
 """
-Django Management Command: Veri Seti Analizi
-Bu komut, turnuva simülasyon verilerini analiz eder ve güven aralığı istatistiklerini gösterir.
+Django Management Command: Model Derleme ve Yayınlama
+Bu komut, veri setini versiyonlu bir model paketine derler (momentler, eğri,
+kritik değerler, N başına yüzdelikler), aktif pakete göre doğrular ve atomik olarak yayınlar.
+Çalışan süreçler yeni paketi otomatik olarak yükler. Yayın ve geri alma
+sonrası yeni versiyonun tahmin tablosu önbelleğe önceden yazılır.
+
+Örnekler:
+    python manage.py train_ml_model                 # derle, doğrula, yayınla
+    python manage.py train_ml_model --dry-run       # yalnızca derle ve doğrula
+    python manage.py train_ml_model --clean         # önce veri setini temizle (bkz. clean_ml_dataset)
+    python manage.py train_ml_model --rollback      # önceki pakete anında dön
+    python manage.py train_ml_model --list
+    python manage.py train_ml_model --analyze --test-predictions
 """
 
-from django.core.management.base import BaseCommand
-from django.conf import settings
-import os
-import sys
+from django.core.management.base import BaseCommand, CommandError
 
-# ML modülünü import et
-sys.path.append(os.path.join(settings.BASE_DIR, 'ml'))
-from match_predictor import MatchPredictor
+from core.cache import ml_cache
+from ml.artifacts import (
+    MODELS_DIR, ModelArtifact, activate, get_active_version, list_artifacts,
+    load_active_artifact, publish_artifact, rollback, validate_artifact
+)
+from ml.cleaning import clean_dataset
+from ml.critical_values import DEFAULT_CONFIDENCE_LEVELS
+from ml.curve_model import MatchCountCurve
+from ml.match_predictor import DATASET_PATH, MatchPredictor
+from ml.quantiles import DEFAULT_QUANTILES, QuantileTable
+from ml.warmup import warm_prediction_cache
 
 
 class Command(BaseCommand):
-    help = 'Veri setini analiz et ve güven aralığı istatistiklerini göster'
+    help = 'Veri setinden model paketi derle, doğrula ve yayınla (veya önceki pakete dön)'
 
     def add_arguments(self, parser):
+        parser.add_argument('--dataset', type=str, default=DATASET_PATH, help='Veri seti yolu')
+        parser.add_argument('--models-dir', type=str, default=MODELS_DIR, help='Model paketleri dizini')
+        parser.add_argument(
+            '--clean', action='store_true',
+            help='Paketi veri setinin temizlenmiş kopyasından derle (tekrarlar, değişmezler, aykırı değerler)',
+        )
+        parser.add_argument(
+            '--refit-curve', action='store_true',
+            help='Eğriyi mevcut parametre dosyası yerine veri setindeki simülasyonlardan uydur',
+        )
+        parser.add_argument(
+            '--quantiles', type=str, default=','.join(f'{level:g}' for level in DEFAULT_QUANTILES),
+            help='Pakete yazılacak yüzdelik seviyeleri (virgülle ayrılmış, 0-1 arası)',
+        )
+        parser.add_argument(
+            '--confidence-levels', type=str,
+            default=','.join(f'{level:g}' for level in DEFAULT_CONFIDENCE_LEVELS),
+            help='Kritik değer tabloları yazılacak güven seviyeleri (virgülle ayrılmış)',
+        )
+        parser.add_argument(
+            '--max-drift', type=float, default=0.1,
+            help='Önceki pakete göre N başına izin verilen en büyük göreli ortalama değişimi',
+        )
+        parser.add_argument(
+            '--min-samples', type=int, default=30,
+            help='Kayma kontrolü için gereken en az örnek sayısı',
+        )
+        parser.add_argument('--force', action='store_true', help='Doğrulama sorunlarına rağmen yayınla')
+        parser.add_argument('--dry-run', action='store_true', help='Derle ve doğrula, yayınlama')
+        parser.add_argument('--rollback', action='store_true', help='Bir önceki aktif pakete dön')
+        parser.add_argument('--activate', type=str, help='Diskteki belirli bir paketi aktif yap')
+        parser.add_argument('--list', action='store_true', help='Diskteki paketleri listele')
+        parser.add_argument(
+            '--no-warm', action='store_true', help='Yayın sonrası tahmin önbelleğini ısıtma'
+        )
+        parser.add_argument('--analyze', action='store_true', help='Veri seti istatistiklerini göster')
         parser.add_argument(
             '--test-predictions',
             action='store_true',
@@ -30,77 +82,169 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
+        models_dir = options['models_dir']
+
+        if options['list']:
+            active = get_active_version(models_dir)
+            for version in list_artifacts(models_dir):
+                marker = '*' if version == active else ' '
+                self.stdout.write(f'{marker} {version}')
+            return
+
+        if options['rollback'] or options['activate']:
+            try:
+                if options['rollback']:
+                    version = rollback(models_dir)
+                else:
+                    version = options['activate']
+                    activate(version, models_dir)
+            except ValueError as e:
+                raise CommandError(str(e))
+            ml_cache.invalidate_ml_cache()
+            self.stdout.write(self.style.SUCCESS(f'Aktif model paketi: {version}'))
+            self._warm(options)
+            return
+
+        dataset_path = options['dataset']
+        try:
+            if options['clean']:
+                report = clean_dataset(dataset_path)
+                self.stdout.write(
+                    f'Veri seti temizlendi: {report["input"]} kayıt -> {report["kept"]} ({report["output"]})'
+                )
+                dataset_path = report['output']
+            predictor = MatchPredictor(dataset_path)
+            predictor.load()
+        except (FileNotFoundError, ValueError) as e:
+            raise CommandError(str(e))
+
+        if options['analyze'] or options['test_predictions']:
+            self._print_analysis(predictor, options)
+            return
+
+        self._build_and_publish(predictor, models_dir, options)
+
+    def _build_and_publish(self, predictor, models_dir, options):
+        index = predictor.get_index()
+        if options['refit_curve']:
+            try:
+                curve = MatchCountCurve.fit_from_index(index)
+            except ValueError as e:
+                raise CommandError(str(e))
+        else:
+            curve = predictor.get_curve()
+
+        try:
+            quantile_levels = [float(level) for level in options['quantiles'].split(',') if level.strip()]
+            confidence_levels = [float(level) for level in options['confidence_levels'].split(',') if level.strip()]
+            quantiles = QuantileTable.from_arrays(*predictor.get_match_arrays(), levels=quantile_levels)
+            artifact = ModelArtifact.build(
+                index, curve, dataset_version=predictor.dataset_version,
+                quantiles=quantiles, confidence_levels=confidence_levels,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        summary = artifact.summary()
         self.stdout.write(
-            self.style.SUCCESS('Veri Seti Analizi Başlatılıyor...')
+            f'Model paketi derlendi: {artifact.version} '
+            f'({summary["total_records"]} kayıt, N {summary["n_range"]["min"]}-{summary["n_range"]["max"]})'
         )
 
         try:
-            # Güven aralığı tahmin modelini oluştur
-            predictor = MatchPredictor()
-            
-            # Veri seti özeti
-            summary = predictor.get_dataset_summary()
-            
-            self.stdout.write(
-                self.style.SUCCESS(f'Veri seti yüklendi: {summary["total_records"]} kayıt')
-            )
-            
-            self.stdout.write(f'N aralığı: {summary["n_range"]["min"]} - {summary["n_range"]["max"]}')
-            self.stdout.write(f'Mevcut N değerleri: {summary["available_n_values"]}')
-            
-            # Test tahminleri
-            if options['test_predictions']:
-                self.stdout.write('\n' + '='*50)
-                self.stdout.write('TEST TAHMİNLERİ')
-                self.stdout.write('='*50)
-                
-                n_values_str = options['n_values']
-                test_n_values = [int(n.strip()) for n in n_values_str.split(',')]
-                
-                for n in test_n_values:
-                    self.stdout.write(f'\n--- {n} Resim İçin Tahmin ---')
-                    
-                    result = predictor.predict_matches(n)
-                    
-                    if 'error' in result:
-                        self.stdout.write(
-                            self.style.ERROR(f'Hata: {result["error"]}')
-                        )
-                    else:
-                        pred = result['prediction']
-                        self.stdout.write(
-                            self.style.SUCCESS(f'Tahmini maç sayısı: {pred["estimated_matches"]}')
-                        )
-                        self.stdout.write(f'Güven aralığı: {pred["confidence_interval"][0]} - {pred["confidence_interval"][1]}')
-                        self.stdout.write(f'Güven seviyesi: {pred["confidence_level"]}')
-                        self.stdout.write(f'Dağılım: {pred["distribution"]}-dağılımı')
-                        self.stdout.write(f'Örnek sayısı: {pred["sample_size"]}')
-                        self.stdout.write(f'Hata payı: ±{pred["margin_of_error"]}')
-                        self.stdout.write(f'Standart sapma: {pred["std_deviation"]}')
-                        
-                        if result.get('message'):
-                            self.stdout.write(f'Mesaj: {result["message"]}')
-            
-            # Veri seti detayları
+            previous = load_active_artifact(models_dir)
+        except (OSError, ValueError) as e:
+            self.stdout.write(self.style.WARNING(f'Aktif paket okunamadı, karşılaştırma atlandı: {e}'))
+            previous = None
+
+        issues = validate_artifact(artifact, previous, options['max_drift'], options['min_samples'])
+        for issue in issues:
+            self.stdout.write(self.style.WARNING(f'Doğrulama: {issue}'))
+        if issues and not options['force']:
+            raise CommandError('Doğrulama başarısız; yayınlamak için --force kullanın')
+
+        if options['dry_run']:
+            self.stdout.write('Kuru çalıştırma: paket yayınlanmadı')
+            return
+
+        path = publish_artifact(artifact, models_dir)
+        ml_cache.invalidate_ml_cache()
+        previous_version = previous.version if previous is not None else None
+        self.stdout.write(
+            self.style.SUCCESS(f'Yayınlandı: {path} (önceki: {previous_version})')
+        )
+        self._warm(options)
+
+    def _warm(self, options):
+        if options['no_warm']:
+            return
+        predictor = MatchPredictor(options['dataset'], models_dir=options['models_dir'])
+        try:
+            predictor.load()
+        except FileNotFoundError as e:
+            self.stdout.write(self.style.WARNING(f'Önbellek ısıtılamadı: {e}'))
+            return
+        result = warm_prediction_cache(predictor)
+        self.stdout.write(f'Tahmin önbelleği ısıtıldı: {result["keys"]} anahtar (model: {result["model_version"]})')
+
+    def _print_analysis(self, predictor, options):
+        self.stdout.write(
+            self.style.SUCCESS('Veri Seti Analizi Başlatılıyor...')
+        )
+
+        # Veri seti özeti
+        summary = predictor.get_dataset_summary()
+
+        self.stdout.write(
+            self.style.SUCCESS(f'Veri seti yüklendi: {summary["total_records"]} kayıt')
+        )
+
+        self.stdout.write(f'N aralığı: {summary["n_range"]["min"]} - {summary["n_range"]["max"]}')
+        self.stdout.write(f'Mevcut N değerleri: {summary["available_n_values"]}')
+
+        # Test tahminleri
+        if options['test_predictions']:
             self.stdout.write('\n' + '='*50)
-            self.stdout.write('VERİ SETİ DETAYLARI')
+            self.stdout.write('TEST TAHMİNLERİ')
             self.stdout.write('='*50)
-            
-            for n in summary['available_n_values']:
-                matches_data = predictor.get_matches_for_n_images(n)
-                if len(matches_data) > 0:
-                    mean_matches = matches_data.mean()
-                    std_matches = matches_data.std(ddof=1)
-                    self.stdout.write(f'N={n:2d}: {len(matches_data):3d} örnek, '
-                                    f'ortalama={mean_matches:5.2f}, '
-                                    f'std={std_matches:5.2f}')
-            
-            self.stdout.write(
-                self.style.SUCCESS('\nVeri seti analizi tamamlandı!')
-            )
-            
-        except Exception as e:
-            self.stdout.write(
-                self.style.ERROR(f'Analiz hatası: {str(e)}')
-            )
-            return 
\ No newline at end of file
+
+            n_values_str = options['n_values']
+            test_n_values = [int(n.strip()) for n in n_values_str.split(',')]
+
+            for n in test_n_values:
+                self.stdout.write(f'\n--- {n} Resim İçin Tahmin ---')
+
+                result = predictor.predict_matches(n)
+
+                if 'error' in result:
+                    self.stdout.write(
+                        self.style.ERROR(f'Hata: {result["error"]}')
+                    )
+                else:
+                    pred = result['prediction']
+                    self.stdout.write(
+                        self.style.SUCCESS(f'Tahmini maç sayısı: {pred["estimated_matches"]}')
+                    )
+                    self.stdout.write(f'Güven aralığı: {pred["confidence_interval"][0]} - {pred["confidence_interval"][1]}')
+                    self.stdout.write(f'Güven seviyesi: {pred["confidence_level"]}')
+                    self.stdout.write(f'Dağılım: {pred["distribution"]}-dağılımı')
+                    self.stdout.write(f'Örnek sayısı: {pred["sample_size"]}')
+                    self.stdout.write(f'Hata payı: ±{pred["margin_of_error"]}')
+                    self.stdout.write(f'Standart sapma: {pred["std_deviation"]}')
+
+                    if result.get('message'):
+                        self.stdout.write(f'Mesaj: {result["message"]}')
+
+        # Veri seti detayları (indeksteki momentlerden)
+        self.stdout.write('\n' + '='*50)
+        self.stdout.write('VERİ SETİ DETAYLARI')
+        self.stdout.write('='*50)
+
+        for n in summary['available_n_values']:
+            stats = predictor.calculate_confidence_interval_from_moments(*predictor.get_index().get(n))
+            self.stdout.write(f'N={n:2d}: {stats["sample_size"]:3d} örnek, '
+                              f'ortalama={stats["mean"]:5.2f}, '
+                              f'std={stats["std"]:5.2f}')
+
+        self.stdout.write(
+            self.style.SUCCESS('\nVeri seti analizi tamamlandı!')
+        )
@@ -0,0 +1,41 @@
+"""
+Django Management Command: Tahmin Önbelleğini Isıt
+Bu komut, aktif modelin desteklediği her N ve kategori için tahminleri önceden
+hesaplayıp `ml_predictions` önbelleğine yazar. Dağıtım sonrası çalıştırılması
+önerilir; train_ml_model yayın ve geri alma sonrası aynı işlemi yapar.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ml.match_predictor import DATASET_PATH, MatchPredictor
+from ml.registry import predictor_registry
+from ml.warmup import warm_prediction_cache
+
+
+class Command(BaseCommand):
+    help = 'Aktif model için tahmin önbelleğini önceden doldur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dataset', type=str, default=DATASET_PATH, help='Veri seti yolu')
+        parser.add_argument(
+            '--models-dir', type=str, default=None, help='Model paketleri dizini (varsayılan: ayarlardan)'
+        )
+        parser.add_argument('--max-n', type=int, default=None, help='Isıtılacak en büyük N')
+
+    def handle(self, *args, **options):
+        predictor = MatchPredictor(options['dataset'], models_dir=options['models_dir'] or predictor_registry.models_dir)
+        try:
+            predictor.load()
+        except FileNotFoundError as e:
+            raise CommandError(str(e))
+
+        n_values = None
+        if options['max_n'] is not None:
+            n_values = range(2, options['max_n'] + 1)
+        result = warm_prediction_cache(predictor, n_values)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{result["keys"]} tahmin önbelleğe yazıldı (model: {result["model_version"]}, '
+                f'{result["n_values"]} N x {result["categories"]} kategori, {result["duration"]:.2f}s)'
+            )
+        )
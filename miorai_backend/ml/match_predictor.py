@@ -4,19 +4,167 @@ Bu modül, turnuva simülasyon verilerini kullanarak güven aralığı ile maç
 """
 
 import json
+import threading
 import numpy as np
-import scipy.stats as stats
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 
+from .artifacts import ModelArtifact, active_path_for, load_active_artifact
+from .critical_values import DEFAULT_CONFIDENCE_LEVELS, T_MAX_SAMPLES, critical_value_table, lookup_critical_values
+from .category_model import CategoryModel
+from .columnar import ColumnarDataset, columns_path_for
+from .curve_model import CURVE_PATH, MatchCountCurve
+from .ingest import iter_pending_records, log_path_for, sync_columns_with_source
+from .quantiles import DEFAULT_INTERVAL_COVERAGE, QuantileTable
+from .stats_index import MomentIndex, Moments, record_source
+
+# Çalışma dizininden bağımsız varsayılan veri seti yolu
+DATASET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'tournament_dataset_v1.json')
+
+# Tahmin aralığı tipleri: ortalamanın güven aralığı / maç sayılarının ampirik aralığı
+INTERVAL_TYPES = ('confidence', 'quantile')
+
+def get_file_version(path: str) -> Optional[str]:
+    """
+    Dosyanın versiyon damgasını getir (mtime + boyut)
+    
+    Returns:
+        Optional[str]: Versiyon damgası, dosya yoksa None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def get_base_version(dataset_path: str = DATASET_PATH) -> Optional[str]:
+    """
+    Veri seti tabanının versiyon damgasını getir (JSON + kolon formatı; günlük hariç)
+    
+    Returns:
+        Optional[str]: Versiyon damgası, taban yoksa None
+    """
+    parts = [
+        get_file_version(dataset_path),
+        get_file_version(os.path.join(columns_path_for(dataset_path), 'meta.json')),
+    ]
+    if not any(parts):
+        return None
+    return '+'.join(part or '0' for part in parts)
+
+def get_dataset_version(dataset_path: str = DATASET_PATH) -> Optional[str]:
+    """
+    Veri setinin versiyon damgasını getir (JSON + kolon formatı + günlük)
+    
+    Returns:
+        Optional[str]: Versiyon damgası, veri seti yoksa None
+    """
+    base_version = get_base_version(dataset_path)
+    log_version = get_file_version(log_path_for(dataset_path))
+    if base_version is None and log_version is None:
+        return None
+    return f"{base_version or '0+0'}+{log_version or '0'}"
+
 class MatchPredictor:
     """Maç sayısı tahmin modeli sınıfı - Güven aralığı yaklaşımı"""
     
-    def __init__(self, dataset_path: str = "ml/data/tournament_dataset_v1.json"):
+    def __init__(self, dataset_path: str = DATASET_PATH, curve_path: str = CURVE_PATH,
+                 models_dir: Optional[str] = None):
         self.dataset_path = dataset_path
+        self.curve_path = curve_path
+        self.models_dir = models_dir  # None: yayınlanmış model paketi kullanılmaz
+        self.artifact = None
+        self.artifact_version = None
+        self.curve = None
+        self.curve_version = None
         self.dataset = None
+        self.dataset_version = None
+        self.base_version = None
+        self.index = None
+        self.quantiles = None
+        self.category_model = None
+        self.columns = None
+        self.pending_records = []
+        # Model versiyonunun üstüne uygulanmış çevrimiçi momentler: (N, kategori) -> (count, sum, sum_sq)
+        self.online_moments = {}
+        self._online_lock = threading.Lock()
         self.confidence_level = 0.95  # %95 güven aralığı
         
+    def load(self):
+        """
+        Veri setini en verimli kaynaktan yükle: kolon formatı mevcutsa memory-map
+        ile açılır (JSON daha yeniyse önce kolonlar yeniden oluşturulur), değilse JSON okunur
+        """
+        self.load_curve()
+        self.load_artifact()
+        columns = sync_columns_with_source(self.dataset_path)
+        if columns is not None:
+            self.load_columns(columns)
+            return
+        self.load_dataset()
+    
+    def load_curve(self) -> Optional[MatchCountCurve]:
+        """
+        Kapalı form maç sayısı eğrisini yükle (veride olmayan N'ler için)
+        
+        Returns:
+            Optional[MatchCountCurve]: Eğri, parametre dosyası yoksa None
+        """
+        self.curve_version = get_file_version(self.curve_path)
+        self.curve = MatchCountCurve.load(self.curve_path)
+        return self.curve
+    
+    def load_artifact(self) -> Optional[ModelArtifact]:
+        """
+        Aktif model paketini yükle; tahminler paketin momentlerinden ve eğrisinden yapılır
+        
+        Returns:
+            Optional[ModelArtifact]: Aktif paket, models_dir yoksa veya paket yayınlanmamışsa None
+        """
+        if self.models_dir is None:
+            return None
+        self.artifact_version = get_file_version(active_path_for(self.models_dir))
+        self.artifact = load_active_artifact(self.models_dir)
+        if self.artifact is not None and self.artifact.curve is not None:
+            self.curve = self.artifact.curve
+        return self.artifact
+    
+    def get_curve(self) -> Optional[MatchCountCurve]:
+        """Eğriyi getir (henüz yüklenmemişse diskten okur)"""
+        if self.curve is None and self.curve_version is None:
+            self.load_curve()
+        return self.curve
+    
+    def load_columns(self, columns: Optional[ColumnarDataset] = None) -> ColumnarDataset:
+        """
+        Kolon formatındaki veri setini memory-map ile aç
+        
+        Args:
+            columns: Açılmış kolon veri seti (varsayılan: JSON yanındaki .columns dizini)
+            
+        Returns:
+            ColumnarDataset: Kolon veri seti
+        """
+        self.dataset_version = get_dataset_version(self.dataset_path)
+        self.base_version = get_base_version(self.dataset_path)
+        if columns is None:
+            columns = ColumnarDataset.open(columns_path_for(self.dataset_path))
+        self.columns = columns
+        self.dataset = None
+        self.quantiles = None
+        self.category_model = None
+        
+        # Kategorisiz kayıtlar (-1) tablonun sonundaki None'a eşlenir
+        categories = list(columns.categories) + [None]
+        category = columns.column('category').astype(np.int64)
+        category = np.where(category < 0, len(categories) - 1, category)
+        self.index = MomentIndex.from_arrays(
+            columns.column('n_images'), columns.column('total_matches'),
+            category, categories, columns.source_codes()
+        )
+        self._load_pending_records(columns.meta.get('compacted_batches'))
+        return columns
+    
     def load_dataset(self) -> List[Dict]:
         """
         Veri setini yükle
@@ -27,11 +175,121 @@ class MatchPredictor:
         if not os.path.exists(self.dataset_path):
             raise FileNotFoundError(f"Dataset not found: {self.dataset_path}")
         
+        # Versiyon okumadan önce alınır; okuma sırasında dosya değişirse
+        # bir sonraki kontrol yeniden yüklemeyi tetikler
+        self.dataset_version = get_dataset_version(self.dataset_path)
+        self.base_version = get_base_version(self.dataset_path)
         with open(self.dataset_path, 'r') as f:
             self.dataset = json.load(f)
+        self.index = MomentIndex.from_records(self.dataset)
+        self.quantiles = None
+        self.category_model = None
+        self._load_pending_records()
         
         return self.dataset
     
+    def _load_pending_records(self, compacted: Optional[List[str]] = None):
+        """
+        Henüz sıkıştırılmamış günlük kayıtlarını veri setine ve indekse ekle
+
+        Günlük model versiyonunun parçası değildir: paket kullanılmıyorsa bu
+        kayıtlar versiyonun üstüne uygulanmış çevrimiçi momentler sayılır
+        (önbellekteki toplamlar da günlükten başlatılır, bkz. online_stats).
+        """
+        self.pending_records = list(iter_pending_records(self.dataset_path, compacted))
+        self.online_moments = {}
+        for record in self.pending_records:
+            self.index.add_record(record)
+            if self.artifact is None:
+                key = (record['n_images'], record.get('category') or None)
+                count, total, total_sq = self.online_moments.get(key, (0, 0, 0))
+                matches = record['total_matches']
+                self.online_moments[key] = (count + 1, total + matches, total_sq + matches * matches)
+        if self.dataset is not None:
+            self.dataset.extend(self.pending_records)
+    
+    def get_dataset(self) -> List[Dict]:
+        """
+        Yüklü veri setini getir (yalnızca henüz yüklenmemişse diskten okur)
+        
+        Returns:
+            List[Dict]: Veri seti
+        """
+        if self.dataset is None:
+            if self.columns is not None:
+                self.dataset = self.columns.to_records() + self.pending_records
+            else:
+                self.load_dataset()
+        return self.dataset
+    
+    def get_index(self) -> MomentIndex:
+        """
+        Yeterli istatistik indeksini getir
+        
+        Returns:
+            MomentIndex: (n, kategori, kaynak) bazlı moment tabloları
+        """
+        if self.index is None:
+            self.index = MomentIndex.from_records(self.get_dataset())
+        return self.index
+    
+    def get_model_index(self) -> MomentIndex:
+        """
+        Tahminlerde kullanılan moment indeksi: aktif model paketi varsa paketin,
+        yoksa yüklü veri setinin indeksi
+        
+        Returns:
+            MomentIndex: Tahmin indeksi
+        """
+        if self.artifact is not None:
+            return self.artifact.index
+        return self.get_index()
+    
+    @property
+    def model_version(self) -> str:
+        """
+        Tahmin tablosunun versiyonu: aktif model paketi varsa paketin versiyonu,
+        yoksa veri seti tabanı ve eğri versiyonları (önbellek anahtarları buna bağlıdır).
+        Günlüğe eklenen kayıtlar versiyonu değiştirmez; çevrimiçi momentlerle uygulanır
+        """
+        if self.artifact is not None:
+            return self.artifact.version
+        return f"{self.base_version}:{self.curve_version}"
+    
+    def apply_online_moments(self, moments: Dict[Tuple[int, Optional[str]], Moments]) -> List[int]:
+        """
+        Çevrimiçi toplanan kullanıcı turnuvası momentlerini tahmin indeksine uygula
+
+        Momentler model versiyonundan bu yana birikmiş toplamlardır; yalnızca daha
+        önce uygulanmamış fark eklenir, aynı toplamın tekrar uygulanması etkisizdir.
+        Değişen N'lerin kategori parametreleri yeniden hesaplanıp atomik olarak
+        değiştirilir. Yüzdelik tablosu bir sonraki model derlemesine kadar aynı kalır.
+
+        Args:
+            moments: (N, kategori) -> (count, sum, sum_sq)
+
+        Returns:
+            List[int]: Momentleri değişen resim sayıları
+        """
+        with self._online_lock:
+            index = self.get_model_index()
+            changed = set()
+            for (n_images, category), total in sorted(moments.items(), key=lambda item: (item[0][0], item[0][1] or '')):
+                applied = self.online_moments.get((n_images, category), (0, 0, 0))
+                delta = tuple(t - a for t, a in zip(total, applied))
+                if delta[0] <= 0:
+                    continue
+                index.merge(n_images, delta, category, 'user')
+                self.online_moments[(n_images, category)] = tuple(total)
+                changed.add(n_images)
+
+            if changed:
+                if self.artifact is not None:
+                    self.artifact.category_model = self.artifact.category_model.refresh(index, changed)
+                elif self.category_model is not None:
+                    self.category_model = self.category_model.refresh(index, changed)
+            return sorted(changed)
+
     def get_matches_for_n_images(self, n_images: int) -> np.ndarray:
         """
         Belirli bir resim sayısı için maç sayılarını getir
@@ -42,6 +300,14 @@ class MatchPredictor:
         Returns:
             np.ndarray: Maç sayıları dizisi
         """
+        if self.columns is not None:
+            n_column = self.columns.column('n_images')
+            pending = [r['total_matches'] for r in self.pending_records if r['n_images'] == n_images]
+            return np.concatenate([
+                np.asarray(self.columns.column('total_matches')[n_column == n_images], dtype=np.int64),
+                np.asarray(pending, dtype=np.int64)
+            ])
+        
         if self.dataset is None:
             self.load_dataset()
         
@@ -62,6 +328,25 @@ class MatchPredictor:
         Returns:
             Dict: Simülasyon ve kullanıcı verileri ayrı ayrı
         """
+        if self.columns is not None:
+            mask = self.columns.column('n_images') == n_images
+            is_user = self.columns.column('is_user_tournament')
+            total = self.columns.column('total_matches')
+            pending = [r for r in self.pending_records if r['n_images'] == n_images]
+            simulated = np.concatenate([
+                np.asarray(total[mask & ~is_user], dtype=np.int64),
+                np.asarray([r['total_matches'] for r in pending if record_source(r) == 'simulated'], dtype=np.int64)
+            ])
+            user = np.concatenate([
+                np.asarray(total[mask & is_user], dtype=np.int64),
+                np.asarray([r['total_matches'] for r in pending if record_source(r) == 'user'], dtype=np.int64)
+            ])
+            return {
+                'simulated': simulated,
+                'user': user,
+                'total': np.concatenate([simulated, user])
+            }
+        
         if self.dataset is None:
             self.load_dataset()
         
@@ -93,13 +378,26 @@ class MatchPredictor:
         """
         try:
             # Veri setini yükle
-            if self.dataset is None:
+            if self.dataset is None and self.columns is None:
                 self.load_dataset()
             
-            # Kaynak bazlı veri analizi
-            source_data = self.get_matches_for_n_images_with_source(n_images)
+            # Kaynak bazlı momentler (indeksten O(1))
+            index = self.get_model_index()
+            total_moments = index.get(n_images)
+            simulated_moments = index.get(n_images, source='simulated')
+            user_moments = index.get(n_images, source='user')
             
-            if len(source_data['total']) == 0:
+            if total_moments[0] == 0:
+                if self.get_curve() is not None:
+                    result = self.predict_matches_from_curve(n_images)
+                    result['source_analysis'] = {
+                        'total_samples': 0,
+                        'simulated_samples': 0,
+                        'user_samples': 0,
+                        'simulated_prediction': None,
+                        'user_prediction': None
+                    }
+                    return result
                 return {
                     'error': f'{n_images} resim için veri bulunamadı',
                     'n_images': n_images,
@@ -107,17 +405,17 @@ class MatchPredictor:
                 }
             
             # Genel tahmin (tüm veriler)
-            total_confidence_result = self.calculate_confidence_interval(source_data['total'])
+            total_confidence_result = self.calculate_confidence_interval_from_moments(*total_moments)
             
             # Simülasyon tahmini
             simulated_confidence_result = None
-            if len(source_data['simulated']) > 0:
-                simulated_confidence_result = self.calculate_confidence_interval(source_data['simulated'])
+            if simulated_moments[0] > 0:
+                simulated_confidence_result = self.calculate_confidence_interval_from_moments(*simulated_moments)
             
             # Kullanıcı tahmini
             user_confidence_result = None
-            if len(source_data['user']) > 0:
-                user_confidence_result = self.calculate_confidence_interval(source_data['user'])
+            if user_moments[0] > 0:
+                user_confidence_result = self.calculate_confidence_interval_from_moments(*user_moments)
             
             # Sonuç formatını hazırla
             result = {
@@ -132,9 +430,9 @@ class MatchPredictor:
                     'std_deviation': total_confidence_result['std']
                 },
                 'source_analysis': {
-                    'total_samples': len(source_data['total']),
-                    'simulated_samples': len(source_data['simulated']),
-                    'user_samples': len(source_data['user']),
+                    'total_samples': total_moments[0],
+                    'simulated_samples': simulated_moments[0],
+                    'user_samples': user_moments[0],
                     'simulated_prediction': simulated_confidence_result,
                     'user_prediction': user_confidence_result
                 },
@@ -160,8 +458,27 @@ class MatchPredictor:
         Returns:
             Dict: Güven aralığı sonuçları
         """
-        n = len(data)
+        data = np.asarray(data, dtype=np.int64)
+        return self.calculate_confidence_interval_from_moments(
+            len(data), int(data.sum()), int((data * data).sum())
+        )
+    
+    def calculate_confidence_interval_from_moments(self, n: int, total: int, total_sq: int,
+                                                   confidence_level: Optional[float] = None) -> Dict:
+        """
+        Güven aralığını yeterli istatistiklerden hesapla
         
+        Args:
+            n: Örnek sayısı
+            total: Değerlerin toplamı
+            total_sq: Değerlerin kareleri toplamı
+            confidence_level: Güven seviyesi (varsayılan: self.confidence_level)
+            
+        Returns:
+            Dict: Güven aralığı sonuçları
+        """
+        if confidence_level is None:
+            confidence_level = self.confidence_level
         if n == 0:
             return {
                 'error': 'Bu resim sayısı için veri bulunamadı',
@@ -170,19 +487,16 @@ class MatchPredictor:
                 'sample_size': 0
             }
         
-        # Ortalama ve standart sapma hesapla
-        x_bar = np.mean(data)
-        s = np.std(data, ddof=1)
-        
-        # Güven aralığı hesapla
-        if n <= 30:
-            # Küçük örneklemlerde t-dağılımı zorunlu
-            dist = "t"
-            crit_value = stats.t.ppf(0.975, df=n-1)
+        # Ortalama ve standart sapma hesapla (tam sayı aritmetiği, ddof=1)
+        x_bar = total / n
+        if n > 1:
+            s = float(np.sqrt((n * total_sq - total * total) / (n * (n - 1))))
         else:
-            # Büyük örneklemlerde z-dağılımı tercih edilebilir
-            dist = "z"
-            crit_value = stats.norm.ppf(0.975)
+            s = float('nan')
+        
+        # Güven aralığı hesapla: küçük örneklemlerde t, büyüklerde z dağılımı
+        dist = "t" if n <= T_MAX_SAMPLES else "z"
+        crit_value = float(self.critical_values([n], confidence_level)[0])
         
         # Margin of Error hesapla
         ME = crit_value * (s / np.sqrt(n))
@@ -198,67 +512,297 @@ class MatchPredictor:
             'distribution': dist,
             'sample_size': n,
             'margin_of_error': round(ME, 2),
-            'confidence_level': self.confidence_level
+            'confidence_level': confidence_level
         }
     
-    def predict_matches(self, n_images: int) -> Dict:
+    def critical_values(self, sample_sizes, confidence_level: Optional[float] = None) -> np.ndarray:
+        """
+        Örnek sayıları için kritik değerler (n<=30: t, df=n-1; üstünde z)
+        
+        Aktif model paketindeki tablo varsa o, yoksa önceden hesaplanmış
+        tablo kullanılır (scipy yalnızca alışılmadık güven seviyelerinde yüklenir).
+        
+        Args:
+            sample_sizes: Örnek sayıları
+            confidence_level: Güven seviyesi (varsayılan: self.confidence_level)
+            
+        Returns:
+            np.ndarray: Kritik değerler (n=1 için nan)
+        """
+        if confidence_level is None:
+            confidence_level = self.confidence_level
+        table = None
+        if self.artifact is not None:
+            table = self.artifact.critical_value_tables.get(round(confidence_level, 6))
+        if table is None:
+            table = critical_value_table(confidence_level)
+        return lookup_critical_values(sample_sizes, table)
+    
+    def get_confidence_levels(self) -> List[float]:
+        """Güven aralıkları için seçilebilen seviyeler (tabloları önceden hesaplanmış)"""
+        if self.artifact is not None:
+            return sorted(self.artifact.critical_value_tables)
+        return list(DEFAULT_CONFIDENCE_LEVELS)
+    
+    def get_quantile_table(self) -> QuantileTable:
+        """
+        N başına ampirik yüzdelik tablosu: aktif model paketindeki tablo, yoksa
+        yüklü veri setinden bir kez hesaplanan tablo
+        
+        Returns:
+            QuantileTable: Yüzdelik tablosu
+        """
+        if self.artifact is not None and self.artifact.quantiles is not None:
+            return self.artifact.quantiles
+        if self.quantiles is None:
+            self.quantiles = QuantileTable.from_arrays(*self.get_match_arrays())
+        return self.quantiles
+    
+    def get_category_model(self) -> CategoryModel:
+        """
+        (N, kategori) büzülme parametreleri: aktif model paketindeki tablo, yoksa
+        yüklü veri setinin indeksinden bir kez hesaplanan tablo
+        
+        Returns:
+            CategoryModel: Parametre tablosu
+        """
+        if self.artifact is not None:
+            return self.artifact.category_model
+        if self.category_model is None:
+            self.category_model = CategoryModel.from_index(self.get_index())
+        return self.category_model
+    
+    def get_match_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tüm kayıtların resim ve maç sayıları (kolon formatında memory-map'ten okunur)
+        
+        Returns:
+            Tuple: (n_images, total_matches) dizileri
+        """
+        if self.dataset is None and self.columns is not None:
+            n = np.asarray(self.columns.column('n_images'), dtype=np.int64)
+            total = np.asarray(self.columns.column('total_matches'), dtype=np.int64)
+            if self.pending_records:
+                n = np.concatenate([n, [r['n_images'] for r in self.pending_records]])
+                total = np.concatenate([total, [r['total_matches'] for r in self.pending_records]])
+            return n, total
+        records = self.get_dataset()
+        n = np.fromiter((r['n_images'] for r in records), dtype=np.int64, count=len(records))
+        total = np.fromiter((r['total_matches'] for r in records), dtype=np.int64, count=len(records))
+        return n, total
+    
+    def resolve_interval_options(self, confidence_level: Optional[float] = None,
+                                 interval_type: str = 'confidence') -> float:
+        """
+        İstenen aralık tipini ve seviyesini doğrula
+        
+        Args:
+            confidence_level: Güven seviyesi / aralık kapsamı (varsayılan: güven aralığı için
+                self.confidence_level, yüzdelik aralığı için 0.8; tablo 0.8'i sunmuyorsa en geniş kapsam)
+            interval_type: 'confidence' (ortalamanın güven aralığı) veya
+                'quantile' (maç sayılarının ampirik aralığı, ör. 0.8 -> p10-p90)
+            
+        Returns:
+            float: Kullanılacak seviye
+            
+        Raises:
+            ValueError: Tip bilinmiyorsa veya seviye için önceden hesaplanmış tablo yoksa
+        """
+        if interval_type not in INTERVAL_TYPES:
+            raise ValueError(f"Geçersiz aralık tipi: {interval_type} ({', '.join(INTERVAL_TYPES)})")
+        if interval_type == 'confidence':
+            available = self.get_confidence_levels()
+            default = self.confidence_level
+        else:
+            available = self.get_quantile_table().interval_levels()
+            # Varsayılan yüzdelik tablosunda 0.95 kapsamı yok; güven seviyesi varsayılanı kullanılamaz
+            default = DEFAULT_INTERVAL_COVERAGE
+            if available and round(default, 6) not in [round(level, 6) for level in available]:
+                default = max(available)
+        if confidence_level is None:
+            confidence_level = default
+        if round(confidence_level, 6) not in [round(level, 6) for level in available]:
+            raise ValueError(
+                f"Desteklenmeyen seviye: {confidence_level} "
+                f"({interval_type} için: {', '.join(f'{level:g}' for level in available)})"
+            )
+        return confidence_level
+    
+    def predict_matches(self, n_images: int, confidence_level: Optional[float] = None,
+                        interval_type: str = 'confidence', category: Optional[str] = None) -> Dict:
         """
         Belirli bir resim sayısı için maç sayısı tahmini yap
         
         Args:
             n_images: Resim sayısı
+            confidence_level: Güven seviyesi / aralık kapsamı
+            interval_type: 'confidence' veya 'quantile' (bkz. resolve_interval_options)
+            category: Kategori (verisi az ise genel tahmine büzülür; bkz. category_model)
             
         Returns:
             Dict: Tahmin sonuçları
         """
         try:
-            # Veri setini yükle
-            if self.dataset is None:
-                self.load_dataset()
-            
-            # Bu resim sayısı için maç verilerini getir
-            matches_data = self.get_matches_for_n_images(n_images)
-            
-            if len(matches_data) == 0:
-                return {
-                    'error': f'{n_images} resim için veri bulunamadı',
-                    'n_images': n_images,
-                    'prediction': None
-                }
-            
-            # Güven aralığı hesapla
-            confidence_result = self.calculate_confidence_interval(matches_data)
-            
-            if 'error' in confidence_result:
-                return {
-                    'error': confidence_result['error'],
-                    'n_images': n_images,
-                    'prediction': None
-                }
+            return self.predict_many([n_images], confidence_level, interval_type, category)[n_images]
+        except Exception as e:
+            return {
+                'error': f'Tahmin hatası: {str(e)}',
+                'n_images': n_images,
+                'prediction': None
+            }
+    
+    def predict_matches_from_curve(self, n_images: int, confidence_level: Optional[float] = None) -> Dict:
+        """
+        Veride olmayan N için kapalı form eğriden tahmin (O(1), ham veri gerekmez)
+        
+        Args:
+            n_images: Resim sayısı
+            confidence_level: Tahmin aralığı güven seviyesi
             
-            # Sonuç formatını hazırla
-            result = {
+        Returns:
+            Dict: Tahmin sonuçları (aralık, yeni bir turnuva için tahmin aralığıdır)
+        """
+        return self._predict_from_curve([n_images], confidence_level)[n_images]
+    
+    def _predict_from_curve(self, n_values: List[int], confidence_level: Optional[float] = None) -> Dict[int, Dict]:
+        if confidence_level is None:
+            confidence_level = self.confidence_level
+        curve = self.get_curve()
+        arrays = curve.predict_arrays(n_values, confidence_level)
+        level = round(confidence_level * 100)
+        results = {}
+        for i, n_images in enumerate(n_values):
+            mean = round(float(arrays['mean'][i]), 2)
+            interval = (round(float(arrays['lower'][i]), 2), round(float(arrays['upper'][i]), 2))
+            results[n_images] = {
                 'n_images': n_images,
                 'prediction': {
-                    'estimated_matches': confidence_result['mean'],
-                    'confidence_interval': confidence_result['confidence_interval'],
-                    'confidence_level': f"%{int(confidence_result['confidence_level'] * 100)}",
-                    'distribution': confidence_result['distribution'],
-                    'sample_size': confidence_result['sample_size'],
-                    'margin_of_error': confidence_result['margin_of_error'],
-                    'std_deviation': confidence_result['std']
+                    'estimated_matches': mean,
+                    'confidence_interval': interval,
+                    'confidence_level': f"%{level}",
+                    'distribution': 'z',
+                    'sample_size': 0,
+                    'margin_of_error': round(float(arrays['margin'][i]), 2),
+                    'std_deviation': round(float(arrays['std'][i]), 2),
+                    'model': 'curve',
+                    'interval_type': 'prediction',
+                    'quantiles': None,
+                    'extrapolated': not (curve.n_min <= n_images <= curve.n_max)
                 },
-                'message': f"Yaklaşık {confidence_result['mean']} maç oynanacak (%{int(confidence_result['confidence_level'] * 100)} güven aralığı: {confidence_result['confidence_interval'][0]}-{confidence_result['confidence_interval'][1]})"
+                'message': f"Yaklaşık {mean} maç oynanacak (%{level} tahmin aralığı: {interval[0]}-{interval[1]})"
             }
+        return results
+    
+    def predict_many(self, n_values: List[int], confidence_level: Optional[float] = None,
+                     interval_type: str = 'confidence', category: Optional[str] = None) -> Dict[int, Dict]:
+        """
+        Birden çok resim sayısı için tek geçişte tahmin
+        
+        Kritik değerler ve eğri tahminleri tüm N'ler için vektörel hesaplanır;
+        aralıklar ve yüzdelikler önceden hesaplanmış tablolardan okunur.
+        
+        Args:
+            n_values: Resim sayıları
+            confidence_level: Güven seviyesi / aralık kapsamı
+            interval_type: 'confidence' veya 'quantile' (bkz. resolve_interval_options)
+            category: Kategori; ortalama ve güven aralığı (N, kategori) büzülmüş
+                tahmininden, yüzdelikler N'nin genel tablosundan gelir
             
-            return result
+        Returns:
+            Dict[int, Dict]: N -> tahmin sonucu (veri yoksa 'error' içerir)
             
-        except Exception as e:
-            return {
-                'error': f'Tahmin hatası: {str(e)}',
-                'n_images': n_images,
-                'prediction': None
-            }
+        Raises:
+            ValueError: Aralık tipi veya seviyesi desteklenmiyorsa
+        """
+        if self.dataset is None and self.columns is None:
+            self.load_dataset()
+        
+        confidence_level = self.resolve_interval_options(confidence_level, interval_type)
+        index = self.get_model_index()
+        quantiles = self.get_quantile_table()
+        n_values = list(dict.fromkeys(n_values))
+        moments = [index.get(n_images) for n_images in n_values]
+        found = [i for i, m in enumerate(moments) if m[0] > 0]
+        missing = [n_values[i] for i, m in enumerate(moments) if m[0] == 0]
+        
+        results = {}
+        if found:
+            counts = np.array([moments[i][0] for i in found], dtype=np.int64)
+            means = [moments[i][1] / moments[i][0] for i in found]
+            # Varyans payı tam sayı aritmetiğiyle (calculate_confidence_interval_from_moments ile aynı)
+            stds = np.array([
+                float(np.sqrt((n * ss - t * t) / (n * (n - 1)))) if n > 1 else float('nan')
+                for n, t, ss in (moments[i] for i in found)
+            ])
+            effective = counts.astype(np.float64)
+            
+            # Kategori istenmişse (N, kategori) büzülmüş parametreleri (tablodan O(1))
+            weights = np.zeros(len(found))
+            if category is not None:
+                category_model = self.get_category_model()
+                for j, i in enumerate(found):
+                    estimate = category_model.get(n_values[i], category)
+                    if estimate is not None:
+                        means[j] = estimate['mean']
+                        stds[j] = estimate['std']
+                        counts[j] = estimate['sample_size']
+                        effective[j] = estimate['effective_sample_size']
+                        weights[j] = estimate['weight']
+            
+            small = effective <= T_MAX_SAMPLES
+            crit_values = self.critical_values(np.round(effective).astype(np.int64), confidence_level)
+            margins = crit_values * (stds / np.sqrt(effective))
+            level = round(confidence_level * 100)
+            
+            for j, i in enumerate(found):
+                n_images = n_values[i]
+                mean = round(means[j], 2)
+                margin = float(margins[j])
+                interval = None
+                if interval_type == 'quantile':
+                    interval = quantiles.interval(n_images, confidence_level)
+                # Yüzdelik tablosunda olmayan N'lerde ortalamanın güven aralığına düşülür
+                kind = interval_type if interval is not None else 'confidence'
+                if kind == 'quantile':
+                    label = 'maç sayısı aralığı'
+                else:
+                    interval = (round(means[j] - margin, 2), round(means[j] + margin, 2))
+                    label = 'güven aralığı'
+                results[n_images] = {
+                    'n_images': n_images,
+                    'prediction': {
+                        'estimated_matches': mean,
+                        'confidence_interval': interval,
+                        'confidence_level': f"%{level}",
+                        'distribution': 'empirical' if kind == 'quantile' else ('t' if small[j] else 'z'),
+                        'sample_size': int(counts[j]),
+                        'margin_of_error': round(margin, 2),
+                        'std_deviation': round(float(stds[j]), 2),
+                        'interval_type': kind,
+                        'quantiles': quantiles.get(n_images)
+                    },
+                    'message': f"Yaklaşık {mean} maç oynanacak (%{level} {label}: {interval[0]}-{interval[1]})"
+                }
+                if category is not None:
+                    # Ağırlık 0: kategoride veri yok, genel N tahmini
+                    results[n_images]['prediction'].update({
+                        'category': category,
+                        'category_weight': round(float(weights[j]), 4),
+                        'effective_sample_size': round(float(effective[j]), 2),
+                    })
+        
+        if missing:
+            if self.get_curve() is not None:
+                results.update(self._predict_from_curve(missing, confidence_level))
+            else:
+                for n_images in missing:
+                    results[n_images] = {
+                        'error': f'{n_images} resim için veri bulunamadı',
+                        'n_images': n_images,
+                        'prediction': None
+                    }
+        
+        return {n_images: results[n_images] for n_images in n_values}
     
     def get_available_n_values(self) -> List[int]:
         """
@@ -267,14 +811,7 @@ class MatchPredictor:
         Returns:
             List[int]: Mevcut resim sayıları
         """
-        if self.dataset is None:
-            self.load_dataset()
-        
-        n_values = set()
-        for record in self.dataset:
-            n_values.add(record['n_images'])
-        
-        return sorted(list(n_values))
+        return self.get_index().n_values()
     
     def get_dataset_summary(self) -> Dict:
         """
@@ -283,11 +820,8 @@ class MatchPredictor:
         Returns:
             Dict: Veri seti özeti
         """
-        if self.dataset is None:
-            self.load_dataset()
-        
         n_values = self.get_available_n_values()
-        total_records = len(self.dataset)
+        total_records = self.get_index().total_count()
         
         return {
             'total_records': total_records,
@@ -297,6 +831,34 @@ class MatchPredictor:
                 'max': max(n_values) if n_values else 0
             }
         }
+    
+    def get_model_status(self) -> Dict:
+        """
+        Servis edilen modelin durumu
+        
+        Returns:
+            Dict: Model tipi, aktif paket bilgisi ve veri seti özeti
+        """
+        artifact = self.artifact.summary() if self.artifact is not None else None
+        level = int(self.confidence_level * 100)
+        if artifact is not None:
+            message = f"Model paketi {artifact['version']} servis ediliyor"
+        else:
+            message = 'Güven aralığı tabanlı tahmin modeli hazır (yayınlanmış model paketi yok)'
+        return {
+            'model_type': 'artifact' if artifact is not None else 'confidence_interval',
+            'status': 'ready',
+            'artifact': artifact,
+            # Paket yayınlandıktan sonra veri setine yeni kayıt eklendiyse True
+            'artifact_stale': artifact is not None and artifact['dataset_version'] != self.dataset_version,
+            'dataset_version': self.dataset_version,
+            'dataset_summary': self.get_dataset_summary(),
+            'available_n_values': self.get_model_index().n_values(),
+            'confidence_level': f'{level}%',
+            'confidence_levels': self.get_confidence_levels(),
+            'quantile_interval_levels': self.get_quantile_table().interval_levels(),
+            'message': message
+        }
 
 def load_and_test_model():
     """Test fonksiyonu"""
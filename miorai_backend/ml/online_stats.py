@@ -0,0 +1,229 @@
+"""
+Çevrimiçi Tahmin İstatistikleri
+Bu modül, tamamlanan turnuvaları model yeniden derlenmeden tahminlere yansıtır.
+Her (N, kategori) için model versiyonundan bu yana gelen maç sayıları Welford
+algoritmasıyla (sayı, ortalama, M2) olarak biriktirilir ve `ml_predictions`
+önbelleğinde model versiyonu altında saklanır:
+
+    ml:online:<versiyon>:<N>  ->  {kategori: [count, mean, m2]}
+
+Olay işleyicisi güncellemeyi kilit altında önbelleğe yazar, kendi sürecindeki
+modele uygular ve yalnızca değişen N'lerin tahmin anahtarlarını siler. Diğer
+worker'lar önbellek ıskasında `sync_online_stats` ile farkı kendi modellerine
+ekler.
+
+Ekleme günlüğü model versiyonuna ve sıcak yeniden yükleme kontrolüne dahil
+değildir. Paket kullanılmıyorsa yeni yüklenen model (ör. yeni worker) günlükteki
+kayıtları indeksine ekleyip uygulanmış moment sayar; bu yüzden versiyonun
+istatistikleri ilk kullanımda günlükteki kayıtlarla başlatılır. Yeni model
+versiyonu (paket yayını, sıkıştırma veya JSON'un yeniden yazılması) yeni bir
+istatistik alanıyla başlar; sıkıştırılan kayıtlar artık tabanın içindedir.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.cache import ml_cache
+
+from .columnar import ColumnarDataset, columns_path_for
+from .ingest import iter_pending_records
+from .match_predictor import MatchPredictor
+from .stats_index import Moments
+from .warmup import prediction_categories, prediction_variants
+
+logger = logging.getLogger('ml')
+
+# Kategorisiz kayıtların önbellekteki anahtarı
+NO_CATEGORY = ''
+# Önbellek kilit desteklemiyorsa (LocMem) süreç içi kilit
+_local_lock = threading.Lock()
+
+
+class RunningStats:
+    """Welford algoritmasıyla sayı, ortalama ve kare sapmalar toplamı (M2)"""
+
+    __slots__ = ('count', 'mean', 'm2')
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def update(self, value: float):
+        """Tek bir gözlemi ekle"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats') -> 'RunningStats':
+        """İki grubu birleştir (Chan vd. paralel varyans formülü)"""
+        count = self.count + other.count
+        if count == 0:
+            return RunningStats()
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        return RunningStats(count, mean, m2)
+
+    @property
+    def variance(self) -> float:
+        """Örnek varyansı (ddof=1); count < 2 ise nan"""
+        return self.m2 / (self.count - 1) if self.count > 1 else float('nan')
+
+    def to_moments(self) -> Moments:
+        """Tam sayı momentleri (count, sum, sum_sq); maç sayıları tam sayı olduğundan yuvarlama kesindir"""
+        total = self.mean * self.count
+        return self.count, int(round(total)), int(round(self.m2 + total * self.mean))
+
+    def to_list(self) -> List[float]:
+        return [self.count, self.mean, self.m2]
+
+    @classmethod
+    def from_list(cls, values: List[float]) -> 'RunningStats':
+        return cls(int(values[0]), float(values[1]), float(values[2]))
+
+
+def group_records(records: Iterable[Dict]) -> Dict[int, Dict[str, RunningStats]]:
+    """
+    Kayıtları N ve kategoriye göre Welford istatistiklerinde topla
+
+    Args:
+        records: Veri seti kayıtları
+
+    Returns:
+        Dict: N -> {kategori (kategorisiz için ''): RunningStats}
+    """
+    groups: Dict[int, Dict[str, RunningStats]] = {}
+    for record in records:
+        category = record.get('category') or NO_CATEGORY
+        groups.setdefault(record['n_images'], {}).setdefault(category, RunningStats()).update(
+            record['total_matches']
+        )
+    return groups
+
+
+@contextmanager
+def _online_lock(model_version: str):
+    """Önbellekteki istatistikler için oku-birleştir-yaz kilidi (django-redis'te dağıtık)"""
+    backend = ml_cache.cache_manager.cache
+    if hasattr(backend, 'lock'):
+        with backend.lock(f"{ml_cache.prefix}:online:lock:{model_version}", timeout=30):
+            yield
+    else:
+        with _local_lock:
+            yield
+
+
+def _to_moments(n_stats: Dict[int, Dict]) -> Dict[Tuple[int, Optional[str]], Moments]:
+    """Önbellek gösteriminden (N, kategori) -> tam sayı momentleri"""
+    return {
+        (n_images, category or None): RunningStats.from_list(values).to_moments()
+        for n_images, by_category in n_stats.items()
+        for category, values in by_category.items()
+    }
+
+
+def _seed_from_log(predictor: MatchPredictor) -> Tuple[Dict[int, Dict], List[int]]:
+    """
+    Versiyonun istatistiklerini ilk kullanımda günlükteki kayıtlarla başlat (kilit altında)
+
+    Returns:
+        Tuple: (yazılan istatistikler N -> {kategori: [count, mean, m2]}, işaretlenen turnuvalar);
+            başlatma gerekmiyorsa boş
+    """
+    model_version = predictor.model_version
+    # Paket günlükteki kayıtları içermez; paketin istatistikleri boş başlar
+    if predictor.artifact is not None or ml_cache.is_online_seeded(model_version):
+        return {}, []
+
+    columns_path = columns_path_for(predictor.dataset_path)
+    compacted = (
+        ColumnarDataset.open(columns_path).meta.get('compacted_batches')
+        if ColumnarDataset.exists(columns_path) else None
+    )
+    records = list(iter_pending_records(predictor.dataset_path, compacted))
+    # Günlük bu versiyonun üstündeki kayıtların tamamıdır: mevcut toplamların yerine geçer
+    seeded = {
+        n_images: {category: stats.to_list() for category, stats in by_category.items()}
+        for n_images, by_category in group_records(records).items()
+    }
+    tournament_ids = [record['tournament_id'] for record in records if record.get('tournament_id') is not None]
+    if not ml_cache.cache_online_stats(model_version, seeded):
+        raise RuntimeError("Çevrimiçi istatistikler önbelleğe yazılamadı")
+    ml_cache.mark_applied_tournaments(model_version, tournament_ids)
+    ml_cache.mark_online_seeded(model_version)
+    return seeded, tournament_ids
+
+
+def apply_completed_records(records: List[Dict], predictor: MatchPredictor) -> List[int]:
+    """
+    Tamamlanan turnuvaları çevrimiçi istatistiklere ve tahminlere uygula
+
+    Daha önce uygulanmış turnuvalar (tekrar işlenen olaylar) atlanır. Yalnızca
+    değişen N'lerin tahmin anahtarları (tüm kategoriler ve aralık varyantları)
+    silinir; diğer anahtarlar sıcak kalır.
+
+    Args:
+        records: Yeni veri seti kayıtları ('tournament_id' içerir)
+        predictor: Kayıtlar eklenmeden önceki model versiyonuna sahip tahmin modeli
+
+    Returns:
+        List[int]: Tahmini değişen resim sayıları
+    """
+    model_version = predictor.model_version
+    with _online_lock(model_version):
+        # Günlükten başlatma bu kayıtları da (günlüğe yazılmışlarsa) uygulanmış sayar
+        seeded, seeded_ids = _seed_from_log(predictor)
+        applied = set(ml_cache.get_applied_tournaments(
+            model_version, [record['tournament_id'] for record in records]
+        ))
+        new_ids = set(seeded_ids)
+        new_records = [record for record in records if record['tournament_id'] not in applied]
+        batch = group_records(new_records)
+        new_ids.update(record['tournament_id'] for record in new_records)
+        affected = {record['n_images'] for record in records if record['tournament_id'] in new_ids}
+        if not affected:
+            return []
+
+        current = ml_cache.get_online_stats(model_version, sorted(affected | set(batch)))
+        updated = {n_images: current[n_images] for n_images in affected if n_images in current}
+        for n_images, by_category in batch.items():
+            merged = dict(current.get(n_images, {}))
+            for category, stats in by_category.items():
+                previous = RunningStats.from_list(merged[category]) if category in merged else RunningStats()
+                merged[category] = previous.merge(stats).to_list()
+            updated[n_images] = merged
+        if not ml_cache.cache_online_stats(model_version, {n: updated[n] for n in batch}):
+            raise RuntimeError("Çevrimiçi istatistikler önbelleğe yazılamadı")
+        ml_cache.mark_applied_tournaments(model_version, [record['tournament_id'] for record in new_records])
+    if seeded:
+        updated = {**seeded, **updated}
+
+    changed = sorted(set(predictor.apply_online_moments(_to_moments(updated))) | affected)
+    # N'nin genel tahmini kategori tahminlerinin büzülme hedefidir: N'nin tüm kategorileri etkilenir
+    ml_cache.invalidate_predictions(
+        changed, prediction_categories(), model_version=model_version,
+        variants=prediction_variants(predictor)
+    )
+    logger.info(f"Çevrimiçi istatistikler güncellendi: {len(new_ids)} turnuva, N={changed}")
+    return changed
+
+
+def sync_online_stats(predictor: MatchPredictor, n_values: Iterable[int]) -> List[int]:
+    """
+    Diğer süreçlerde biriken istatistikleri modele uygula (tek multi-get)
+
+    Args:
+        predictor: Tahmin modeli
+        n_values: Tahmin edilecek resim sayıları
+
+    Returns:
+        List[int]: Momentleri değişen resim sayıları
+    """
+    stats = ml_cache.get_online_stats(predictor.model_version, list(n_values))
+    if not stats:
+        return []
+    return predictor.apply_online_moments(_to_moments(stats))
@@ -0,0 +1,116 @@
+"""
+Ampirik Yüzdelik Tablosu
+Bu modül, her N için maç sayılarının ampirik yüzdeliklerini (p10/p50/p90 vb.)
+tek bir vektörel geçişte hesaplar. Tablo model paketinde saklanır; kullanıcının
+göreceği maç sayısı aralığı (ör. %80 için p10-p90) istek sırasında yalnızca
+tablodan okunur.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95)
+# Seviye verilmeyen yüzdelik aralığı isteklerinin kapsamı (p10-p90)
+DEFAULT_INTERVAL_COVERAGE = 0.8
+
+
+def quantile_label(level: float) -> str:
+    """Yüzdelik etiketi (0.1 -> 'p10', 0.025 -> 'p2.5')"""
+    return f"p{round(level * 100, 4):g}"
+
+
+class QuantileTable:
+    """N -> ampirik yüzdelikler"""
+
+    def __init__(self, levels: Iterable[float], by_n: Dict[int, List[float]]):
+        self.levels = [float(level) for level in levels]
+        self.by_n = by_n
+        self._positions = {round(level, 6): i for i, level in enumerate(self.levels)}
+
+    @classmethod
+    def from_arrays(cls, n: np.ndarray, total: np.ndarray,
+                    levels: Iterable[float] = DEFAULT_QUANTILES) -> 'QuantileTable':
+        """
+        Kolon dizilerinden tabloyu vektörel olarak hesapla (np.quantile 'linear' ile aynı)
+
+        Args:
+            n: Resim sayıları
+            total: Toplam maç sayıları
+            levels: Yüzdelik seviyeleri (0-1 arası)
+
+        Returns:
+            QuantileTable: Tablo
+        """
+        levels = sorted({float(level) for level in levels})
+        if any(not 0 <= level <= 1 for level in levels):
+            raise ValueError(f"Geçersiz yüzdelik seviyesi: {levels}")
+        n = np.asarray(n, dtype=np.int64)
+        total = np.asarray(total, dtype=np.float64)
+        if len(n) == 0 or not levels:
+            return cls(levels, {})
+
+        # N ve maç sayısına göre sırala; her grup ardışık bir dilim olur
+        order = np.lexsort((total, n))
+        n, total = n[order], total[order]
+        n_values, starts, counts = np.unique(n, return_index=True, return_counts=True)
+
+        position = (counts[:, None] - 1) * np.asarray(levels)[None, :]
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, counts[:, None] - 1)
+        fraction = position - lower
+        low_values = total[starts[:, None] + lower]
+        high_values = total[starts[:, None] + upper]
+        values = low_values + fraction * (high_values - low_values)
+
+        return cls(levels, {
+            int(n_images): [round(float(value), 4) for value in row]
+            for n_images, row in zip(n_values.tolist(), values)
+        })
+
+    def get(self, n_images: int) -> Optional[Dict[str, float]]:
+        """N için yüzdelikler ({'p10': ..., 'p50': ...}); veri yoksa None"""
+        row = self.by_n.get(n_images)
+        if row is None:
+            return None
+        return {quantile_label(level): value for level, value in zip(self.levels, row)}
+
+    def interval_levels(self) -> List[float]:
+        """Simetrik yüzdelik çiftleriyle verilebilen aralık kapsamları (ör. p10-p90 -> 0.8)"""
+        coverages = {
+            round(1 - 2 * level, 6) for level in self.levels
+            if level < 0.5 and round(1 - level, 6) in self._positions
+        }
+        return sorted(coverages)
+
+    def interval(self, n_images: int, coverage: float) -> Optional[Tuple[float, float]]:
+        """
+        N için merkezi ampirik aralık
+
+        Args:
+            n_images: Resim sayısı
+            coverage: Aralığın kapsamı (ör. 0.8 -> p10-p90)
+
+        Returns:
+            Optional[Tuple]: (alt, üst); N için veri yoksa None
+        """
+        tail = round((1 - coverage) / 2, 6)
+        if tail not in self._positions or round(1 - tail, 6) not in self._positions:
+            raise ValueError(
+                f"Tabloda %{coverage * 100:g} aralığı için yüzdelik yok "
+                f"(mevcut: {', '.join(f'{level:g}' for level in self.interval_levels())})"
+            )
+        row = self.by_n.get(n_images)
+        if row is None:
+            return None
+        return row[self._positions[tail]], row[self._positions[round(1 - tail, 6)]]
+
+    def to_dict(self) -> Dict:
+        return {
+            'levels': self.levels,
+            'by_n': [[n_images] + row for n_images, row in sorted(self.by_n.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'QuantileTable':
+        return cls(data['levels'], {int(row[0]): list(row[1:]) for row in data['by_n']})
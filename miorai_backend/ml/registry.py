@@ -0,0 +1,137 @@
+"""
+Süreç Genelinde Tahmin Modeli Kaydı
+Bu modül, MatchPredictor'ı süreç başına bir kez yükler ve veri seti tabanı
+veya aktif model paketi (bkz. artifacts) değiştiğinde arka planda yeni modeli yükleyip atomik olarak değiştirir.
+Ekleme günlüğüne yazılan kayıtlar yeniden yükleme tetiklemez; çevrimiçi
+istatistiklerle (bkz. online_stats) mevcut modele yansıtılır.
+İstekler yalnızca bellekteki modeli okur, diske dokunmaz.
+"""
+
+import os
+import threading
+import time
+import logging
+from typing import Optional
+
+from django.conf import settings
+
+from .artifacts import MODELS_DIR, active_path_for
+from .match_predictor import MatchPredictor, DATASET_PATH, get_base_version, get_file_version
+
+logger = logging.getLogger('ml')
+
+
+class PredictorRegistry:
+    """Süreç başına tek MatchPredictor örneği ve sıcak yeniden yükleme"""
+
+    def __init__(self, dataset_path: str = DATASET_PATH, reload_interval: Optional[float] = None,
+                 models_dir: Optional[str] = None):
+        self.dataset_path = dataset_path
+        self._models_dir = models_dir
+        self._reload_interval = reload_interval
+        self._predictor = None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._watcher = None
+
+    @property
+    def reload_interval(self) -> float:
+        """Dosya kontrol aralığı (saniye); 0 izlemeyi kapatır"""
+        if self._reload_interval is not None:
+            return self._reload_interval
+        return getattr(settings, 'ML_PREDICTOR', {}).get('RELOAD_INTERVAL', 5.0)
+
+    @property
+    def models_dir(self) -> str:
+        """Yayınlanmış model paketlerinin dizini"""
+        if self._models_dir is not None:
+            return self._models_dir
+        return getattr(settings, 'ML_PREDICTOR', {}).get('MODELS_DIR', MODELS_DIR)
+
+    def get(self) -> MatchPredictor:
+        """
+        Aktif tahmin modelini getir
+
+        Returns:
+            MatchPredictor: Yüklü ve salt-okunur model
+        """
+        predictor = self._predictor
+        if predictor is not None and self._pid == os.getpid():
+            return predictor
+
+        # İlk çağrı (veya fork sonrası yeni worker): modeli yükle, izlemeyi başlat
+        with self._lock:
+            if self._predictor is None or self._pid != os.getpid():
+                self._predictor = self._build()
+                self._pid = os.getpid()
+                self._watcher = None
+                self._start_watcher()
+            return self._predictor
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Veri seti tabanı, eğri veya paket değiştiyse yeni modeli yükle ve atomik olarak değiştir
+
+        Args:
+            force: Versiyon değişmemiş olsa bile yeniden yükle
+
+        Returns:
+            bool: Model değiştirildiyse True
+        """
+        current = self._predictor
+        if not force and current is not None:
+            # Günlük versiyona dahil değil: her tamamlanan turnuva tüm worker'larda modeli yeniden kurmaz
+            if (get_base_version(self.dataset_path) == current.base_version
+                    and get_file_version(current.curve_path) == current.curve_version
+                    and get_file_version(active_path_for(self.models_dir)) == current.artifact_version):
+                return False
+
+        try:
+            predictor = self._build()
+        except Exception as e:
+            # Yükleme başarısızsa eski model hizmet vermeye devam eder
+            logger.error(f"Tahmin modeli yeniden yüklenemedi: {e}")
+            return False
+
+        # Referans ataması atomiktir; devam eden istekler eski modeli kullanmayı sürdürür
+        self._predictor = predictor
+        logger.info(
+            f"Tahmin modeli yeniden yüklendi (veri: {predictor.dataset_version}, "
+            f"paket: {predictor.artifact.version if predictor.artifact else None})"
+        )
+        return True
+
+    def _build(self) -> MatchPredictor:
+        predictor = MatchPredictor(self.dataset_path, models_dir=self.models_dir)
+        predictor.load()
+        # Yüzdelik ve kategori tabloları yükleme sırasında hazırlanır; istekler yalnızca okur
+        predictor.get_quantile_table()
+        predictor.get_category_model()
+        # Paylaşılan model salt-okunurdur
+        if predictor.dataset is not None:
+            predictor.dataset = tuple(predictor.dataset)
+        return predictor
+
+    def _start_watcher(self):
+        interval = self.reload_interval
+        if not interval or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name='ml-predictor-watcher', daemon=True
+        )
+        self._watcher.start()
+
+    def _watch(self, interval: float):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(interval)
+            self.reload()
+
+
+# Global registry instance
+predictor_registry = PredictorRegistry()
+
+
+def get_predictor() -> MatchPredictor:
+    """Süreç genelindeki tahmin modelini getir"""
+    return predictor_registry.get()
@@ -0,0 +1,217 @@
+"""
+Yeterli İstatistik İndeksi
+Bu modül, veri setini resim sayısı (ve isteğe bağlı kategori/kaynak) bazında
+gruplayıp her grup için sayı, toplam ve kareler toplamını saklar. Güven
+aralıkları bu momentlerden O(1) sürede hesaplanır.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+SOURCES = ('simulated', 'user')
+
+# Gruplama seviyeleri: sorguda verilen alanlara göre uygun tablo seçilir
+LEVELS = (
+    ('n',),
+    ('n', 'source'),
+    ('n', 'category'),
+    ('n', 'category', 'source'),
+)
+
+Moments = Tuple[int, int, int]  # (count, sum, sum_sq)
+
+
+def record_source(record: Dict) -> str:
+    """Kaydın kaynağını getir ('user' veya 'simulated')"""
+    return 'user' if record.get('is_user_tournament', False) else 'simulated'
+
+
+def _sort_key(item):
+    # Kategori None olabilir; None'lar önce sıralanır
+    return tuple((value is not None, value) for value in item[0])
+
+
+class MomentIndex:
+    """(n, kategori, kaynak) anahtarlı count/sum/sum_sq tabloları"""
+
+    def __init__(self):
+        self._tables: Dict[Tuple[str, ...], Dict[tuple, List[int]]] = {level: {} for level in LEVELS}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> 'MomentIndex':
+        """
+        Kayıt listesinden indeks oluştur
+
+        Args:
+            records: Veri seti kayıtları
+
+        Returns:
+            MomentIndex: İndeks
+        """
+        records = list(records)
+        categories: List[Optional[str]] = []
+        category_codes: Dict[Optional[str], int] = {}
+        n = np.fromiter((r['n_images'] for r in records), dtype=np.int64, count=len(records))
+        total = np.fromiter((r['total_matches'] for r in records), dtype=np.int64, count=len(records))
+        source = np.fromiter(
+            (SOURCES.index(record_source(r)) for r in records), dtype=np.int64, count=len(records)
+        )
+
+        def category_code(category):
+            if category not in category_codes:
+                category_codes[category] = len(categories)
+                categories.append(category)
+            return category_codes[category]
+
+        category = np.fromiter(
+            (category_code(r.get('category')) for r in records), dtype=np.int64, count=len(records)
+        )
+        return cls.from_arrays(n, total, category, categories, source)
+
+    @classmethod
+    def from_arrays(cls, n: np.ndarray, total: np.ndarray, category: np.ndarray,
+                    categories: List[Optional[str]], source: np.ndarray) -> 'MomentIndex':
+        """
+        Kolon dizilerinden vektörel group-by ile indeks oluştur
+
+        Args:
+            n: Resim sayıları
+            total: Toplam maç sayıları
+            category: Kategori kodları (categories listesine index)
+            categories: Kod -> kategori adı
+            source: Kaynak kodları (SOURCES listesine index)
+
+        Returns:
+            MomentIndex: İndeks
+        """
+        index = cls()
+        if len(n) == 0:
+            return index
+
+        total = np.asarray(total, dtype=np.int64)
+        columns = {
+            'n': np.asarray(n, dtype=np.int64),
+            'category': np.asarray(category, dtype=np.int64),
+            'source': np.asarray(source, dtype=np.int64),
+        }
+        decoders = {
+            'n': int,
+            'category': lambda code: categories[code],
+            'source': lambda code: SOURCES[code],
+        }
+
+        for level in LEVELS:
+            keys = np.stack([columns[field] for field in level], axis=1)
+            unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            counts = np.bincount(inverse, minlength=len(unique_keys))
+            sums = np.bincount(inverse, weights=total, minlength=len(unique_keys))
+            sums_sq = np.bincount(inverse, weights=total * total, minlength=len(unique_keys))
+
+            table = index._tables[level]
+            for key, count, s, ss in zip(unique_keys.tolist(), counts.tolist(), sums.tolist(), sums_sq.tolist()):
+                decoded = tuple(decoders[field](value) for field, value in zip(level, key))
+                table[decoded] = [int(count), int(round(s)), int(round(ss))]
+
+        return index
+
+    def add(self, n_images: int, total_matches: int, category: Optional[str] = None,
+            source: str = 'simulated'):
+        """
+        Tek bir kaydı indekse artımlı olarak ekle
+
+        Args:
+            n_images: Resim sayısı
+            total_matches: Toplam maç sayısı
+            category: Kategori (simülasyonlarda None)
+            source: 'simulated' veya 'user'
+        """
+        values = {'n': n_images, 'category': category, 'source': source}
+        for level, table in self._tables.items():
+            key = tuple(values[field] for field in level)
+            moments = table.setdefault(key, [0, 0, 0])
+            moments[0] += 1
+            moments[1] += total_matches
+            moments[2] += total_matches * total_matches
+
+    def merge(self, n_images: int, moments: Moments, category: Optional[str] = None,
+              source: str = 'simulated'):
+        """
+        Bir grubun momentlerini indekse ekle (çevrimiçi güncellemeler için)
+
+        Her tablo girdisi yerinde değiştirilmez, yeni liste olarak atanır; eşzamanlı
+        okuyucular bir girdinin yarı güncellenmiş halini görmez.
+
+        Args:
+            n_images: Resim sayısı
+            moments: Eklenecek (count, sum, sum_sq)
+            category: Kategori
+            source: 'simulated' veya 'user'
+        """
+        values = {'n': n_images, 'category': category, 'source': source}
+        for level, table in self._tables.items():
+            key = tuple(values[field] for field in level)
+            current = table.get(key, (0, 0, 0))
+            table[key] = [current[0] + moments[0], current[1] + moments[1], current[2] + moments[2]]
+
+    def add_record(self, record: Dict):
+        """Veri seti kaydını indekse ekle"""
+        self.add(record['n_images'], record['total_matches'], record.get('category'), record_source(record))
+
+    def get(self, n_images: int, category: Optional[str] = None, source: Optional[str] = None) -> Moments:
+        """
+        Bir grubun momentlerini getir
+
+        Args:
+            n_images: Resim sayısı
+            category: İsteğe bağlı kategori filtresi
+            source: İsteğe bağlı kaynak filtresi ('simulated' / 'user')
+
+        Returns:
+            Moments: (count, sum, sum_sq); veri yoksa (0, 0, 0)
+        """
+        level = ('n',) + (('category',) if category is not None else ()) + (('source',) if source is not None else ())
+        values = {'n': n_images, 'category': category, 'source': source}
+        moments = self._tables[level].get(tuple(values[field] for field in level))
+        return tuple(moments) if moments else (0, 0, 0)
+
+    def count(self, n_images: int, **filters) -> int:
+        """Bir gruptaki kayıt sayısını getir"""
+        return self.get(n_images, **filters)[0]
+
+    def table(self, *fields: str) -> Dict[tuple, Moments]:
+        """
+        Bir gruplama seviyesindeki tüm grupların momentlerini getir
+
+        Args:
+            fields: 'n' dışındaki gruplama alanları (ör. 'category', 'source')
+
+        Returns:
+            Dict: Grup anahtarı -> (count, sum, sum_sq)
+        """
+        return {key: tuple(moments) for key, moments in self._tables[('n',) + fields].items()}
+
+    def to_dict(self) -> Dict:
+        """JSON'a yazılabilir tablo gösterimi: seviye -> [anahtar..., count, sum, sum_sq] satırları"""
+        return {
+            ','.join(level): [list(key) + list(moments) for key, moments in sorted(table.items(), key=_sort_key)]
+            for level, table in self._tables.items()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MomentIndex':
+        """to_dict çıktısından indeksi geri oluştur"""
+        index = cls()
+        for level in LEVELS:
+            table = index._tables[level]
+            for row in data.get(','.join(level), []):
+                table[tuple(row[:len(level)])] = [int(value) for value in row[len(level):]]
+        return index
+
+    def n_values(self) -> List[int]:
+        """İndekste bulunan resim sayılarını getir"""
+        return sorted(key[0] for key in self._tables[('n',)])
+
+    def total_count(self) -> int:
+        """İndeksteki toplam kayıt sayısı"""
+        return sum(moments[0] for moments in self._tables[('n',)].values())
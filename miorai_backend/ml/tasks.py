@@ -0,0 +1,135 @@
+"""
+ML Arka Plan Görevleri
+Bu modül, outbox üzerinden kuyruğa alınan olayları işler. Turnuva tamamlanma
+olayları toplu olarak veri seti kaydına çevrilip günlüğe eklenir ve çevrimiçi
+istatistiklerle (bkz. online_stats) tahminlere hemen yansıtılır; istek yolunda
+ek sorgu veya dosya işlemi yapılmaz.
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.outbox import enqueue, register_handler
+
+from .ingest import append_records
+from .match_predictor import DATASET_PATH
+from .online_stats import apply_completed_records
+from .registry import predictor_registry
+
+logger = logging.getLogger('ml')
+
+TOURNAMENT_COMPLETED = 'ml.tournament_completed'
+
+
+def enqueue_tournament_completed(tournament) -> None:
+    """
+    Tamamlanan turnuvayı ML veri toplama kuyruğuna ekle
+
+    Args:
+        tournament: Tamamlanan turnuva
+    """
+    # Tamamlanma anı olayla birlikte saklanır; worker'ın gördüğü updated_at sonradan değişebilir
+    enqueue(TOURNAMENT_COMPLETED, {'tournament_id': tournament.id, 'completed_at': timezone.now().isoformat()})
+
+
+def build_tournament_record(tournament, completed_at: Optional[str] = None) -> Dict:
+    """
+    Turnuvadan veri seti kaydı oluştur
+
+    Args:
+        tournament: `real_image_count`, `image_count` ve `match_count` ile
+            annotate edilmiş turnuva
+        completed_at: Tamamlanma anı (ISO 8601); yoksa (eski olaylar) updated_at
+
+    Returns:
+        Dict: Veri seti kaydı
+    """
+    n_images = tournament.real_image_count
+    return {
+        'n_images': n_images,
+        'total_matches': tournament.match_count,
+        'tournament_id': tournament.id,
+        'simulation_id': f"user_{tournament.user_id}_{tournament.id}",
+        'real_images': n_images,
+        'total_images_after_padding': tournament.image_count,
+        'rounds_played': tournament.current_round,
+        'is_completed': tournament.is_completed,
+        'category': tournament.category,
+        'user_id': tournament.user_id,
+        'created_at': tournament.created_at.isoformat(),
+        'completed_at': completed_at or tournament.updated_at.isoformat(),
+        'is_user_tournament': True  # Kullanıcı turnuvası olduğunu belirt
+    }
+
+
+def _current_predictor():
+    """Disktekiyle güncel tahmin modeli; yüklenemiyorsa None (çevrimiçi güncelleme atlanır)"""
+    try:
+        predictor_registry.get()
+        predictor_registry.reload()
+        return predictor_registry.get()
+    except Exception as e:
+        logger.error(f"Tahmin modeli yüklenemedi, çevrimiçi güncelleme atlanıyor: {e}")
+        return None
+
+
+@register_handler(TOURNAMENT_COMPLETED)
+def collect_completed_tournaments(payloads: List[Dict]) -> None:
+    """
+    Tamamlanan turnuvaları tek sorgu ve tek günlük yazımıyla veri setine ekle
+
+    Args:
+        payloads: {'tournament_id': ..., 'completed_at': ...} olay gövdeleri
+    """
+    from tournaments.models import Tournament
+
+    completed_at = {payload['tournament_id']: payload.get('completed_at') for payload in payloads}
+    tournament_ids = set(completed_at)
+    tournaments = (
+        Tournament.objects.filter(id__in=tournament_ids, is_completed=True)
+        .annotate(
+            real_image_count=Count(
+                'images', filter=Q(images__name__isnull=False) & ~Q(images__name__startswith='BOŞ_'),
+                distinct=True
+            ),
+            image_count=Count('images', distinct=True),
+            match_count=Count('matches', distinct=True),
+        )
+        .order_by('id')
+    )
+    records = [build_tournament_record(tournament, completed_at[tournament.id]) for tournament in tournaments]
+    if not records:
+        return
+
+    # Model versiyonu günlüğe yazmadan önce alınır; istatistikler bu versiyonun üstüne eklenir
+    predictor = _current_predictor()
+
+    # Yeniden denenen olaylar (kilit süresi dolan veya çöken worker) günlükteki turnuvaları
+    # tekrar eklemez: günlüğe yazılan turnuva ml_collected_at ile işaretlenir. Satır kilidi
+    # aynı turnuvayı işleyen diğer worker'ı işaret yazılana kadar bekletir.
+    with transaction.atomic():
+        new_ids = set(
+            Tournament.objects.select_for_update()
+            .filter(id__in=[record['tournament_id'] for record in records], ml_collected_at__isnull=True)
+            .values_list('id', flat=True)
+        )
+        appended = [record for record in records if record['tournament_id'] in new_ids]
+        if appended:
+            # Yazma ile işaret arasında çökülürse olay tekrar eklenebilir (en az bir kez), kaybolmaz
+            append_records(appended, DATASET_PATH)
+            Tournament.objects.filter(id__in=new_ids).update(ml_collected_at=timezone.now())
+    logger.info(f"{len(appended)} tamamlanan turnuva ML veri setine eklendi")
+
+    if predictor is None:
+        return
+    try:
+        # Tüm kayıtlar verilir: önceki denemede eklenip uygulanamayanlar şimdi uygulanır
+        # (uygulanmış turnuvalar apply_completed_records tarafından atlanır)
+        apply_completed_records(records, predictor)
+    except Exception as e:
+        # Kayıtlar günlükte; tahminler bir sonraki model derlemesinde yine güncellenir
+        logger.error(f"Çevrimiçi istatistikler güncellenemedi: {e}")
@@ -0,0 +1,1340 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from knox.models import AuthToken
+from rest_framework.test import APITestCase
+from tournaments.models import Tournament, TournamentImage
+from core.cache import ml_cache
+
+import numpy as np
+
+from .analytics import build_analytics, dataset_comparison, dataset_info, get_analytics, user_tournament_stats
+from .artifacts import (
+    ModelArtifact, get_active_version, list_artifacts, load_active_artifact, publish_artifact, validate_artifact
+)
+from .fast_simulator import VectorizedTournamentSimulator, padded_size
+from .dataset_generation import checkpoint_path_for, generate_dataset_parallel
+from .curve_model import MatchCountCurve
+from .evaluation import evaluate_accuracy
+from .warmup import prediction_categories, supported_n_values, warm_prediction_cache
+from .cleaning import SeenIds, clean_dataset, iter_dataset_records, iter_json_array
+from .columnar import convert_json_to_columns
+from .category_model import DEFAULT_PRIOR_STRENGTH, CategoryModel
+from .critical_values import T_MAX_SAMPLES, critical_value_table, lookup_critical_values
+from .live_estimate import estimate_remaining, tournament_state
+from .online_stats import RunningStats, apply_completed_records, sync_online_stats
+from .ingest import append_record, compact, iter_pending_records, log_path_for
+from .match_predictor import MatchPredictor
+from .quantiles import QuantileTable
+from .registry import PredictorRegistry
+from .stats_index import MomentIndex
+from .tasks import collect_completed_tournaments, enqueue_tournament_completed
+from .winner_models import fit_winner_model, get_winner_model, user_match_moments, winner_model_from_params
+
+
+def clear_caches():
+    # ML önbelleği ayrı bir alias'ta (ml_predictions) tutulur
+    for alias in caches:
+        caches[alias].clear()
+
+
+def write_dataset(path, records):
+    with open(path, 'w') as f:
+        json.dump(records, f)
+
+
+class PredictorRegistryTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        write_dataset(self.dataset_path, [
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 4, 'total_matches': 6},
+        ])
+        self.registry = PredictorRegistry(self.dataset_path, reload_interval=0)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_loads_once(self):
+        """Test model süreç başına bir kez yüklenir"""
+        predictor = self.registry.get()
+        self.assertIs(self.registry.get(), predictor)
+        self.assertEqual(len(predictor.get_dataset()), 2)
+        self.assertFalse(self.registry.reload())
+
+    def test_reload_swaps_model_on_change(self):
+        """Test veri seti değişince yeni model atomik olarak değiştirilir"""
+        old = self.registry.get()
+        write_dataset(self.dataset_path, [
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 4, 'total_matches': 6},
+            {'n_images': 4, 'total_matches': 7},
+        ])
+        st = os.stat(self.dataset_path)
+        os.utime(self.dataset_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertTrue(self.registry.reload())
+        new = self.registry.get()
+        self.assertIsNot(new, old)
+        self.assertEqual(len(new.get_dataset()), 3)
+        # Eski model değişmeden kalır
+        self.assertEqual(len(old.get_dataset()), 2)
+
+    def test_log_append_does_not_reload(self):
+        """Test günlüğe eklenen kayıt modeli yeniden yükletmez"""
+        old = self.registry.get()
+        append_record({'n_images': 4, 'total_matches': 7, 'tournament_id': 1}, self.dataset_path)
+        self.assertFalse(self.registry.reload())
+        self.assertIs(self.registry.get(), old)
+
+    def test_failed_reload_keeps_model(self):
+        """Test bozuk veri seti eski modeli bozmaz"""
+        old = self.registry.get()
+        with open(self.dataset_path, 'w') as f:
+            f.write('[{"n_images": ')
+        self.assertFalse(self.registry.reload(force=True))
+        self.assertIs(self.registry.get(), old)
+
+
+class MomentIndexTest(TestCase):
+    def setUp(self):
+        self.records = [
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 4, 'total_matches': 7},
+            {'n_images': 4, 'total_matches': 6, 'category': 'anime', 'is_user_tournament': True},
+            {'n_images': 8, 'total_matches': 15, 'category': 'general', 'is_user_tournament': True},
+        ]
+
+    def test_group_by_moments(self):
+        """Test vektörel group-by doğru momentleri üretir"""
+        index = MomentIndex.from_records(self.records)
+        self.assertEqual(index.get(4), (3, 18, 110))
+        self.assertEqual(index.get(4, source='simulated'), (2, 12, 74))
+        self.assertEqual(index.get(4, category='anime'), (1, 6, 36))
+        self.assertEqual(index.get(16), (0, 0, 0))
+        self.assertEqual(index.n_values(), [4, 8])
+
+    def test_incremental_add_matches_rebuild(self):
+        """Test artımlı ekleme yeniden oluşturma ile aynı sonucu verir"""
+        index = MomentIndex.from_records(self.records[:2])
+        for record in self.records[2:]:
+            index.add_record(record)
+        rebuilt = MomentIndex.from_records(self.records)
+        for n in (4, 8):
+            for filters in ({}, {'source': 'user'}, {'category': 'general'}):
+                self.assertEqual(index.get(n, **filters), rebuilt.get(n, **filters))
+
+    def test_prediction_from_moments_matches_raw_data(self):
+        """Test momentlerden güven aralığı ham veriden hesaplananla aynıdır"""
+        predictor = MatchPredictor()
+        predictor.dataset = list(self.records)
+        data = predictor.get_matches_for_n_images(4)
+        self.assertEqual(
+            predictor.calculate_confidence_interval(data),
+            predictor.calculate_confidence_interval_from_moments(*predictor.get_index().get(4))
+        )
+        self.assertEqual(predictor.predict_matches(4)['prediction']['sample_size'], 3)
+
+
+class ColumnarDatasetTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.records = [
+            {'n_images': 4, 'total_matches': 5, 'tournament_id': 1, 'simulation_id': 0, 'real_images': 4,
+             'total_images_after_padding': 4, 'rounds_played': 6, 'is_completed': True},
+            {'n_images': 8, 'total_matches': 15, 'tournament_id': 1781, 'simulation_id': 'user_4_1781',
+             'real_images': 8, 'total_images_after_padding': 8, 'rounds_played': 12, 'is_completed': True,
+             'category': 'general', 'user_id': 4, 'created_at': '2025-07-26T11:36:16.121019+00:00',
+             'completed_at': '2025-07-26T11:36:35.818522+00:00', 'is_user_tournament': True},
+        ]
+        write_dataset(self.dataset_path, self.records)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        """Test JSON -> kolon -> kayıt dönüşümü kayıpsızdır"""
+        columns = convert_json_to_columns(self.dataset_path)
+        self.assertEqual(len(columns), 2)
+        self.assertIsInstance(columns.column('n_images'), np.memmap)
+        self.assertEqual(columns.to_records(), self.records)
+
+    def test_predictor_prefers_fresh_columns(self):
+        """Test predictor güncel kolon formatını memory-map ile yükler"""
+        convert_json_to_columns(self.dataset_path)
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertIsNotNone(predictor.columns)
+        self.assertIsNone(predictor.dataset)
+        self.assertEqual(predictor.get_available_n_values(), [4, 8])
+        self.assertEqual(predictor.predict_matches(8)['prediction']['estimated_matches'], 15)
+
+    def test_stale_columns_rebuilt_from_json(self):
+        """Test JSON değiştiyse kolon formatı yeni JSON'dan yeniden oluşturulur"""
+        convert_json_to_columns(self.dataset_path)
+        write_dataset(self.dataset_path, self.records + [{'n_images': 16, 'total_matches': 40}])
+        st = os.stat(self.dataset_path)
+        os.utime(self.dataset_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertIsNotNone(predictor.columns)
+        self.assertEqual(predictor.get_available_n_values(), [4, 8, 16])
+
+
+class IngestTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        write_dataset(self.dataset_path, [{'n_images': 4, 'total_matches': 5}])
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_append_and_skip_partial_line(self):
+        """Test günlüğe ekleme yapılır ve yarım kalan son satır atlanır"""
+        append_record({'n_images': 8, 'total_matches': 15}, self.dataset_path)
+        with open(log_path_for(self.dataset_path), 'ab') as f:
+            f.write(b'{"n_images": 8, "tot')
+        self.assertEqual(list(iter_pending_records(self.dataset_path)), [{'n_images': 8, 'total_matches': 15}])
+
+    def test_compaction_moves_log_into_columns(self):
+        """Test sıkıştırma günlüğü kolonlara taşır ve tekrar çalıştırıldığında bir şey yapmaz"""
+        append_record({'n_images': 8, 'total_matches': 15}, self.dataset_path)
+        append_record({'n_images': 8, 'total_matches': 17}, self.dataset_path)
+        self.assertEqual(compact(self.dataset_path), 2)
+        self.assertEqual(compact(self.dataset_path), 0)
+
+        self.assertEqual(list(iter_pending_records(self.dataset_path)), [])
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertIsNotNone(predictor.columns)
+        self.assertEqual(predictor.get_index().get(8), (2, 32, 514))
+        self.assertEqual(predictor.get_index().count(4), 1)
+
+    def test_rewritten_json_keeps_compacted_records(self):
+        """Test JSON yeniden yazıldığında sıkıştırılmış kullanıcı kayıtları kaybolmaz"""
+        append_record({'n_images': 8, 'total_matches': 15, 'tournament_id': 7, 'is_user_tournament': True},
+                      self.dataset_path)
+        compact(self.dataset_path)
+        write_dataset(self.dataset_path, [{'n_images': 4, 'total_matches': 4}, {'n_images': 16, 'total_matches': 40}])
+        st = os.stat(self.dataset_path)
+        os.utime(self.dataset_path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertEqual(predictor.get_available_n_values(), [4, 8, 16])
+        self.assertEqual(predictor.get_index().count(8, source='user'), 1)
+        self.assertEqual(predictor.get_index().get(4), (1, 4, 16))
+        self.assertEqual(len(list(iter_dataset_records(self.dataset_path))), 3)
+
+        # Sonraki sıkıştırma yeni tabanın üstüne devam eder
+        append_record({'n_images': 8, 'total_matches': 17, 'tournament_id': 8, 'is_user_tournament': True},
+                      self.dataset_path)
+        self.assertEqual(compact(self.dataset_path), 1)
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertEqual(predictor.get_index().count(8, source='user'), 2)
+
+    def test_predictor_sees_pending_records(self):
+        """Test predictor henüz sıkıştırılmamış kayıtları da kullanır"""
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        version = predictor.dataset_version
+
+        append_record({'n_images': 8, 'total_matches': 15, 'is_user_tournament': True}, self.dataset_path)
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+        self.assertNotEqual(predictor.dataset_version, version)
+        self.assertEqual(predictor.get_available_n_values(), [4, 8])
+        self.assertEqual(len(predictor.get_dataset()), 2)
+        self.assertEqual(predictor.get_index().count(8, source='user'), 1)
+
+
+class TournamentCompletedTaskTest(TestCase):
+    def setUp(self):
+        from tournaments.models import Tournament, TournamentImage, Match
+
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        user = get_user_model().objects.create_user(email='ml@example.com', password='testpassword123')
+        self.tournament = Tournament.objects.create(user=user, is_completed=True, current_round=3)
+        images = [
+            TournamentImage.objects.create(tournament=self.tournament, image='a.png', name=name, original_filename='a.png')
+            for name in ('a', 'b', 'c', 'BOŞ_1')
+        ]
+        Match.objects.create(tournament=self.tournament, image1=images[0], image2=images[1], round_number=1, match_index=0)
+        Match.objects.create(tournament=self.tournament, image1=images[1], image2=images[2], round_number=2, match_index=0)
+        # Worker'ın modeli test veri setinden yüklenir (süreç genelindeki modele dokunulmaz)
+        patcher = mock.patch('ml.tasks.predictor_registry', PredictorRegistry(self.dataset_path, reload_interval=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_completed_tournament_is_collected_by_worker(self):
+        """Test tamamlanan turnuva kuyruğa eklenir ve worker tarafından veri setine yazılır"""
+        from core.outbox import process_batch
+
+        enqueue_tournament_completed(self.tournament)
+        with mock.patch('ml.tasks.DATASET_PATH', self.dataset_path):
+            self.assertEqual(process_batch(), 1)
+
+        records = list(iter_pending_records(self.dataset_path))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['n_images'], 3)
+        self.assertEqual(records[0]['total_matches'], 2)
+        self.assertEqual(records[0]['total_images_after_padding'], 4)
+        self.assertEqual(records[0]['rounds_played'], 3)
+        self.assertTrue(records[0]['is_user_tournament'])
+        self.tournament.refresh_from_db()
+        self.assertIsNotNone(self.tournament.ml_collected_at)
+
+    def test_completion_keeps_unaffected_cached_predictions(self):
+        """Test günlüğe ekleme model versiyonunu değiştirmez; ilgisiz N'nin önbellekteki tahmini korunur"""
+        clear_caches()
+        self.addCleanup(clear_caches)
+        write_dataset(self.dataset_path, [{'n_images': n, 'total_matches': m} for n, m in ((3, 2), (8, 10), (8, 12))])
+        registry = PredictorRegistry(self.dataset_path, reload_interval=0, models_dir=os.path.join(self.tmp_dir, 'models'))
+        predictor = registry.get()
+        version = predictor.model_version
+        ml_cache.cache_predictions(predictor.predict_many([3, 8]), model_version=version)
+
+        payload = {'tournament_id': self.tournament.id, 'completed_at': '2025-07-26T11:36:35.818522+00:00'}
+        with mock.patch('ml.tasks.predictor_registry', registry), mock.patch('ml.tasks.DATASET_PATH', self.dataset_path):
+            collect_completed_tournaments([payload])
+        # Günlüğe ekleme modeli yeniden kurdurmaz; kayıt çevrimiçi istatistiklerle uygulanır
+        self.assertFalse(registry.reload())
+        self.assertIs(registry.get(), predictor)
+        self.assertEqual(predictor.model_version, version)
+        self.assertEqual(
+            ml_cache.get_cached_prediction(8, model_version=version),
+            predictor.predict_matches(8)
+        )
+        self.assertIsNone(ml_cache.get_cached_prediction(3, model_version=version))
+        self.assertEqual(sync_online_stats(predictor, [3, 8]), [])
+        self.assertEqual(predictor.predict_matches(3)['prediction']['sample_size'], 2)
+
+    def test_retried_event_is_not_appended_twice(self):
+        """Test yeniden denenen olay turnuvayı günlüğe ikinci kez eklemez ve tamamlanma anını korur"""
+        payload = {'tournament_id': self.tournament.id, 'completed_at': '2025-07-26T11:36:35.818522+00:00'}
+        with mock.patch('ml.tasks.DATASET_PATH', self.dataset_path):
+            collect_completed_tournaments([payload])
+            collect_completed_tournaments([payload])
+            compact(self.dataset_path)
+            collect_completed_tournaments([payload])
+
+        records = list(iter_dataset_records(self.dataset_path))
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['completed_at'], payload['completed_at'])
+
+    def test_incomplete_tournament_is_skipped(self):
+        """Test tamamlanmamış turnuvalar veri setine eklenmez"""
+        self.tournament.is_completed = False
+        self.tournament.save()
+        with mock.patch('ml.tasks.DATASET_PATH', self.dataset_path):
+            collect_completed_tournaments([{'tournament_id': self.tournament.id}])
+        self.assertEqual(list(iter_pending_records(self.dataset_path)), [])
+
+
+class VectorizedSimulatorTest(TestCase):
+    def _orm_simulate(self, n, choose):
+        from .tournament_simulator import TournamentSimulator
+
+        with mock.patch('ml.tournament_simulator.random.choice', side_effect=choose):
+            return TournamentSimulator().simulate_tournament(n)
+
+    def test_matches_orm_simulator_when_image1_wins(self):
+        """Test image1 her zaman kazandığında ORM simülatörüyle aynı sonucu verir"""
+        simulator = VectorizedTournamentSimulator(winner_fn=lambda rng, t, a, b: np.ones(len(a), dtype=bool))
+        for n in (1, 2, 3, 5, 8, 13):
+            expected = self._orm_simulate(n, lambda seq: seq[0])
+            result = simulator.simulate(n, 1)[0]
+            self.assertEqual(result['total_matches'], expected['total_matches'], n)
+            self.assertEqual(result['rounds_played'], expected['rounds_played'], n)
+            self.assertEqual(result['total_images_after_padding'], expected['total_images_after_padding'], n)
+
+    def test_matches_orm_simulator_on_seeded_preferences(self):
+        """Test tohumlanmış rastgele tercih sıralarında ORM simülatörüyle aynı sonucu verir"""
+        rng = np.random.default_rng(42)
+        for n in (4, 7, 10, 16):
+            for _ in range(3):
+                rank = rng.permutation(n)
+                expected = self._orm_simulate(
+                    n, lambda seq: min(seq, key=lambda image: rank[int(image.name.rsplit('_', 1)[1])])
+                )
+                simulator = VectorizedTournamentSimulator(winner_fn=lambda rng, t, a, b: rank[a] < rank[b])
+                result = simulator.simulate(n, 1)[0]
+                self.assertEqual(result['total_matches'], expected['total_matches'], (n, rank))
+                self.assertEqual(result['rounds_played'], expected['rounds_played'], (n, rank))
+
+    def test_batch_is_seeded_and_schema_compatible(self):
+        """Test aynı tohumla aynı sonuçlar üretilir ve kayıtlar veri seti şemasına uyar"""
+        first = VectorizedTournamentSimulator(seed=7, batch_size=16).simulate(12, 40)
+        second = VectorizedTournamentSimulator(seed=7, batch_size=16).simulate(12, 40)
+        self.assertEqual(first, second)
+        self.assertEqual([r['simulation_id'] for r in first], list(range(40)))
+        self.assertEqual(padded_size(12), 16)
+        # Bir turnuvada en az N-1 maç oynanır
+        self.assertTrue(all(r['total_matches'] >= 11 for r in first))
+        index = MomentIndex.from_records(first)
+        self.assertEqual(index.count(12), 40)
+
+
+class WinnerModelTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_records_store_model_params(self):
+        """Test simüle edilen kayıtlar model parametrelerini taşır ve kolonlara aynen yazılır"""
+        records = []
+        for name, value in (('uniform', None), ('bradley_terry', 2.0), ('noisy_transitive', 0.25)):
+            model = get_winner_model(name, value)
+            batch = VectorizedTournamentSimulator(seed=3, winner_model=model).simulate(6, 5)
+            self.assertTrue(all(r['winner_model'] == model.params() for r in batch))
+            self.assertEqual(winner_model_from_params(model.params()).params(), model.params())
+            records.extend(batch)
+        self.assertEqual(records[-1]['winner_model'], {'name': 'noisy_transitive', 'noise': 0.25})
+
+        write_dataset(self.dataset_path, records + [{'n_images': 6, 'total_matches': 9, 'is_user_tournament': True}])
+        columns = convert_json_to_columns(self.dataset_path)
+        self.assertEqual(len(columns.winner_models), 3)
+        self.assertEqual(columns.to_records()[:len(records)], records)
+        self.assertNotIn('winner_model', columns.to_records()[-1])
+
+        with self.assertRaises(ValueError):
+            get_winner_model('unknown')
+
+    def test_models_change_outcomes_deterministically(self):
+        """Test tam geçişli tercih (noise=0) kazananı sıraya göre seçer ve aynı tohumla tekrarlanır"""
+        model = get_winner_model('noisy_transitive', 0.0)
+        winner = model.start(np.random.default_rng(0), 2, 4)
+        a, b = np.array([0, 1, 2]), np.array([1, 2, 3])
+        first = winner(np.random.default_rng(1), np.zeros(3, dtype=np.int64), a, b)
+        self.assertTrue(np.array_equal(first, ~winner(np.random.default_rng(1), np.zeros(3, dtype=np.int64), b, a)))
+
+        strong = get_winner_model('bradley_terry', 50.0).start(np.random.default_rng(0), 1, 2)
+        wins = strong(np.random.default_rng(1), np.zeros(200, dtype=np.int64), np.zeros(200, dtype=np.int64),
+                      np.ones(200, dtype=np.int64))
+        # Güç farkı çok büyük: hep aynı resim kazanır
+        self.assertIn(wins.mean(), (0.0, 1.0))
+
+        simulator = VectorizedTournamentSimulator(seed=5, winner_model=model)
+        self.assertEqual(simulator.simulate(9, 20), VectorizedTournamentSimulator(seed=5, winner_model=model).simulate(9, 20))
+
+    def test_fit_recovers_parameter_from_user_tournaments(self):
+        """Test parametre, kullanıcı turnuvalarını üreten değere uydurulur"""
+        true_model = get_winner_model('noisy_transitive', 0.0)
+        user_records = []
+        for n in (8, 16, 24):
+            totals = VectorizedTournamentSimulator(winner_model=true_model, batch_size=64).simulate_batch(
+                n, 64, np.random.default_rng([0, n])
+            )['total_matches']
+            user_records.extend(
+                {'n_images': n, 'total_matches': int(total), 'is_user_tournament': True} for total in totals
+            )
+        write_dataset(self.dataset_path, user_records + [{'n_images': 8, 'total_matches': 40}])
+        predictor = MatchPredictor(self.dataset_path)
+        predictor.load()
+
+        moments = user_match_moments(predictor.get_index())
+        self.assertEqual(sorted(moments), [8, 16, 24])
+        self.assertEqual(moments[8][0], 64)
+
+        model, results = fit_winner_model(
+            'noisy_transitive', moments, grid=[0.0, 0.5], simulations_per_n=64, seed=0
+        )
+        self.assertEqual(model.params(), {'name': 'noisy_transitive', 'noise': 0.0})
+        self.assertEqual(results[0]['loss'], 0.0)
+        self.assertGreater(results[1]['loss'], 0.0)
+
+        with self.assertRaises(ValueError):
+            fit_winner_model('noisy_transitive', {})
+
+    def test_generation_records_model_in_manifest(self):
+        """Test paralel üretim seçilen modeli kullanır ve kontrol noktasına yazar"""
+        params = {'name': 'bradley_terry', 'strength_std': 1.5}
+        generate_dataset_parallel(self.dataset_path, n_range=(3, 4), simulations_per_n=3, workers=1,
+                                  winner_model=params)
+        with open(self.dataset_path, 'r') as f:
+            dataset = json.load(f)
+        self.assertTrue(all(r['winner_model'] == params for r in dataset))
+        with open(os.path.join(checkpoint_path_for(self.dataset_path), 'manifest.json'), 'r') as f:
+            self.assertEqual(json.load(f)['winner_model'], params)
+
+        with self.assertRaises(ValueError):
+            generate_dataset_parallel(self.dataset_path, n_range=(3, 4), simulations_per_n=3, workers=1,
+                                      resume=True)
+
+
+class ParallelDatasetGenerationTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp_dir, 'dataset.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _read(self, path):
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def test_result_is_independent_of_workers(self):
+        """Test sonuç işçi sayısından bağımsızdır"""
+        generate_dataset_parallel(self.output, n_range=(2, 6), simulations_per_n=7, workers=1, shard_size=3)
+        serial = self._read(self.output)
+        other = os.path.join(self.tmp_dir, 'other.json')
+        generate_dataset_parallel(other, n_range=(2, 6), simulations_per_n=7, workers=2, shard_size=3)
+        self.assertEqual(serial, self._read(other))
+        self.assertEqual(len(serial), 5 * 7)
+        self.assertEqual([r['simulation_id'] for r in serial if r['n_images'] == 4], list(range(7)))
+
+    def test_resume_only_runs_missing_shards(self):
+        """Test --resume yalnızca eksik parçaları çalıştırır"""
+        generate_dataset_parallel(self.output, n_range=(2, 5), simulations_per_n=4, workers=1, shard_size=2)
+        expected = self._read(self.output)
+        os.remove(os.path.join(checkpoint_path_for(self.output), 'n0003_s0001.json'))
+
+        ran = []
+        generate_dataset_parallel(self.output, n_range=(2, 5), simulations_per_n=4, workers=1, shard_size=2,
+                                  resume=True, progress=lambda done, total, shard: ran.append(shard))
+        self.assertEqual(ran, [(3, 1, 2, 2)])
+        self.assertEqual(self._read(self.output), expected)
+
+        with self.assertRaises(ValueError):
+            generate_dataset_parallel(self.output, n_range=(2, 5), simulations_per_n=4, workers=1, shard_size=2,
+                                      seed=1, resume=True)
+
+    def test_user_records_are_kept(self):
+        """Test mevcut kullanıcı turnuvası kayıtları yeni veri setine taşınır"""
+        user_record = {'n_images': 8, 'total_matches': 15, 'is_user_tournament': True, 'category': 'general'}
+        write_dataset(self.output, [{'n_images': 8, 'total_matches': 12}, user_record])
+        generate_dataset_parallel(self.output, n_range=(2, 3), simulations_per_n=2, workers=1)
+        dataset = self._read(self.output)
+        self.assertEqual(len(dataset), 5)
+        self.assertEqual(dataset[-1], user_record)
+
+
+class MatchCountCurveTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.curve_path = os.path.join(self.tmp_dir, 'curve.json')
+        # Bilinen eğriden üretilmiş momentler: E = n·log2 n, Var = n
+        n_values = [16, 24, 32, 48, 64, 96, 128]
+        self.curve = MatchCountCurve.fit(
+            n_values, [100] * len(n_values), [n * np.log2(n) for n in n_values], list(n_values)
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_fit_recovers_known_curve(self):
+        """Test bilinen ortalama ve varyans eğrisi geri elde edilir"""
+        np.testing.assert_allclose(self.curve.mean_coef, [0, 1, 0], atol=1e-9)
+        np.testing.assert_allclose(self.curve.var_coef, [1, 0, 0], atol=1e-9)
+
+        prediction = self.curve.predict(500)
+        self.assertAlmostEqual(prediction['mean'], round(500 * np.log2(500), 2))
+        self.assertAlmostEqual(prediction['std'], round(np.sqrt(500), 2))
+        self.assertTrue(prediction['extrapolated'])
+        self.assertLess(prediction['prediction_interval'][0], prediction['mean'])
+
+    def test_round_trip_and_predictor_fallback(self):
+        """Test parametre dosyası kaydedilir ve veride olmayan N için kullanılır"""
+        self.curve.save(self.curve_path)
+        dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        write_dataset(dataset_path, [{'n_images': 4, 'total_matches': 5}, {'n_images': 4, 'total_matches': 4}])
+
+        predictor = MatchPredictor(dataset_path, curve_path=self.curve_path)
+        predictor.load()
+        result = predictor.predict_matches(300)
+        self.assertNotIn('error', result)
+        self.assertEqual(result['prediction']['model'], 'curve')
+        self.assertAlmostEqual(result['prediction']['estimated_matches'], round(300 * np.log2(300), 2))
+        self.assertEqual(predictor.predict_matches(4)['prediction']['estimated_matches'], 4.5)
+
+        # Eğri yoksa eski davranış korunur
+        predictor = MatchPredictor(dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'))
+        predictor.load()
+        self.assertIn('error', predictor.predict_matches(300))
+
+
+class BatchPredictMatchesViewTest(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        write_dataset(dataset_path, [
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 4, 'total_matches': 4},
+            {'n_images': 8, 'total_matches': 12},
+            {'n_images': 8, 'total_matches': 14},
+        ])
+        self.predictor = MatchPredictor(dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'))
+        self.predictor.load()
+        patcher = mock.patch('ml.views.get_predictor', return_value=self.predictor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        user = get_user_model().objects.create_user(email='batch@example.com', password='testpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+        self.url = '/api/ml/predict-matches/batch/'
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_batch_matches_single_predictions_and_uses_cache(self):
+        """Test toplu tahmin tekil tahminlerle aynıdır ve ikinci istek önbellekten gelir"""
+        response = self.client.post(self.url, {'n_images': [8, 4, 16, 4]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['n_images'] for p in response.data['predictions']], [4, 8])
+        self.assertEqual(response.data['errors'][0]['n_images'], 16)
+        self.assertEqual(response.data['cache_hits'], 0)
+        for prediction in response.data['predictions']:
+            self.assertEqual(
+                prediction['prediction'], self.predictor.predict_matches(prediction['n_images'])['prediction']
+            )
+
+        response = self.client.post(self.url, {'n_min': 4, 'n_max': 8}, format='json')
+        self.assertEqual(response.data['cache_hits'], 2)
+        self.assertEqual([p['n_images'] for p in response.data['predictions']], [4, 8])
+
+    def test_invalid_requests(self):
+        """Test geçersiz veya çok büyük istekler reddedilir"""
+        for data in ({}, {'n_images': [1, 4]}, {'n_images': 'x'}, {'n_min': 2, 'n_max': 10 ** 6}):
+            response = self.client.post(self.url, data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+
+
+class PredictionCacheWarmupTest(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.models_dir = os.path.join(self.tmp_dir, 'models')
+        write_dataset(self.dataset_path, [
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 4, 'total_matches': 4},
+            {'n_images': 6, 'total_matches': 9},
+            {'n_images': 6, 'total_matches': 10},
+        ])
+        user = get_user_model().objects.create_user(email='warmup@example.com', password='testpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self):
+        predictor = MatchPredictor(self.dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'),
+                                   models_dir=self.models_dir)
+        predictor.load()
+        return predictor
+
+    def test_predictions_use_ml_alias_and_model_version(self):
+        """Test tahminler ml_predictions alias'ına model versiyonuyla yazılır"""
+        self.assertEqual(ml_cache.cache_manager.alias, 'ml_predictions')
+        ml_cache.cache_prediction(4, {'n_images': 4}, model_version='v1')
+        self.assertEqual(ml_cache.get_cached_prediction(4, model_version='v1'), {'n_images': 4})
+        self.assertIsNone(ml_cache.get_cached_prediction(4, model_version='v2'))
+        self.assertIsNone(caches['default'].get(ml_cache.get_prediction_key(4, model_version='v1')))
+
+    def test_warmup_fills_table_and_publish_switches_version(self):
+        """Test ısıtma tüm N ve kategorileri doldurur; yayın sonrası yeni versiyonun tablosu kullanılır"""
+        predictor = self.load_predictor()
+        self.assertEqual(supported_n_values(predictor), [2, 3, 4, 5, 6])
+        result = warm_prediction_cache(predictor)
+        # 2, 3 ve 5 için veri ve eğri yok: yalnızca 4 ve 6 yazılır
+        self.assertEqual(result['keys'], 2 * len(prediction_categories()))
+
+        with mock.patch('ml.views.get_predictor', return_value=predictor), \
+                mock.patch.object(predictor, 'predict_matches', side_effect=AssertionError) as predict:
+            response = self.client.post('/api/ml/predict-matches/', {'n_images': 6, 'category': 'art'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['prediction']['sample_size'], 2)
+            predict.assert_not_called()
+
+        publish_artifact(ModelArtifact.build(predictor.get_index(), dataset_version='new'), self.models_dir)
+        published = self.load_predictor()
+        self.assertNotEqual(published.model_version, predictor.model_version)
+        self.assertEqual(ml_cache.get_cached_predictions([4, 6], model_version=published.model_version), {})
+
+        out = StringIO()
+        call_command('warm_ml_cache', dataset=self.dataset_path, models_dir=self.models_dir, max_n=6, stdout=out)
+        self.assertIn(published.model_version, out.getvalue())
+        # Komut varsayılan eğriyi de yükler; veri olan N'ler her durumda tabloda
+        warmed = ml_cache.get_cached_predictions([4, 5, 6], 'art', model_version=published.model_version)
+        self.assertTrue({4, 6} <= set(warmed))
+
+
+class AccuracyEvaluationTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        user = {'is_user_tournament': True, 'category': 'general', 'user_id': 1}
+        write_dataset(self.dataset_path, [
+            {'n_images': 4, 'total_matches': 4},
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 8, 'total_matches': 12},
+            dict(user, n_images=4, total_matches=6, tournament_id=1, completed_at='2025-01-01T00:00:00+00:00'),
+            dict(user, n_images=8, total_matches=14, tournament_id=2, completed_at='2025-01-02T00:00:00+00:00'),
+            dict(user, n_images=16, total_matches=30, tournament_id=3, completed_at='2025-01-03T00:00:00+00:00'),
+        ])
+        self.curve_path = os.path.join(self.tmp_dir, 'missing.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self):
+        predictor = MatchPredictor(self.dataset_path, curve_path=self.curve_path)
+        predictor.load()
+        return predictor
+
+    def test_in_sample_matches_per_record_predictions(self):
+        """Test vektörel değerlendirme kayıt kayıt tahminle aynı sonucu verir"""
+        predictor = self.load_predictor()
+        result = evaluate_accuracy(predictor)
+        self.assertEqual([r['tournament_id'] for r in result['accuracy_data']], [1, 2, 3])
+        for row in result['accuracy_data']:
+            expected = predictor.predict_matches(row['n_images'])['prediction']['estimated_matches']
+            self.assertEqual(row['predicted_matches'], expected)
+            self.assertAlmostEqual(row['error'], abs(expected - row['actual_matches']), places=2)
+        self.assertEqual(result['summary']['total_predictions'], 3)
+
+        # Kolon formatı aynı sonucu verir
+        convert_json_to_columns(self.dataset_path)
+        self.assertEqual(evaluate_accuracy(self.load_predictor()), result)
+
+    def test_holdout_excludes_evaluated_record(self):
+        """Test holdout modunda kayıt kendi tahminine katılmaz"""
+        result = evaluate_accuracy(self.load_predictor(), mode='holdout')
+        predicted = {r['tournament_id']: r['predicted_matches'] for r in result['accuracy_data']}
+        # N=16 için başka veri yok ve eğri de yok: değerlendirilemez
+        self.assertEqual(predicted, {1: 4.5, 2: 12.0})
+        self.assertEqual(result['summary']['bias'], -1.75)
+
+    def test_time_split_evaluates_latest_records(self):
+        """Test zaman bölmesi yalnızca son kayıtları, önceki veriyle değerlendirir"""
+        result = evaluate_accuracy(self.load_predictor(), mode='time_split', test_fraction=0.5)
+        self.assertEqual(
+            [(r['tournament_id'], r['predicted_matches']) for r in result['accuracy_data']], [(2, 12.0)]
+        )
+        with self.assertRaises(ValueError):
+            evaluate_accuracy(self.load_predictor(), mode='unknown')
+
+    def test_view_validates_mode_and_caches_by_version(self):
+        """Test endpoint geçersiz modu reddeder ve sonucu versiyona göre önbelleğe alır"""
+        clear_caches()
+        self.addCleanup(clear_caches)
+        predictor = self.load_predictor()
+        user = get_user_model().objects.create_user(email='accuracy@example.com', password='testpassword123')
+        auth = {'HTTP_AUTHORIZATION': f'Token {AuthToken.objects.create(user)[1]}'}
+        with mock.patch('ml.views.get_predictor', return_value=predictor):
+            self.assertEqual(self.client.get('/api/ml/model-accuracy/?mode=x', **auth).status_code, 400)
+            with mock.patch('ml.views.evaluate_accuracy', wraps=evaluate_accuracy) as evaluate:
+                for _ in range(2):
+                    response = self.client.get('/api/ml/model-accuracy/?mode=holdout&details=false', **auth)
+                    self.assertEqual(response.status_code, 200)
+                self.assertEqual(evaluate.call_count, 1)
+        self.assertNotIn('accuracy_data', response.json())
+
+
+class DatasetAnalyticsTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.records = [
+            {'n_images': 4, 'total_matches': 4},
+            {'n_images': 4, 'total_matches': 5},
+            {'n_images': 8, 'total_matches': 12},
+            {'n_images': 4, 'total_matches': 6, 'is_user_tournament': True, 'category': 'art'},
+            {'n_images': 16, 'total_matches': 30, 'is_user_tournament': True},
+            {'n_images': 16, 'total_matches': 32, 'is_user_tournament': True, 'category': 'art'},
+        ]
+        write_dataset(self.dataset_path, self.records)
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self):
+        predictor = MatchPredictor(self.dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'))
+        predictor.load()
+        return predictor
+
+    def test_aggregates_match_record_scan(self):
+        """Test analiz toplamları kayıt taramasıyla aynıdır"""
+        predictor = self.load_predictor()
+        analytics = get_analytics(predictor)
+
+        info = dataset_info(analytics)
+        self.assertEqual(info['dataset_info'], predictor.get_dataset_summary())
+        self.assertEqual(info['sample_counts'], {4: 3, 8: 1, 16: 2})
+
+        stats = user_tournament_stats(analytics)
+        self.assertEqual((stats['total_user_tournaments'], stats['total_simulated_tournaments']), (3, 3))
+        self.assertEqual(stats['category_statistics'], {
+            'art': {'count': 2, 'total_matches': 38, 'avg_matches': 19.0},
+            'general': {'count': 1, 'total_matches': 30, 'avg_matches': 30.0},
+        })
+        self.assertEqual(stats['n_statistics'][16], {'count': 2, 'total_matches': 62, 'avg_matches': 31.0})
+
+        comparison = dataset_comparison(analytics)
+        self.assertEqual(list(comparison['comparison']), [4])
+        self.assertEqual(comparison['comparison'][4]['difference'], 1.5)
+
+        # Kolon formatından aynı toplamlar
+        convert_json_to_columns(self.dataset_path)
+        self.assertEqual(build_analytics(self.load_predictor().get_index()), analytics)
+
+    def test_cached_per_dataset_version(self):
+        """Test toplamlar versiyon başına bir kez hesaplanır"""
+        predictor = self.load_predictor()
+        with mock.patch('ml.analytics.build_analytics', wraps=build_analytics) as build:
+            get_analytics(predictor)
+            get_analytics(predictor)
+            self.assertEqual(build.call_count, 1)
+
+            append_record({'n_images': 8, 'total_matches': 14, 'is_user_tournament': True}, self.dataset_path)
+            self.assertEqual(get_analytics(self.load_predictor())['source_totals']['user'], 4)
+            self.assertEqual(build.call_count, 2)
+
+
+class CriticalValueTableTest(TestCase):
+    def test_table_matches_scipy(self):
+        """Test önceden hesaplanmış tablo ve alışılmadık seviyeler scipy ile aynıdır"""
+        import scipy.stats as stats
+
+        for level in (0.9, 0.95, 0.99, 0.8):
+            table = critical_value_table(level)
+            q = 0.5 + level / 2
+            np.testing.assert_allclose(table['t'], stats.t.ppf(q, df=np.arange(1, T_MAX_SAMPLES)), rtol=1e-12)
+            self.assertAlmostEqual(table['z'], stats.norm.ppf(q), places=12)
+
+        values = lookup_critical_values([1, 2, 30, 31, 1000], critical_value_table(0.95))
+        self.assertTrue(np.isnan(values[0]))
+        self.assertAlmostEqual(values[1], 12.7062, places=4)
+        self.assertAlmostEqual(values[2], 2.0452, places=4)
+        self.assertEqual(values[3], values[4])
+        with self.assertRaises(ValueError):
+            critical_value_table(1.5)
+
+    def test_predictor_import_does_not_load_scipy(self):
+        """Test tahmin modeli scipy yüklenmeden içe aktarılır ve tahmin yapar"""
+        code = (
+            "import sys, numpy as np\n"
+            "from ml.match_predictor import MatchPredictor\n"
+            "MatchPredictor().critical_values(np.array([5, 40]))\n"
+            "print('scipy' in sys.modules)\n"
+        )
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run(
+            [sys.executable, '-c', code], cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), 'False')
+
+
+class QuantileIntervalTest(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.models_dir = os.path.join(self.tmp_dir, 'models')
+        rng = np.random.default_rng(3)
+        self.totals = {4: rng.integers(3, 9, 40).tolist(), 8: rng.integers(7, 20, 11).tolist()}
+        write_dataset(self.dataset_path, [
+            {'n_images': n, 'total_matches': total} for n, totals in self.totals.items() for total in totals
+        ])
+        user = get_user_model().objects.create_user(email='quantile@example.com', password='testpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self, models_dir=None):
+        predictor = MatchPredictor(self.dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'),
+                                   models_dir=models_dir)
+        predictor.load()
+        return predictor
+
+    def test_table_matches_numpy_quantiles(self):
+        """Test vektörel yüzdelikler np.quantile ile aynıdır ve paket formatında korunur"""
+        predictor = self.load_predictor()
+        table = predictor.get_quantile_table()
+        for n, totals in self.totals.items():
+            np.testing.assert_allclose(
+                list(table.get(n).values()), np.quantile(totals, table.levels), atol=1e-4
+            )
+        self.assertEqual(list(table.get(4)), ['p5', 'p10', 'p25', 'p50', 'p75', 'p90', 'p95'])
+        self.assertEqual(table.interval_levels(), [0.5, 0.8, 0.9])
+        self.assertEqual(QuantileTable.from_dict(table.to_dict()).by_n, table.by_n)
+        self.assertIsNone(table.get(16))
+        with self.assertRaises(ValueError):
+            table.interval(4, 0.95)
+
+    def test_level_and_interval_type_are_selectable(self):
+        """Test güven seviyesi ve aralık tipi seçilebilir; yayınlanan paket aynı tabloları servis eder"""
+        predictor = self.load_predictor()
+        default = predictor.predict_matches(8)['prediction']
+        wide = predictor.predict_matches(8, 0.99)['prediction']
+        self.assertEqual(default['confidence_level'], '%95')
+        self.assertLess(wide['confidence_interval'][0], default['confidence_interval'][0])
+
+        spread = predictor.predict_matches(4, 0.8, 'quantile')['prediction']
+        quantiles = spread['quantiles']
+        self.assertEqual(spread['confidence_interval'], (quantiles['p10'], quantiles['p90']))
+        self.assertEqual((spread['interval_type'], spread['distribution']), ('quantile', 'empirical'))
+        self.assertIn('error', predictor.predict_matches(4, 0.85))
+        with self.assertRaises(ValueError):
+            predictor.predict_many([4], interval_type='unknown')
+
+        call_command('train_ml_model', dataset=self.dataset_path, models_dir=self.models_dir,
+                     quantiles='0.025,0.5,0.975', no_warm=True, stdout=StringIO())
+        published = self.load_predictor(self.models_dir)
+        self.assertEqual(published.artifact.quantiles.levels, [0.025, 0.5, 0.975])
+        self.assertEqual(published.get_confidence_levels(), [0.9, 0.95, 0.99])
+        self.assertEqual(
+            published.predict_matches(8, 0.99)['prediction']['confidence_interval'],
+            predictor.predict_matches(8, 0.99)['prediction']['confidence_interval']
+        )
+        self.assertEqual(
+            published.predict_matches(4, 0.95, 'quantile')['prediction']['confidence_interval'],
+            tuple(np.round(np.quantile(self.totals[4], [0.025, 0.975]), 4))
+        )
+        self.assertIn('error', published.predict_matches(4, 0.8, 'quantile'))
+        # Paket p10-p90 sunmuyorsa varsayılan en geniş kapsamdır
+        self.assertEqual(published.resolve_interval_options(interval_type='quantile'), 0.95)
+
+    def test_view_accepts_options_and_caches_per_variant(self):
+        """Test endpoint seviye ve aralık tipini kabul eder; her varyant ayrı önbelleklenir"""
+        predictor = self.load_predictor()
+        url = '/api/ml/predict-matches/'
+        with mock.patch('ml.views.get_predictor', return_value=predictor):
+            default = self.client.post(url, {'n_images': 4}, format='json')
+            spread = self.client.post(url, {'n_images': 4, 'interval': 'quantile', 'confidence_level': 80},
+                                      format='json')
+            self.assertEqual(spread.status_code, 200)
+            self.assertNotEqual(spread.data['prediction'], default.data['prediction'])
+            self.assertEqual(spread.data['prediction']['confidence_level'], '%80')
+            cached = ml_cache.get_cached_prediction(4, model_version=predictor.model_version, variant='quantile:0.8')
+            self.assertEqual(cached['prediction'], spread.data['prediction'])
+
+            # Seviye verilmezse yüzdelik aralığı p10-p90'dır (güven varsayılanı %95 tabloda yok)
+            unleveled = self.client.post(url, {'n_images': 4, 'interval': 'quantile'}, format='json')
+            self.assertEqual(unleveled.status_code, 200)
+            self.assertEqual(unleveled.data['prediction'], spread.data['prediction'])
+
+            for data in ({'n_images': 4, 'interval': 'x'}, {'n_images': 4, 'confidence_level': 'high'},
+                         {'n_images': 4, 'confidence_level': 0.42}):
+                self.assertEqual(self.client.post(url, data, format='json').status_code, 400)
+
+            batch = self.client.post(url + 'batch/', {'n_images': [4, 8], 'confidence_level': 0.9}, format='json')
+            self.assertEqual([p['prediction']['confidence_level'] for p in batch.data['predictions']], ['%90'] * 2)
+
+
+class CategoryShrinkageTest(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.models_dir = os.path.join(self.tmp_dir, 'models')
+        self.records = [{'n_images': 8, 'total_matches': m} for m in (10, 12, 14) * 10] + [
+            {'n_images': 8, 'total_matches': m, 'is_user_tournament': True, 'category': 'art'} for m in (20, 22)
+        ] + [{'n_images': 4, 'total_matches': m} for m in (4, 5, 6)]
+        write_dataset(self.dataset_path, self.records)
+        user = get_user_model().objects.create_user(email='category@example.com', password='testpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(user)[1]}')
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self, models_dir=None):
+        predictor = MatchPredictor(self.dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'),
+                                   models_dir=models_dir)
+        predictor.load()
+        return predictor
+
+    def test_sparse_category_shrinks_toward_global_estimate(self):
+        """Test az verili kategori genel N tahminine büzülür"""
+        model = CategoryModel.from_index(MomentIndex.from_records(self.records))
+        estimate = model.get(8, 'art')
+        # Tek kategori: τ² tahmin edilemez, varsayılan k kullanılır
+        weight = 2 / (2 + DEFAULT_PRIOR_STRENGTH)
+        global_mean = np.mean([r['total_matches'] for r in self.records if r['n_images'] == 8])
+        self.assertAlmostEqual(estimate['weight'], weight)
+        self.assertAlmostEqual(estimate['mean'], weight * 21 + (1 - weight) * global_mean)
+        self.assertEqual(estimate['effective_sample_size'], 2 + DEFAULT_PRIOR_STRENGTH)
+        self.assertIsNone(model.get(4, 'art'))
+        self.assertEqual(CategoryModel.from_dict(model.to_dict()).estimates, model.estimates)
+
+        # Kategoriler arası fark büyük ve veri bol: kategori ortalamasına yaklaşır
+        many = self.records + [
+            {'n_images': 8, 'total_matches': m, 'is_user_tournament': True, 'category': c}
+            for c, values in (('art', (20, 22)), ('food', (8, 9)), ('sports', (12, 13)))
+            for m in values * 20
+        ]
+        estimate = CategoryModel.from_index(MomentIndex.from_records(many)).get(8, 'art')
+        self.assertGreater(estimate['weight'], 0.95)
+        self.assertGreater(estimate['mean'], 20.5)
+
+    def test_predictions_and_endpoint_use_category(self):
+        """Test tahmin ve endpoint kategori tahminini tablodan verir; paket aynı sonucu üretir"""
+        predictor = self.load_predictor()
+        general = predictor.predict_matches(8)['prediction']
+        art = predictor.predict_matches(8, category='art')['prediction']
+        self.assertGreater(art['estimated_matches'], general['estimated_matches'])
+        self.assertLess(art['estimated_matches'], 21)
+        self.assertEqual((art['category'], art['sample_size']), ('art', 2))
+        food = predictor.predict_matches(8, category='food')['prediction']
+        self.assertEqual(food['category_weight'], 0.0)
+        self.assertEqual(food['estimated_matches'], general['estimated_matches'])
+
+        call_command('train_ml_model', dataset=self.dataset_path, models_dir=self.models_dir,
+                     no_warm=True, stdout=StringIO())
+        published = self.load_predictor(self.models_dir)
+        self.assertEqual(published.artifact.summary()['categories'], ['art'])
+        self.assertEqual(published.predict_many([4, 8], category='art'), predictor.predict_many([4, 8], category='art'))
+
+        with mock.patch('ml.views.get_predictor', return_value=published):
+            response = self.client.post('/api/ml/predict-matches/', {'n_images': 8, 'category': 'art'}, format='json')
+            self.assertEqual(response.data['prediction']['estimated_matches'], art['estimated_matches'])
+            response = self.client.post('/api/ml/predict-matches/', {'n_images': 8, 'category': 'x'}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+class ModelArtifactTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.models_dir = os.path.join(self.tmp_dir, 'models')
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        self.curve_path = os.path.join(self.tmp_dir, 'missing.json')
+        self.records = [{'n_images': 4, 'total_matches': m} for m in (4, 5, 5, 6)] + [
+            {'n_images': 8, 'total_matches': m} for m in (12, 13, 14)
+        ] + [{'n_images': 8, 'total_matches': m, 'is_user_tournament': True, 'category': 'art'} for m in (14, 15)]
+        write_dataset(self.dataset_path, self.records)
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def publish(self):
+        call_command('train_ml_model', dataset=self.dataset_path, models_dir=self.models_dir, stdout=StringIO())
+        return get_active_version(self.models_dir)
+
+    def test_predictor_serves_published_artifact(self):
+        """Test yayınlanan paket veriyle aynı tahminleri verir ve yeni veriden etkilenmez"""
+        data_predictor = MatchPredictor(self.dataset_path, curve_path=self.curve_path)
+        data_predictor.load()
+        self.publish()
+
+        predictor = MatchPredictor(self.dataset_path, curve_path=self.curve_path, models_dir=self.models_dir)
+        predictor.load()
+        self.assertIsNotNone(predictor.artifact)
+        for n in (4, 8):
+            self.assertEqual(predictor.predict_matches(n), data_predictor.predict_matches(n))
+        self.assertEqual(predictor.predict_many([4, 8]), data_predictor.predict_many([4, 8]))
+        self.assertEqual(
+            predictor.predict_matches_with_source_analysis(8),
+            data_predictor.predict_matches_with_source_analysis(8)
+        )
+
+        # Paket yeniden derlenene kadar yeni kayıt tahminleri değiştirmez
+        append_record({'n_images': 8, 'total_matches': 20}, self.dataset_path)
+        predictor = MatchPredictor(self.dataset_path, curve_path=self.curve_path, models_dir=self.models_dir)
+        predictor.load()
+        self.assertEqual(predictor.predict_matches(8)['prediction']['sample_size'], 5)
+        status = predictor.get_model_status()
+        self.assertEqual(status['model_type'], 'artifact')
+        self.assertTrue(status['artifact_stale'])
+
+    def test_validation_blocks_drift_and_rollback_is_instant(self):
+        """Test kayan model yayınlanmaz, zorla yayınlanan model geri alınabilir"""
+        first = self.publish()
+        previous = load_active_artifact(self.models_dir)
+
+        write_dataset(self.dataset_path, [{'n_images': 4, 'total_matches': 40}] * 4)
+        drifted = ModelArtifact.build(MomentIndex.from_records([{'n_images': 4, 'total_matches': 40}] * 4))
+        issues = validate_artifact(drifted, previous, max_drift=0.1, min_samples=1)
+        self.assertEqual(len(issues), 3)  # N=8 eksik, kayıt azaldı, N=4 kaydı
+        with self.assertRaises(CommandError):
+            self.publish()
+        self.assertEqual(get_active_version(self.models_dir), first)
+
+        registry = PredictorRegistry(self.dataset_path, reload_interval=0, models_dir=self.models_dir)
+        self.assertEqual(registry.get().artifact.version, first)
+        call_command('train_ml_model', dataset=self.dataset_path, models_dir=self.models_dir,
+                     force=True, stdout=StringIO())
+        second = get_active_version(self.models_dir)
+        self.assertNotEqual(second, first)
+        self.assertTrue(registry.reload())
+        self.assertEqual(registry.get().predict_matches(4)['prediction']['estimated_matches'], 40)
+
+        call_command('train_ml_model', models_dir=self.models_dir, rollback=True, stdout=StringIO())
+        self.assertEqual(get_active_version(self.models_dir), first)
+        self.assertTrue(registry.reload())
+        self.assertEqual(registry.get().artifact.version, first)
+        self.assertEqual(list_artifacts(self.models_dir), sorted([first, second]))
+
+
+class RemainingMatchesTest(APITestCase):
+    def setUp(self):
+        clear_caches()
+        self.user = get_user_model().objects.create_user(email='live@example.com', password='testpassword123')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {AuthToken.objects.create(self.user)[1]}')
+        self.tournament = Tournament.objects.create(user=self.user, name='Live', category='general')
+        for i in range(7):
+            TournamentImage.objects.create(
+                tournament=self.tournament, name=f'Image {i}', original_filename=f'{i}.jpg', order_index=i
+            )
+        ids = list(self.tournament.images.values_list('id', flat=True))
+        # Sabit tercih sırası: kullanıcı her zaman daha düşük sıradaki resmi seçer
+        self.rank = dict(zip(ids, np.random.default_rng(3).permutation(len(ids)).tolist()))
+        self.assertEqual(self.client.post('/api/tournaments/start/').status_code, 200)
+
+    def tearDown(self):
+        clear_caches()
+
+    def play(self, count=None):
+        played = 0
+        while count is None or played < count:
+            self.tournament.refresh_from_db()
+            if self.tournament.is_completed:
+                break
+            match = self.tournament.matches.filter(
+                round_number=self.tournament.current_round
+            ).order_by('match_index')[self.tournament.current_match_index]
+            winner = min((match.image1_id, match.image2_id), key=self.rank.get)
+            response = self.client.post(f'/api/tournaments/submit-result/{match.id}/', {'winner_id': winner})
+            self.assertEqual(response.status_code, 200)
+            played += 1
+        return played
+
+    def test_rollout_follows_live_rules(self):
+        """Test deterministik tercihte rollout canlı turnuvanın kalan maç sayısını tam verir"""
+        self.play(4)
+        self.tournament.refresh_from_db()
+        state = tournament_state(self.tournament)
+        self.assertEqual(state['played_matches'], 4)
+        rank = np.array([self.rank[image_id] for image_id in state['image_ids']])
+        estimate = estimate_remaining(state, simulations=3, winner_fn=lambda rng, t, a, b: rank[a] < rank[b])
+
+        remaining = self.play()
+        self.assertEqual((estimate['min'], estimate['max']), (remaining, remaining))
+
+    def test_endpoint_caches_per_tournament_state(self):
+        """Test tahmin turnuva durumu değişmedikçe yeniden hesaplanmaz"""
+        self.play(2)
+        with mock.patch('ml.views.estimate_remaining', wraps=estimate_remaining) as estimate:
+            first = self.client.get('/api/ml/remaining-matches/')
+            self.assertEqual(first.status_code, 200)
+            self.assertEqual(first.data['played_matches'], 2)
+            self.client.get('/api/ml/remaining-matches/')
+            self.assertEqual(estimate.call_count, 1)
+
+            self.play(1)
+            second = self.client.get('/api/ml/remaining-matches/')
+            self.assertEqual(estimate.call_count, 2)
+        self.assertEqual(second.data['played_matches'], 3)
+        low, high = second.data['remaining']['interval']
+        self.assertLessEqual(second.data['pending_in_round'], low)
+        self.assertLessEqual(low, high)
+
+        self.play()
+        self.assertTrue(self.client.get('/api/ml/remaining-matches/').data['completed'])
+
+
+class OnlineStatsTest(TestCase):
+    def setUp(self):
+        clear_caches()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        write_dataset(self.dataset_path, [{'n_images': n, 'total_matches': m} for n, m in (
+            (4, 4), (4, 5), (4, 6), (8, 10), (8, 12), (8, 14)
+        )])
+
+    def tearDown(self):
+        clear_caches()
+        shutil.rmtree(self.tmp_dir)
+
+    def load_predictor(self):
+        predictor = MatchPredictor(self.dataset_path, curve_path=os.path.join(self.tmp_dir, 'missing.json'))
+        predictor.load()
+        return predictor
+
+    def user_records(self, start_id, values, n_images=4, category='art'):
+        return [
+            {'n_images': n_images, 'total_matches': m, 'tournament_id': start_id + i,
+             'category': category, 'is_user_tournament': True}
+            for i, m in enumerate(values)
+        ]
+
+    def test_running_stats_match_batch_moments(self):
+        """Test Welford akışı ve birleştirme toplu hesapla aynı momentleri verir"""
+        values = np.random.default_rng(0).integers(1, 500, size=1000)
+        left, right = RunningStats(), RunningStats()
+        for value in values[:300]:
+            left.update(int(value))
+        for value in values[300:]:
+            right.update(int(value))
+        merged = left.merge(right)
+
+        self.assertEqual(merged.count, len(values))
+        self.assertAlmostEqual(merged.mean, values.mean())
+        self.assertAlmostEqual(merged.variance, values.var(ddof=1), places=6)
+        self.assertEqual(merged.to_moments(), (len(values), int(values.sum()), int((values ** 2).sum())))
+        self.assertEqual(RunningStats.from_list(merged.to_list()).to_moments(), merged.to_moments())
+
+    def test_completed_records_update_model_and_bump_affected_keys(self):
+        """Test tamamlanan turnuva modeli günceller ve yalnızca ilgili N'nin anahtarları silinir"""
+        predictor = self.load_predictor()
+        version = predictor.model_version
+        for category in (None, 'art'):
+            ml_cache.cache_predictions(predictor.predict_many([4, 8], category=category), category, model_version=version)
+
+        changed = apply_completed_records(self.user_records(1, (9, 11)), predictor)
+        self.assertEqual(changed, [4])
+        prediction = predictor.predict_matches(4)['prediction']
+        self.assertEqual(prediction['sample_size'], 5)
+        self.assertEqual(prediction['estimated_matches'], 7.0)
+        self.assertEqual(predictor.predict_matches(4, category='art')['prediction']['sample_size'], 2)
+
+        self.assertIsNone(ml_cache.get_cached_prediction(4, model_version=version))
+        self.assertIsNone(ml_cache.get_cached_prediction(4, 'art', model_version=version))
+        self.assertIsNotNone(ml_cache.get_cached_prediction(8, model_version=version))
+        self.assertIsNotNone(ml_cache.get_cached_prediction(8, 'art', model_version=version))
+
+        # Tekrar işlenen olay etkisizdir
+        self.assertEqual(apply_completed_records(self.user_records(1, (9, 11)), predictor), [])
+        self.assertEqual(predictor.predict_matches(4)['prediction']['sample_size'], 5)
+
+    def test_other_workers_sync_from_cache(self):
+        """Test diğer süreçlerdeki modeller önbellekteki istatistiklerle aynı tahmini verir"""
+        predictor = self.load_predictor()
+        worker = self.load_predictor()
+        apply_completed_records(self.user_records(1, (9, 11)), predictor)
+        apply_completed_records(self.user_records(3, (20,), n_images=8, category=None), predictor)
+
+        self.assertEqual(sync_online_stats(worker, [4, 8]), [4, 8])
+        self.assertEqual(sync_online_stats(worker, [4, 8]), [])
+        for n_images in (4, 8):
+            for category in (None, 'art'):
+                self.assertEqual(
+                    worker.predict_matches(n_images, category=category),
+                    predictor.predict_matches(n_images, category=category)
+                )
+
+
+class DatasetCleaningTest(TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.dataset_path = os.path.join(self.tmp_dir, 'dataset.json')
+        rng = np.random.default_rng(0)
+        self.records = [
+            {'n_images': 8, 'total_matches': int(m), 'tournament_id': i}
+            for i, m in enumerate(rng.integers(12, 16, size=200))
+        ]
+        self.records += [
+            {'n_images': 8, 'total_matches': 28, 'tournament_id': 1000},   # aykırı
+            {'n_images': 8, 'total_matches': 29, 'tournament_id': 1001},   # N(N-1)/2 üstü
+            {'n_images': 3, 'total_matches': 2, 'tournament_id': 1002},    # N=3 simülasyonu tek maç
+            {'n_images': 1, 'total_matches': 1, 'tournament_id': 1003},
+            {'n_images': 8, 'total_matches': 13, 'tournament_id': 5},      # tekrar
+            {'n_images': 2, 'total_matches': 1, 'tournament_id': None},
+        ]
+        write_dataset(self.dataset_path, self.records)
+        # Kullanıcı turnuvası: id simülasyonla çakışsa da ayrı kaynaktır
+        append_record({'n_images': 3, 'total_matches': 2, 'tournament_id': 5, 'is_user_tournament': True,
+                       'category': 'art', 'user_id': 1}, self.dataset_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_json_array_is_streamed_in_small_reads(self):
+        """Test JSON dizisi küçük okumalarla da json.load ile aynı kayıtları verir"""
+        self.assertEqual(list(iter_json_array(self.dataset_path, read_size=5)), self.records)
+        empty = os.path.join(self.tmp_dir, 'empty.json')
+        write_dataset(empty, [])
+        self.assertEqual(list(iter_json_array(empty)), [])
+
+        seen = SeenIds()
+        self.assertEqual(seen.add(np.array([3, 3, -1, 9])).tolist(), [True, False, True, True])
+        self.assertEqual(seen.add(np.array([9, 4, -1])).tolist(), [False, True, True])
+
+    def test_clean_dataset_matches_batch_rules(self):
+        """Test akışlı temizleme toplu IQR ve değişmez kurallarıyla aynı kayıtları tutar"""
+        report = clean_dataset(self.dataset_path, chunk_size=16)
+        self.assertEqual(report['input'], len(self.records) + 1)
+        self.assertEqual(report['duplicates'], 1)
+        self.assertEqual(report['invariants'], {
+            'n_images': 1, 'min_matches': 0, 'max_matches': 1, 'exact_matches': 1
+        })
+        self.assertEqual(report['outliers'], 1)
+
+        n8 = np.array([r['total_matches'] for r in self.records[:200]] + [28])
+        q1, q3 = np.quantile(n8, [0.25, 0.75])
+        self.assertEqual(report['by_n'][8]['bounds'], [round(q1 - 1.5 * (q3 - q1), 2), round(q3 + 1.5 * (q3 - q1), 2)])
+
+        predictor = MatchPredictor(report['output'])
+        predictor.load()
+        self.assertEqual(len(predictor.columns), report['kept'])
+        self.assertEqual(report['kept'], 202)
+        self.assertEqual(predictor.get_index().get(8), (
+            200, sum(r['total_matches'] for r in self.records[:200]),
+            sum(r['total_matches'] ** 2 for r in self.records[:200])
+        ))
+        self.assertEqual(predictor.get_index().count(3, source='user'), 1)
+        self.assertEqual(predictor.columns.meta['cleaning']['kept'], 202)
+
+        call_command('train_ml_model', dataset=self.dataset_path, models_dir=os.path.join(self.tmp_dir, 'models'),
+                     clean=True, dry_run=True, stdout=StringIO())
+
+    def test_append_during_cleaning_is_not_included(self):
+        """Test iki geçiş arasında günlüğe eklenen kayıt temizlemeyi bozmaz ve sonraki temizliğe kalır"""
+        from . import cleaning
+
+        compute_bounds = cleaning.compute_bounds
+
+        def append_between_passes(*args, **kwargs):
+            result = compute_bounds(*args, **kwargs)
+            append_record({'n_images': 8, 'total_matches': 13, 'tournament_id': 2000}, self.dataset_path)
+            return result
+
+        with mock.patch('ml.cleaning.compute_bounds', side_effect=append_between_passes):
+            report = clean_dataset(self.dataset_path, chunk_size=16)
+        self.assertEqual(report['input'], len(self.records) + 1)
+        self.assertEqual(report['kept'], 202)
+        self.assertEqual(clean_dataset(self.dataset_path)['kept'], 203)
+
+    def test_failed_cleaning_leaves_no_generation(self):
+        """Test geçişler uyuşmazsa hata verilir ve yarım nesil dosyaları silinir"""
+        passes = []
+
+        def source():
+            passes.append(1)
+            return iter(self.records[:len(passes) + 10])
+
+        output = os.path.join(self.tmp_dir, 'out.json')
+        with self.assertRaises(ValueError):
+            clean_dataset(self.dataset_path, output, source=source)
+        self.assertEqual(os.listdir(os.path.join(self.tmp_dir, 'out.columns')), [])
+
@@ -4,16 +4,19 @@ ML Module URLs
 
 from django.urls import path
 from .views import (
-    CategoriesView, PredictMatchesView, PredictMatchesWithSourceView,
-    ModelStatusView, DatasetInfoView,
+    CategoriesView, PredictMatchesView, BatchPredictMatchesView, PredictMatchesWithSourceView,
+    RemainingMatchesView, ModelStatusView, DatasetInfoView,
     UserTournamentStatsView, DatasetComparisonView, ModelAccuracyView
 )
 
 urlpatterns = [
     path('categories/', CategoriesView.as_view(), name='ml-categories'),
     path('predict-matches/', PredictMatchesView.as_view(), name='ml-predict-matches'),
+    path('predict-matches/batch/', BatchPredictMatchesView.as_view(), name='ml-predict-matches-batch'),
     path('predict-matches-with-source/', PredictMatchesWithSourceView.as_view(), name='ml-predict-matches-with-source'),
 
+    path('remaining-matches/', RemainingMatchesView.as_view(), name='ml-remaining-matches'),
+
     path('model-status/', ModelStatusView.as_view(), name='ml-model-status'),
     path('dataset-info/', DatasetInfoView.as_view(), name='ml-dataset-info'),
     
@@ -12,15 +12,49 @@ from tournaments.models import Tournament, CATEGORY_CHOICES
 from tournaments.serializers import (
     CategorySerializer, MatchPredictionSerializer
 )
-from .match_predictor import MatchPredictor
+from .registry import get_predictor
+from .analytics import dataset_comparison, dataset_info, get_analytics, user_tournament_stats
+from .evaluation import EVALUATION_MODES, evaluate_accuracy
+from .live_estimate import estimate_remaining, tournament_state
+from .online_stats import sync_online_stats
+from .warmup import prediction_variant
 import os
 import json
+import time
 
 # Performance monitoring ve cache imports
 from core.monitoring import monitor_performance, monitor_api_performance
 from core.cache import ml_cache, cache_result, invalidate_cache_pattern
+from core.metrics import observe_ml_prediction
 from core.monitoring import log_user_action, log_error
 
+CATEGORY_VALUES = {choice[0] for choice in CATEGORY_CHOICES}
+
+def parse_category(data):
+    """İstekteki kategoriyi doğrula (boş veya yoksa None: genel tahmin)"""
+    category = data.get('category') or None
+    if category is not None and category not in CATEGORY_VALUES:
+        raise ValueError(f"Geçersiz kategori: {category}")
+    return category
+
+def parse_interval_options(data, predictor):
+    """
+    İstekteki güven seviyesini ve aralık tipini doğrula
+    
+    Returns:
+        Tuple: (seviye, aralık tipi, önbellek varyantı; varsayılan istek için None)
+    """
+    confidence_level = data.get('confidence_level')
+    interval_type = data.get('interval', 'confidence')
+    if confidence_level is not None:
+        if isinstance(confidence_level, bool) or not isinstance(confidence_level, (int, float)):
+            raise ValueError("confidence_level sayı olmalı (ör. 0.9 veya 90)")
+        # Yüzde olarak da verilebilir
+        if confidence_level > 1:
+            confidence_level = confidence_level / 100
+    confidence_level = predictor.resolve_interval_options(confidence_level, interval_type)
+    return confidence_level, interval_type, prediction_variant(predictor, confidence_level, interval_type)
+
 class CategoriesView(APIView):
     """Kategori listesi endpoint'i"""
     permission_classes = [IsAuthenticated]
@@ -38,6 +72,7 @@ class PredictMatchesView(APIView):
     permission_classes = [IsAuthenticated]
     
     def post(self, request):
+        start = time.perf_counter()
         try:
             n_images = request.data.get('n_images')
             category = request.data.get('category')
@@ -48,20 +83,30 @@ class PredictMatchesView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Try to get from cache first
-            cached_prediction = ml_cache.get_cached_prediction(n_images, category)
+            # Süreç genelindeki güven aralığı tahmin modelini kullan
+            predictor = get_predictor()
+            try:
+                category = parse_category(request.data)
+                confidence_level, interval_type, variant = parse_interval_options(request.data, predictor)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Önce modelin versiyonundaki tahmin tablosuna bak (yayın/ısıtma ile dolar)
+            cached_prediction = ml_cache.get_cached_prediction(
+                n_images, category, model_version=predictor.model_version, variant=variant
+            )
             if cached_prediction:
+                observe_ml_prediction('single', True, time.perf_counter() - start)
                 log_user_action(request.user.id, 'ml_prediction_cache_hit', {
                     'n_images': n_images,
                     'category': category
                 })
                 return Response(cached_prediction)
             
-            # Güven aralığı tahmin modelini kullan
-            predictor = MatchPredictor()
-            
-            # Tahmin yap
-            prediction = predictor.predict_matches(n_images)
+            # Diğer süreçlerde tamamlanan turnuvaları modele uygula, sonra tahmin yap
+            sync_online_stats(predictor, [n_images])
+            prediction = predictor.predict_matches(n_images, confidence_level, interval_type, category)
+            observe_ml_prediction('single', False, time.perf_counter() - start)
             
             if 'error' in prediction:
                 return Response(
@@ -70,7 +115,9 @@ class PredictMatchesView(APIView):
                 )
             
             # Cache the prediction
-            ml_cache.cache_prediction(n_images, prediction, category)
+            ml_cache.cache_prediction(
+                n_images, prediction, category, model_version=predictor.model_version, variant=variant
+            )
             
             # Log user action
             log_user_action(request.user.id, 'ml_prediction', {
@@ -94,6 +141,91 @@ class PredictMatchesView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class BatchPredictMatchesView(APIView):
+    """Birden çok resim sayısı için toplu tahmin endpoint'i"""
+    permission_classes = [IsAuthenticated]
+    MAX_BATCH_SIZE = 512
+    
+    def post(self, request):
+        start = time.perf_counter()
+        try:
+            predictor = get_predictor()
+            try:
+                category = parse_category(request.data)
+                n_values = self._parse_n_values(request.data)
+                confidence_level, interval_type, variant = parse_interval_options(request.data, predictor)
+            except ValueError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            
+            # Önbellekteki tahminleri tek seferde getir
+            predictions = ml_cache.get_cached_predictions(
+                n_values, category, model_version=predictor.model_version, variant=variant
+            )
+            cache_hits = len(predictions)
+            misses = [n for n in n_values if n not in predictions]
+            
+            # Eksikleri tek geçişte hesapla
+            errors = []
+            if misses:
+                sync_online_stats(predictor, misses)
+                computed = predictor.predict_many(misses, confidence_level, interval_type, category)
+                for n_images, prediction in computed.items():
+                    if 'error' in prediction:
+                        errors.append({'n_images': n_images, 'error': prediction['error']})
+                computed = {n: p for n, p in computed.items() if 'error' not in p}
+                ml_cache.cache_predictions(computed, category, model_version=predictor.model_version, variant=variant)
+                predictions.update(computed)
+            observe_ml_prediction('batch', not misses, time.perf_counter() - start)
+            
+            log_user_action(request.user.id, 'ml_batch_prediction', {
+                'count': len(n_values),
+                'cache_hits': cache_hits,
+                'category': category
+            })
+            
+            return Response({
+                'category': category,
+                'predictions': [
+                    MatchPredictionSerializer(predictions[n]).data for n in n_values if n in predictions
+                ],
+                'errors': errors,
+                'cache_hits': cache_hits
+            })
+            
+        except Exception as e:
+            log_error(e, {
+                'user_id': request.user.id,
+                'action': 'ml_batch_prediction'
+            })
+            return Response(
+                {"error": f"Tahmin hatası: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+    
+    def _parse_n_values(self, data):
+        """n_images listesini veya n_min/n_max aralığını sıralı, tekrarsız listeye çevir"""
+        invalid = "n_images listesi veya n_min/n_max aralığı gerekli (minimum 2)"
+        too_many = f"En fazla {self.MAX_BATCH_SIZE} resim sayısı istenebilir"
+        
+        n_images = data.get('n_images')
+        if n_images is not None:
+            if not isinstance(n_images, list) or not n_images:
+                raise ValueError(invalid)
+            if len(n_images) > self.MAX_BATCH_SIZE:
+                raise ValueError(too_many)
+            values = n_images
+        else:
+            n_min, n_max = data.get('n_min'), data.get('n_max')
+            if not isinstance(n_min, int) or not isinstance(n_max, int) or n_max < n_min:
+                raise ValueError(invalid)
+            if n_max - n_min >= self.MAX_BATCH_SIZE:
+                raise ValueError(too_many)
+            values = range(n_min, n_max + 1)
+        
+        if any(not isinstance(n, int) or isinstance(n, bool) or n < 2 for n in values):
+            raise ValueError(invalid)
+        return sorted(set(values))
+
 class PredictMatchesWithSourceView(APIView):
     """Eşleşme sayısı tahmini endpoint'i - Kaynak analizi ile"""
     permission_classes = [IsAuthenticated]
@@ -108,8 +240,8 @@ class PredictMatchesWithSourceView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Güven aralığı tahmin modelini kullan
-            predictor = MatchPredictor()
+            # Süreç genelindeki güven aralığı tahmin modelini kullan
+            predictor = get_predictor()
             
             # Kaynak analizi ile tahmin yap
             prediction = predictor.predict_matches_with_source_analysis(n_images)
@@ -130,21 +262,75 @@ class PredictMatchesWithSourceView(APIView):
 
 
 
+class RemainingMatchesView(APIView):
+    """Devam eden turnuva için kalan maç sayısı tahmini (canlı durumdan rollout)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        tournament = get_object_or_404(Tournament, user=request.user, is_active=True)
+        
+        if tournament.is_completed:
+            return Response({
+                'tournament_id': tournament.id,
+                'completed': True,
+                'remaining': None,
+                'message': 'Turnuva tamamlandı'
+            })
+        if not tournament.matches.exists():
+            return Response(
+                {"error": "Turnuva henüz başlamadı."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            # Her maç sonucu turnuvayı kaydeder (updated_at); durum değişmedikçe tahmin önbellekten gelir
+            tournament_version = (
+                f"{tournament.updated_at.timestamp()}:{tournament.current_round}:{tournament.current_match_index}"
+            )
+            result = ml_cache.get_cached_remaining_matches(tournament.id, tournament_version)
+            if result is None:
+                state = tournament_state(tournament)
+                remaining = estimate_remaining(state, seed=[tournament.id, state['played_matches']])
+                result = {
+                    'tournament_id': tournament.id,
+                    'completed': False,
+                    'played_matches': state['played_matches'],
+                    'pending_in_round': len(state['pending']),
+                    'remaining': remaining,
+                    'estimated_total_matches': round(state['played_matches'] + remaining['estimated_matches'], 2),
+                    'message': (
+                        f"Yaklaşık {remaining['estimated_matches']} maç kaldı "
+                        f"({remaining['confidence_level']} aralık: {remaining['interval'][0]}-{remaining['interval'][1]})"
+                    )
+                }
+                ml_cache.cache_remaining_matches(tournament.id, tournament_version, result)
+            
+            return Response(result)
+            
+        except Exception as e:
+            log_error(e, {'user_id': request.user.id, 'action': 'remaining_matches'})
+            return Response(
+                {"error": f"Kalan maç tahmini hatası: {str(e)}"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
 class ModelStatusView(APIView):
     """ML model durumu endpoint'i"""
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         try:
-            # Try to get from cache first
-            cache_key = ml_cache.get_model_status_key()
+            predictor = get_predictor()
+            
+            # Anahtar model ve veri seti versiyonuna bağlı; yayın/geri alma sonrası eski durum dönmez
+            cache_key = ml_cache.get_model_status_key(
+                f"{predictor.artifact_version}:{predictor.dataset_version}"
+            )
             cached_status = ml_cache.cache_manager.get(cache_key)
             
             if cached_status:
                 return Response(cached_status)
             
-            # If not in cache, get model status and cache it
-            predictor = MatchPredictor()
             model_status = predictor.get_model_status()
             
             # Cache the status for 1 hour
@@ -157,31 +343,6 @@ class ModelStatusView(APIView):
                 {"error": f"Model durumu hatası: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-        try:
-            predictor = MatchPredictor()
-            
-            # Veri seti özeti
-            summary = predictor.get_dataset_summary()
-            
-            # Mevcut resim sayıları
-            available_n_values = predictor.get_available_n_values()
-            
-            result = {
-                'model_type': 'confidence_interval',
-                'status': 'ready',
-                'dataset_summary': summary,
-                'available_n_values': available_n_values,
-                'confidence_level': '95%',
-                'message': 'Güven aralığı tabanlı tahmin modeli hazır'
-            }
-            
-            return Response(result)
-            
-        except Exception as e:
-            return Response(
-                {"error": f"Model durumu hatası: {str(e)}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
 
 class DatasetInfoView(APIView):
     """Veri seti bilgileri endpoint'i"""
@@ -189,24 +350,8 @@ class DatasetInfoView(APIView):
     
     def get(self, request):
         try:
-            predictor = MatchPredictor()
-            
-            # Veri seti özeti
-            summary = predictor.get_dataset_summary()
-            
-            # Her N değeri için örnek sayısı
-            n_counts = {}
-            for n in summary['available_n_values']:
-                matches_data = predictor.get_matches_for_n_images(n)
-                n_counts[n] = len(matches_data)
-            
-            result = {
-                'dataset_info': summary,
-                'sample_counts': n_counts,
-                'total_samples': sum(n_counts.values())
-            }
-            
-            return Response(result)
+            analytics = get_analytics(get_predictor())
+            return Response(dataset_info(analytics))
             
         except Exception as e:
             return Response(
@@ -220,69 +365,8 @@ class UserTournamentStatsView(APIView):
     
     def get(self, request):
         try:
-            predictor = MatchPredictor()
-            
-            # Veri setini yükle
-            dataset = predictor.load_dataset()
-            
-            # Kullanıcı turnuvalarını filtrele
-            user_tournaments = [
-                record for record in dataset 
-                if record.get('is_user_tournament', False)
-            ]
-            
-            # Genel istatistikler
-            total_user_tournaments = len(user_tournaments)
-            total_simulated_tournaments = len(dataset) - total_user_tournaments
-            
-            # Kategori bazlı istatistikler
-            category_stats = {}
-            for record in user_tournaments:
-                category = record.get('category', 'general')
-                if category not in category_stats:
-                    category_stats[category] = {
-                        'count': 0,
-                        'total_matches': 0,
-                        'avg_matches': 0
-                    }
-                category_stats[category]['count'] += 1
-                category_stats[category]['total_matches'] += record.get('total_matches', 0)
-            
-            # Ortalama maç sayılarını hesapla
-            for category in category_stats:
-                count = category_stats[category]['count']
-                total = category_stats[category]['total_matches']
-                category_stats[category]['avg_matches'] = total / count if count > 0 else 0
-            
-            # Resim sayısı bazlı istatistikler
-            n_stats = {}
-            for record in user_tournaments:
-                n = record.get('n_images', 0)
-                if n not in n_stats:
-                    n_stats[n] = {
-                        'count': 0,
-                        'total_matches': 0,
-                        'avg_matches': 0
-                    }
-                n_stats[n]['count'] += 1
-                n_stats[n]['total_matches'] += record.get('total_matches', 0)
-            
-            # Ortalama maç sayılarını hesapla
-            for n in n_stats:
-                count = n_stats[n]['count']
-                total = n_stats[n]['total_matches']
-                n_stats[n]['avg_matches'] = total / count if count > 0 else 0
-            
-            result = {
-                'total_user_tournaments': total_user_tournaments,
-                'total_simulated_tournaments': total_simulated_tournaments,
-                'total_tournaments': len(dataset),
-                'category_statistics': category_stats,
-                'n_statistics': n_stats,
-                'message': f'{total_user_tournaments} kullanıcı turnuvası analiz edildi'
-            }
-            
-            return Response(result)
+            analytics = get_analytics(get_predictor())
+            return Response(user_tournament_stats(analytics))
             
         except Exception as e:
             return Response(
@@ -296,56 +380,8 @@ class DatasetComparisonView(APIView):
     
     def get(self, request):
         try:
-            predictor = MatchPredictor()
-            
-            # Veri setini yükle
-            dataset = predictor.load_dataset()
-            
-            # Verileri ayır
-            simulated_data = [
-                record for record in dataset 
-                if not record.get('is_user_tournament', False)
-            ]
-            
-            user_data = [
-                record for record in dataset 
-                if record.get('is_user_tournament', False)
-            ]
-            
-            # Karşılaştırma analizi
-            comparison = {}
-            
-            # Her N değeri için karşılaştırma
-            all_n_values = set()
-            for record in dataset:
-                all_n_values.add(record.get('n_images', 0))
-            
-            for n in sorted(all_n_values):
-                simulated_n = [r for r in simulated_data if r.get('n_images') == n]
-                user_n = [r for r in user_data if r.get('n_images') == n]
-                
-                if simulated_n and user_n:
-                    sim_avg = sum(r.get('total_matches', 0) for r in simulated_n) / len(simulated_n)
-                    user_avg = sum(r.get('total_matches', 0) for r in user_n) / len(user_n)
-                    
-                    comparison[n] = {
-                        'simulated_avg': round(sim_avg, 2),
-                        'user_avg': round(user_avg, 2),
-                        'difference': round(abs(sim_avg - user_avg), 2),
-                        'simulated_count': len(simulated_n),
-                        'user_count': len(user_n)
-                    }
-            
-            result = {
-                'comparison': comparison,
-                'summary': {
-                    'total_simulated': len(simulated_data),
-                    'total_user': len(user_data),
-                    'overlapping_n_values': len(comparison)
-                }
-            }
-            
-            return Response(result)
+            analytics = get_analytics(get_predictor())
+            return Response(dataset_comparison(analytics))
             
         except Exception as e:
             return Response(
@@ -354,66 +390,49 @@ class DatasetComparisonView(APIView):
             )
 
 class ModelAccuracyView(APIView):
-    """Model doğruluğu analizi (kullanıcı verileri vs tahminler)"""
+    """
+    Model doğruluğu analizi (kullanıcı verileri vs tahminler)
+    
+    Query parametreleri:
+        mode: in_sample (varsayılan), holdout veya time_split
+        test_fraction: time_split için test oranı (varsayılan 0.2)
+        details: false ise kayıt bazlı sonuçlar döndürülmez
+    """
     permission_classes = [IsAuthenticated]
     
     def get(self, request):
         try:
-            predictor = MatchPredictor()
-            
-            # Veri setini yükle
-            dataset = predictor.load_dataset()
-            
-            # Kullanıcı turnuvalarını filtrele
-            user_tournaments = [
-                record for record in dataset 
-                if record.get('is_user_tournament', False)
-            ]
-            
-            accuracy_data = []
-            total_error = 0
-            total_predictions = 0
-            
-            for record in user_tournaments:
-                n_images = record.get('n_images', 0)
-                actual_matches = record.get('total_matches', 0)
-                
-                if n_images >= 2:
-                    # Tahmin yap
-                    prediction = predictor.predict_matches(n_images)
-                    
-                    if 'prediction' in prediction and prediction['prediction']:
-                        predicted_matches = prediction['prediction'].get('estimated_matches', 0)
-                        
-                        # Hata hesapla
-                        error = abs(predicted_matches - actual_matches)
-                        percentage_error = (error / actual_matches * 100) if actual_matches > 0 else 0
-                        
-                        accuracy_data.append({
-                            'n_images': n_images,
-                            'actual_matches': actual_matches,
-                            'predicted_matches': round(predicted_matches, 2),
-                            'error': round(error, 2),
-                            'percentage_error': round(percentage_error, 2),
-                            'tournament_id': record.get('tournament_id')
-                        })
-                        
-                        total_error += error
-                        total_predictions += 1
-            
-            # Genel doğruluk istatistikleri
-            avg_error = total_error / total_predictions if total_predictions > 0 else 0
-            avg_percentage_error = sum(r['percentage_error'] for r in accuracy_data) / len(accuracy_data) if accuracy_data else 0
-            
-            result = {
-                'accuracy_data': accuracy_data,
-                'summary': {
-                    'total_predictions': total_predictions,
-                    'average_error': round(avg_error, 2),
-                    'average_percentage_error': round(avg_percentage_error, 2),
-                    'accuracy_score': round(max(0, 100 - avg_percentage_error), 2)
-                }
-            }
+            mode = request.query_params.get('mode', 'in_sample')
+            details = request.query_params.get('details', 'true').lower() != 'false'
+            try:
+                test_fraction = float(request.query_params.get('test_fraction', 0.2))
+            except ValueError:
+                return Response(
+                    {"error": "test_fraction sayı olmalı"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if mode not in EVALUATION_MODES:
+                return Response(
+                    {"error": f"mode şunlardan biri olmalı: {', '.join(EVALUATION_MODES)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if mode == 'time_split' and not 0 < test_fraction < 1:
+                return Response(
+                    {"error": "test_fraction 0 ile 1 arasında olmalı"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            predictor = get_predictor()
+            
+            # Sonuç veri seti ve eğri versiyonuna bağlı; değişmedikçe yeniden hesaplanmaz
+            model_version = f"{predictor.dataset_version}:{predictor.curve_version}"
+            params = {'mode': mode, 'details': details}
+            if mode == 'time_split':
+                params['test_fraction'] = test_fraction
+            result = ml_cache.get_cached_accuracy(model_version, **params)
+            if result is None:
+                result = evaluate_accuracy(predictor, mode, test_fraction, include_records=details)
+                ml_cache.cache_accuracy(model_version, result, **params)
             
             return Response(result)
             
@@ -421,4 +440,4 @@ class ModelAccuracyView(APIView):
             return Response(
                 {"error": f"Doğruluk analizi hatası: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            ) 
\ No newline at end of file
+            ) 
@@ -0,0 +1,104 @@
+"""
+Tahmin Önbelleği Isıtma
+Bu modül, servis edilen modelin desteklediği her N ve kategori için tahminleri
+önceden hesaplayıp `ml_predictions` önbelleğine yazar. Anahtarlar model
+versiyonunu içerir; yeni bir paket yayınlandığında istekler yeni versiyonun
+tablosuna geçer, eski tablo süresi dolunca kendiliğinden silinir.
+"""
+
+import logging
+import time
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from core.cache import ml_cache
+from tournaments.models import CATEGORY_CHOICES
+
+from .match_predictor import MatchPredictor
+
+logger = logging.getLogger('ml')
+
+
+def supported_n_values(predictor: MatchPredictor, max_n: Optional[int] = None) -> List[int]:
+    """
+    Tahmin tablosunun N değerleri: 2'den veride veya eğri aralığında bulunan en büyük N'ye
+
+    Args:
+        predictor: Yüklü tahmin modeli
+        max_n: Üst sınır (varsayılan: ML_PREDICTOR['WARM_MAX_N'])
+
+    Returns:
+        List[int]: N değerleri
+    """
+    if max_n is None:
+        max_n = getattr(settings, 'ML_PREDICTOR', {}).get('WARM_MAX_N', 256)
+    n_values = predictor.get_model_index().n_values()
+    upper = max(n_values) if n_values else 0
+    curve = predictor.get_curve()
+    if curve is not None:
+        upper = max(upper, curve.n_max)
+    return list(range(2, min(upper, max_n) + 1))
+
+
+def prediction_categories() -> List[Optional[str]]:
+    """Isıtılan kategoriler (None: kategorisiz istek)"""
+    return [None] + [value for value, _ in CATEGORY_CHOICES]
+
+
+def prediction_variant(predictor: MatchPredictor, confidence_level: float,
+                       interval_type: str = 'confidence') -> Optional[str]:
+    """Önbellek anahtarındaki aralık varyantı (varsayılan güven aralığı için None)"""
+    if interval_type == 'confidence' and confidence_level == predictor.confidence_level:
+        return None
+    return f"{interval_type}:{confidence_level:g}"
+
+
+def prediction_variants(predictor: MatchPredictor) -> List[Optional[str]]:
+    """Modelin sunabildiği tüm aralık varyantları (güven seviyeleri ve yüzdelik aralıkları)"""
+    variants = [prediction_variant(predictor, level) for level in predictor.get_confidence_levels()]
+    variants += [
+        prediction_variant(predictor, level, 'quantile')
+        for level in predictor.get_quantile_table().interval_levels()
+    ]
+    return list(dict.fromkeys([None] + variants))
+
+
+def warm_prediction_cache(predictor: MatchPredictor, n_values: Optional[Iterable[int]] = None,
+                          categories: Optional[Iterable[Optional[str]]] = None) -> Dict:
+    """
+    Tüm tahmin tablosunu model versiyonu altında önbelleğe yaz
+
+    Args:
+        predictor: Yüklü tahmin modeli
+        n_values: Isıtılacak N'ler (varsayılan: supported_n_values)
+        categories: Isıtılacak kategoriler (varsayılan: prediction_categories)
+
+    Returns:
+        Dict: 'model_version', 'n_values', 'categories', 'keys', 'duration'
+    """
+    start = time.time()
+    n_values = list(n_values) if n_values is not None else supported_n_values(predictor)
+    categories = list(categories) if categories is not None else prediction_categories()
+    model_version = predictor.model_version
+
+    keys = 0
+    for category in categories:
+        # Kategori tahminleri (N, kategori) tablosundan okunur; veri yoksa genel tahmin
+        predictions = {
+            n_images: prediction
+            for n_images, prediction in predictor.predict_many(n_values, category=category).items()
+            if 'error' not in prediction
+        }
+        ml_cache.cache_predictions(predictions, category, model_version=model_version)
+        keys += len(predictions)
+
+    result = {
+        'model_version': model_version,
+        'n_values': keys // len(categories) if categories else 0,
+        'categories': len(categories),
+        'keys': keys,
+        'duration': round(time.time() - start, 3),
+    }
+    logger.info(f"Tahmin önbelleği ısıtıldı: {result}")
+    return result
@@ -0,0 +1,171 @@
+"""
+Kazanan Modelleri
+Bu modül, vektörel simülatörün maç kazananını seçme biçimini tanımlar. Her
+model tek bir parametreyle ifade edilir; parametre kullanıcı turnuvalarının
+N bazındaki ortalama maç sayılarına simülasyonla uydurulabilir.
+
+    uniform           Her maç yazı-tura (random.choice ile aynı)
+    bradley_terry     Her turnuva için resim güçleri s ~ N(0, strength_std²);
+                      P(a, b'yi yener) = 1 / (1 + exp(s_b - s_a))
+    noisy_transitive  Her turnuva için gizli bir tercih sırası; tercih edilen
+                      resim 1 - noise olasılıkla kazanır
+
+Modeller turnuva başına durumu (güçler, sıralar) `start` ile örnekler ve
+fast_simulator.WinnerFn döndürür.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .fast_simulator import WinnerFn, uniform_winner
+
+
+class WinnerModel:
+    """Kazanan modeli tabanı"""
+
+    name: str = None
+    param_name: Optional[str] = None
+    default_value: Optional[float] = None
+    # Uydurma için varsayılan parametre ızgarası
+    default_grid: Tuple[float, ...] = ()
+
+    def __init__(self, value: Optional[float] = None):
+        self.value = self.default_value if value is None else float(value)
+
+    def params(self) -> Dict:
+        """Kayıtlara yazılan model tanımı"""
+        params = {'name': self.name}
+        if self.param_name is not None:
+            params[self.param_name] = self.value
+        return params
+
+    def start(self, rng: np.random.Generator, n_tournaments: int, n_images: int) -> WinnerFn:
+        """
+        Bir turnuva grubu için modeli başlat
+
+        Args:
+            rng: Rastgele sayı üreteci
+            n_tournaments: Turnuva sayısı
+            n_images: Resim sayısı
+
+        Returns:
+            WinnerFn: (rng, t, a, b) -> a'nın kazandığı maçlar
+        """
+        raise NotImplementedError
+
+
+class UniformWinner(WinnerModel):
+    name = 'uniform'
+
+    def start(self, rng, n_tournaments, n_images):
+        return uniform_winner
+
+
+class BradleyTerryWinner(WinnerModel):
+    name = 'bradley_terry'
+    param_name = 'strength_std'
+    default_value = 1.0
+    default_grid = (0.0, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0)
+
+    def start(self, rng, n_tournaments, n_images):
+        strengths = rng.normal(0.0, self.value, size=(n_tournaments, n_images))
+
+        def winner(rng, t, a, b):
+            p_a = 1.0 / (1.0 + np.exp(strengths[t, b] - strengths[t, a]))
+            return rng.random(len(a)) < p_a
+        return winner
+
+
+class NoisyTransitiveWinner(WinnerModel):
+    name = 'noisy_transitive'
+    param_name = 'noise'
+    default_value = 0.1
+    default_grid = (0.0, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5)
+
+    def start(self, rng, n_tournaments, n_images):
+        utility = rng.random((n_tournaments, n_images))
+
+        def winner(rng, t, a, b):
+            preferred = utility[t, a] > utility[t, b]
+            return preferred ^ (rng.random(len(a)) < self.value)
+        return winner
+
+
+WINNER_MODELS = {model.name: model for model in (UniformWinner, BradleyTerryWinner, NoisyTransitiveWinner)}
+
+
+def get_winner_model(name: str, value: Optional[float] = None) -> WinnerModel:
+    """
+    Adı ve parametresiyle kazanan modeli oluştur
+
+    Args:
+        name: Model adı (WINNER_MODELS)
+        value: Model parametresi (varsayılan: modelin varsayılanı)
+
+    Returns:
+        WinnerModel: Model
+    """
+    if name not in WINNER_MODELS:
+        raise ValueError(f"Bilinmeyen kazanan modeli: {name} ({', '.join(WINNER_MODELS)})")
+    return WINNER_MODELS[name](value)
+
+
+def winner_model_from_params(params: Dict) -> WinnerModel:
+    """Kayıttaki model tanımından modeli geri oluştur"""
+    model_cls = WINNER_MODELS[params['name']]
+    return model_cls(params.get(model_cls.param_name) if model_cls.param_name else None)
+
+
+def user_match_moments(index) -> Dict[int, Tuple[int, float]]:
+    """İndeksteki kullanıcı turnuvalarından N -> (örnek sayısı, ortalama maç)"""
+    moments = {}
+    for n in index.n_values():
+        count, total, _ = index.get(n, source='user')
+        if count and n >= 2:
+            moments[n] = (count, total / count)
+    return moments
+
+
+def fit_winner_model(name: str, user_moments: Dict[int, Tuple[int, float]],
+                     grid: Optional[Iterable[float]] = None, simulations_per_n: int = 200,
+                     seed: int = 0) -> Tuple[WinnerModel, List[Dict]]:
+    """
+    Model parametresini kullanıcı turnuvalarına simülasyonla uydur
+
+    Her ızgara değeri için kullanıcı verisindeki N'ler simüle edilir; göreli
+    ortalama hatasının örnek sayısıyla ağırlıklı karesi en küçük olan değer
+    seçilir. Tüm adaylar aynı rastgele akışları kullanır (ortak rastgele sayılar).
+
+    Args:
+        name: Model adı
+        user_moments: N -> (kullanıcı örnek sayısı, ortalama maç sayısı)
+        grid: Denenecek parametre değerleri (varsayılan: modelin ızgarası)
+        simulations_per_n: Aday ve N başına simülasyon sayısı
+        seed: Simülasyon tohumu
+
+    Returns:
+        Tuple: (en iyi model, her aday için {'value', 'loss'} listesi)
+    """
+    from .fast_simulator import VectorizedTournamentSimulator
+
+    if not user_moments:
+        raise ValueError("Uydurma için kullanıcı turnuvası verisi yok")
+    model_cls = WINNER_MODELS[name]
+    candidates = list(grid if grid is not None else model_cls.default_grid) or [None]
+
+    weights = np.array([count for count, _ in user_moments.values()], dtype=np.float64)
+    targets = np.array([mean for _, mean in user_moments.values()], dtype=np.float64)
+    results = []
+    for value in candidates:
+        model = model_cls(value)
+        simulator = VectorizedTournamentSimulator(winner_model=model, batch_size=simulations_per_n)
+        means = np.array([
+            simulator.simulate_batch(n, simulations_per_n, np.random.default_rng([seed, n]))['total_matches'].mean()
+            for n in user_moments
+        ])
+        loss = float(np.sum(weights * ((means - targets) / np.maximum(targets, 1.0)) ** 2) / weights.sum())
+        results.append({'value': model.value, 'loss': loss})
+
+    best = min(results, key=lambda result: result['loss'])
+    return model_cls(best['value']), results
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+
+
+def populate_image_seq(apps, schema_editor):
+    # Eski silmeler order_index'te boşluk bırakmış olabilir: resimleri 0..n-1 olarak
+    # yeniden numarala ve sayacı n yap (sayaç kullanımdaki bir index'i vermez)
+    Tournament = apps.get_model('tournaments', 'Tournament')
+    TournamentImage = apps.get_model('tournaments', 'TournamentImage')
+    for tournament in Tournament.objects.only('pk').iterator():
+        images = list(
+            TournamentImage.objects.filter(tournament_id=tournament.pk)
+            .only('pk', 'order_index').order_by('order_index', 'pk')
+        )
+        changed = []
+        for order_index, image in enumerate(images):
+            if image.order_index != order_index:
+                image.order_index = order_index
+                changed.append(image)
+        if changed:
+            TournamentImage.objects.bulk_update(changed, ['order_index'], batch_size=500)
+        Tournament.objects.filter(pk=tournament.pk).update(image_seq=len(images))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0004_tournament_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='image_seq',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_image_seq, migrations.RunPython.noop),
+    ]
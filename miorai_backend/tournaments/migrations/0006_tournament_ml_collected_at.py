@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournaments', '0005_tournament_image_seq'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='ml_collected_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
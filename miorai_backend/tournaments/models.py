@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F
 from django.contrib.auth import get_user_model
 import json
 
@@ -32,6 +33,8 @@ class Tournament(models.Model):
     current_round = models.IntegerField(default=1)
     current_match_index = models.IntegerField(default=0)
     win_matrix = models.TextField(default='[]')  # JSON string olarak saklayacağız
+    image_seq = models.IntegerField(default=0)  # Sonraki resmin order_index'i (atomik sayaç)
+    ml_collected_at = models.DateTimeField(null=True, blank=True)  # ML veri seti günlüğüne yazıldığı an
     
     class Meta:
         ordering = ['-created_at']
@@ -49,6 +52,26 @@ class Tournament(models.Model):
     def set_win_matrix(self, matrix):
         """Win matrix'i JSON string olarak sakla"""
         self.win_matrix = json.dumps(matrix)
+    
+    def allocate_image_indexes(self, count=1):
+        """
+        `count` adet ardışık order_index ayır ve ilkini döndür.
+        UPDATE ... SET image_seq = image_seq + count satırı kilitler; transaction
+        içinde çağrılırsa eşzamanlı yüklemeler aynı index'i alamaz ve hata
+        durumunda rollback ile boşluk oluşmaz.
+        """
+        Tournament.objects.filter(pk=self.pk).update(image_seq=F('image_seq') + count)
+        self.image_seq = Tournament.objects.filter(pk=self.pk).values_list('image_seq', flat=True).get()
+        return self.image_seq - count
+    
+    def release_image_index(self, order_index):
+        """
+        Silinen resmin order_index'ini serbest bırak: sonraki resimleri bir
+        geri kaydır ve sayacı azalt (sıralama boşluksuz kalır).
+        """
+        Tournament.objects.filter(pk=self.pk).update(image_seq=F('image_seq') - 1)
+        self.images.filter(order_index__gt=order_index).update(order_index=F('order_index') - 1)
+        self.image_seq = Tournament.objects.filter(pk=self.pk).values_list('image_seq', flat=True).get()
 
 class TournamentImage(models.Model):
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name='images')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Tournament, TournamentImage, Match, CATEGORY_CHOICES
+from core.media import get_versioned_url
 
 class TournamentImageSerializer(serializers.ModelSerializer):
     image_url = serializers.SerializerMethodField()
@@ -10,7 +11,8 @@ class TournamentImageSerializer(serializers.ModelSerializer):
     
     def get_image_url(self, obj):
         if obj.image:
-            return self.context['request'].build_absolute_uri(obj.image.url)
+            # Versiyonlu URL: tarayıcı/CDN resmi süresiz cache'leyebilir
+            return self.context['request'].build_absolute_uri(get_versioned_url(obj.image))
         return None
 
 class MatchSerializer(serializers.ModelSerializer):
@@ -6,8 +6,10 @@ from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
 from knox.models import AuthToken
 from .models import Tournament, TournamentImage, Match
+import io
 import json
 import os
+from PIL import Image
 
 User = get_user_model()
 
@@ -172,6 +174,31 @@ class TournamentAPITest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['name'], 'Test Image')
 
+    def test_upload_image_allocates_sequential_order_index(self):
+        """Test resim yükleme sıra numarasını atomik sayaçtan alır"""
+        self.client.post(self.create_tournament_url, {'name': 'Test Tournament', 'category': 'general'})
+        buffer = io.BytesIO()
+        Image.new('RGB', (1, 1)).save(buffer, format='PNG')
+        image_content = buffer.getvalue()
+        order_indexes = []
+        for i in range(3):
+            image_file = SimpleUploadedFile(f'test{i}.png', image_content, content_type='image/png')
+            response = self.client.post(self.upload_image_url, {'image': image_file, 'name': f'Image {i}'}, format='multipart')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            order_indexes.append(response.data['order_index'])
+        self.assertEqual(order_indexes, [0, 1, 2])
+        
+        tournament = Tournament.objects.get(user=self.user, is_active=True)
+        self.assertEqual(tournament.image_seq, 3)
+        
+        # Silme sonrası sıralama boşluksuz kalmalı
+        first_image = tournament.images.get(order_index=0)
+        response = self.client.delete(reverse('delete-image', kwargs={'image_id': first_image.id}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.image_seq, 2)
+        self.assertEqual(list(tournament.images.values_list('order_index', flat=True)), [0, 1])
+
     def test_start_tournament(self):
         """Test turnuva başlatma"""
         tournament = Tournament.objects.create(
@@ -195,6 +222,28 @@ class TournamentAPITest(APITestCase):
         tournament.refresh_from_db()
         self.assertTrue(tournament.matches.exists())
 
+    def test_start_tournament_keeps_image_seq_for_empty_slots(self):
+        """Test BOŞ resimler sayaçtan index alır ve sayaç kaydetmede ezilmez"""
+        tournament = Tournament.objects.create(
+            user=self.user,
+            name='Test Tournament',
+            category='general'
+        )
+        for i in range(3):
+            TournamentImage.objects.create(
+                tournament=tournament,
+                name=f'Image {i+1}',
+                original_filename=f'image{i+1}.jpg',
+                order_index=tournament.allocate_image_indexes()
+            )
+        
+        response = self.client.post(self.start_tournament_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        tournament.refresh_from_db()
+        self.assertEqual(tournament.image_seq, 4)
+        self.assertEqual(tournament.images.get(name='BOŞ_0').order_index, 3)
+
     def test_start_tournament_insufficient_images(self):
         """Test yetersiz resim ile turnuva başlatma"""
         tournament = Tournament.objects.create(
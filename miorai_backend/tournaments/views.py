@@ -5,24 +5,25 @@ from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.throttling import UserRateThrottle
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from .models import Tournament, TournamentImage, Match
 from .serializers import (
     TournamentSerializer, TournamentCreateSerializer, 
     ImageUploadSerializer, TournamentImageSerializer,
     PublicTournamentSerializer
 )
-import json
+import logging
 import math
-import os
 
-# ML veri toplama için import
-from ml.match_predictor import MatchPredictor
+from ml.tasks import enqueue_tournament_completed
 
 # Performance monitoring ve cache imports
 from core.monitoring import monitor_performance, monitor_api_performance
 from core.cache import tournament_cache, cache_result, invalidate_cache_pattern
 from core.monitoring import log_user_action, log_error
 
+logger = logging.getLogger('miorai')
+
 class TournamentMatchThrottle(UserRateThrottle):
     """
     Turnuva maç sonuçları için özel throttle sınıfı
@@ -126,12 +127,14 @@ class ImageUploadView(APIView):
                     import re
                     name = re.sub(r'\.[^/.]+$', '', request.FILES['image'].name)  # Uzantıyı kaldır
                 
-                image = serializer.save(
-                    tournament=tournament,
-                    original_filename=request.FILES['image'].name,
-                    name=name,
-                    order_index=tournament.images.count()
-                )
+                # order_index atomik sayaçtan ayrılır (COUNT sorgusu ve yarış yok)
+                with transaction.atomic():
+                    image = serializer.save(
+                        tournament=tournament,
+                        original_filename=request.FILES['image'].name,
+                        name=name,
+                        order_index=tournament.allocate_image_indexes()
+                    )
                 return Response(
                     TournamentImageSerializer(image, context={'request': request}).data,
                     status=status.HTTP_201_CREATED
@@ -160,7 +163,9 @@ class ImageDeleteView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        image.delete()
+        with transaction.atomic():
+            tournament.release_image_index(image.order_index)
+            image.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class ImageUpdateNameView(APIView):
@@ -216,21 +221,23 @@ class StartTournamentView(APIView):
         image_count = len(images)
         next_power_of_2 = 2 ** math.ceil(math.log2(image_count))
         empty_slots = next_power_of_2 - image_count
-        
-        for i in range(empty_slots):
-            TournamentImage.objects.create(
-                tournament=tournament,
-                name=f"BOŞ_{i}",
-                original_filename=f"empty_{i}",
-                points=-500 - i,
-                order_index=len(images) + i
-            )
+        # Sayaç ve resimler aynı transaction'da: hata olursa ayrılan index'ler geri alınır
+        with transaction.atomic():
+            first_index = tournament.allocate_image_indexes(empty_slots)
+            for i in range(empty_slots):
+                TournamentImage.objects.create(
+                    tournament=tournament,
+                    name=f"BOŞ_{i}",
+                    original_filename=f"empty_{i}",
+                    points=-500 - i,
+                    order_index=first_index + i
+                )
         
         # Win matrix oluştur
         total_images = tournament.images.count()
         win_matrix = [[0 for _ in range(total_images)] for _ in range(total_images)]
         tournament.set_win_matrix(win_matrix)
-        tournament.save()
+        tournament.save(update_fields=['win_matrix', 'updated_at'])
         
         # İlk round'u başlat
         self._create_next_round_matches(tournament)
@@ -320,12 +327,12 @@ class SubmitMatchResultView(APIView):
             # Round bitti, sonraki round'a geç
             tournament.current_round += 1
             tournament.current_match_index = 0
-            tournament.save()
+            tournament.save(update_fields=['current_round', 'current_match_index', 'updated_at'])
             
             # Sonraki round maçlarını oluştur
             self._create_next_round_matches(tournament)
         else:
-            tournament.save()
+            tournament.save(update_fields=['current_match_index', 'updated_at'])
         
         return Response(
             TournamentSerializer(tournament, context={'request': request}).data,
@@ -354,7 +361,7 @@ class SubmitMatchResultView(APIView):
                                 matrix[i][j] = 1
             
             tournament.set_win_matrix(matrix)
-            tournament.save()
+            tournament.save(update_fields=['win_matrix', 'updated_at'])
     
     def _create_next_round_matches(self, tournament):
         if tournament.is_completed:
@@ -373,7 +380,7 @@ class SubmitMatchResultView(APIView):
         # Check end condition: no group has at least 2 players
         if not any(len(group) >= 2 for group in grouped.values()):
             tournament.is_completed = True
-            tournament.save()
+            tournament.save(update_fields=['is_completed', 'updated_at'])
             
             # 🆕 TURNUVA TAMAMLANDIĞINDA ML VERİ SETİNE DAHİL ET
             self._collect_tournament_data_for_ml(tournament)
@@ -432,7 +439,7 @@ class SubmitMatchResultView(APIView):
         if not new_matches:
             tournament.current_round += 1
             tournament.current_match_index = 0
-            tournament.save()
+            tournament.save(update_fields=['current_round', 'current_match_index', 'updated_at'])
             self._create_next_round_matches(tournament)
     
     def _get_previous_winner(self, tournament, image1, image2):
@@ -453,68 +460,13 @@ class SubmitMatchResultView(APIView):
     
     def _collect_tournament_data_for_ml(self, tournament):
         """
-        🆕 Turnuva tamamlandığında ML veri setine dahil et
-        """
-        try:
-            # Gerçek resim sayısını hesapla (BOŞ olmayan)
-            real_images = tournament.images.filter(
-                name__isnull=False
-            ).exclude(name__startswith='BOŞ_')
-            n_images = real_images.count()
-            
-            # Toplam maç sayısını hesapla
-            total_matches = tournament.matches.count()
-            
-            # Veri kaydı oluştur
-            tournament_data = {
-                'n_images': n_images,
-                'total_matches': total_matches,
-                'tournament_id': tournament.id,
-                'simulation_id': f"user_{tournament.user.id}_{tournament.id}",
-                'real_images': n_images,
-                'total_images_after_padding': tournament.images.count(),
-                'rounds_played': tournament.current_round,
-                'is_completed': tournament.is_completed,
-                'category': tournament.category,
-                'user_id': tournament.user.id,
-                'created_at': tournament.created_at.isoformat(),
-                'completed_at': tournament.updated_at.isoformat(),
-                'is_user_tournament': True  # Kullanıcı turnuvası olduğunu belirt
-            }
-            
-            # ML veri setini güncelle
-            self._update_ml_dataset(tournament_data)
-            
-            print(f"✅ Turnuva verisi ML setine eklendi: {n_images} resim, {total_matches} maç")
-            
-        except Exception as e:
-            print(f"❌ ML veri toplama hatası: {str(e)}")
-    
-    def _update_ml_dataset(self, tournament_data):
-        """
-        ML veri setini güncelle
+        🆕 Turnuva tamamlandığında ML veri toplama kuyruğuna ekle
+        (kayıt outbox worker'ı tarafından toplu olarak oluşturulur)
         """
         try:
-            dataset_path = "ml/data/tournament_dataset_v1.json"
-            
-            # Mevcut veri setini oku
-            if os.path.exists(dataset_path):
-                with open(dataset_path, 'r', encoding='utf-8') as f:
-                    dataset = json.load(f)
-            else:
-                dataset = []
-            
-            # Yeni veriyi ekle
-            dataset.append(tournament_data)
-            
-            # Veri setini kaydet
-            with open(dataset_path, 'w', encoding='utf-8') as f:
-                json.dump(dataset, f, indent=2, ensure_ascii=False)
-            
-            print(f"📊 ML veri seti güncellendi. Toplam kayıt: {len(dataset)}")
-            
-        except Exception as e:
-            print(f"❌ Veri seti güncelleme hatası: {str(e)}")
+            enqueue_tournament_completed(tournament)
+        except Exception:
+            logger.exception(f"ML veri toplama kuyruğa eklenemedi (turnuva {tournament.id})")
 
 # ... (Diğer view'ler aynı) ...
     
@@ -639,7 +591,7 @@ class MakeTournamentPublicView(APIView):
         tournament.name = new_name
         # Kategori bilgisini koru - sadece name değiştir
         tournament.is_public = True
-        tournament.save()
+        tournament.save(update_fields=['name', 'is_public', 'updated_at'])
         
         return Response(
             {"message": "Turnuva başarıyla public yapıldı."},
@@ -670,18 +622,21 @@ class CreateTournamentFromPublicView(APIView):
             name__isnull=False
         ).exclude(name__startswith='BOŞ_')
         
-        for idx, source_image in enumerate(source_images):
-            TournamentImage.objects.create(
-                tournament=new_tournament,
-                image=source_image.image,  # Aynı dosyayı referans et
-                name=source_image.name,
-                original_filename=source_image.original_filename,
-                order_index=idx
-            )
+        source_images = list(source_images)
+        with transaction.atomic():
+            first_index = new_tournament.allocate_image_indexes(len(source_images))
+            for idx, source_image in enumerate(source_images):
+                TournamentImage.objects.create(
+                    tournament=new_tournament,
+                    image=source_image.image,  # Aynı dosyayı referans et
+                    name=source_image.name,
+                    original_filename=source_image.original_filename,
+                    order_index=first_index + idx
+                )
         
         # Kaynak turnuvanın oynanma sayısını artır
         source_tournament.play_count += 1
-        source_tournament.save()
+        source_tournament.save(update_fields=['play_count', 'updated_at'])
         
         # Turnuvayı otomatik olarak başlat
         self._start_tournament_automatically(new_tournament)
@@ -701,21 +656,23 @@ class CreateTournamentFromPublicView(APIView):
         image_count = len(images)
         next_power_of_2 = 2 ** math.ceil(math.log2(image_count))
         empty_slots = next_power_of_2 - image_count
-        
-        for i in range(empty_slots):
-            TournamentImage.objects.create(
-                tournament=tournament,
-                name=f"BOŞ_{i}",
-                original_filename=f"empty_{i}",
-                points=-500 - i,
-                order_index=len(images) + i
-            )
+        # Sayaç ve resimler aynı transaction'da: hata olursa ayrılan index'ler geri alınır
+        with transaction.atomic():
+            first_index = tournament.allocate_image_indexes(empty_slots)
+            for i in range(empty_slots):
+                TournamentImage.objects.create(
+                    tournament=tournament,
+                    name=f"BOŞ_{i}",
+                    original_filename=f"empty_{i}",
+                    points=-500 - i,
+                    order_index=first_index + i
+                )
         
         # Win matrix oluştur
         total_images = tournament.images.count()
         win_matrix = [[0 for _ in range(total_images)] for _ in range(total_images)]
         tournament.set_win_matrix(win_matrix)
-        tournament.save()
+        tournament.save(update_fields=['win_matrix', 'updated_at'])
         
         # İlk round'u başlat
         self._create_next_round_matches(tournament)